@@ -19,6 +19,9 @@ from os import path
 import autofit as af
 import autolens as al
 
+from aggregator.tools import lazy_dataset
+from aggregator.tools import samples_summary
+
 """Specify the dataset type, label and name, which we use to determine the path we load the data from."""
 
 pixel_scales = 0.1
@@ -75,6 +78,22 @@ for dataset_name in [
     """
     pickle_files = [path.join(dataset_path, "true_tracer.pickle")]
 
+    """
+    The `Imaging` pickled by the phase is loaded in full by the aggregator. We also pass a small dataset reference,
+    which stores the paths and checksums of the .fits files above, so that the aggregator can load the data lazily and
+    memory-mapped (see `autolens_workspace/aggregator/tools/lazy_dataset.py`).
+    """
+    pickle_files.append(
+        lazy_dataset.output_reference(
+            output_path=dataset_path,
+            image_path=path.join(dataset_path, "image.fits"),
+            psf_path=path.join(dataset_path, "psf.fits"),
+            noise_map_path=path.join(dataset_path, "noise_map.fits"),
+            pixel_scales=pixel_scales,
+            name=dataset_name,
+        )
+    )
+
     # %%
     """
     The `SettingsPhase` (which customize the fit of the phase`s fit), will also be available to the aggregator!
@@ -98,4 +117,18 @@ for dataset_name in [
         settings=settings,
     )
 
-    phase.run(dataset=imaging, mask=mask, info=info, pickle_files=pickle_files)
+    result = phase.run(
+        dataset=imaging, mask=mask, info=info, pickle_files=pickle_files
+    )
+
+    """
+    When the phase finishes, we output a compact summary of its samples (median PDF and maximum log likelihood 
+    vectors, errors at 1 and 3 sigma, parameter names and log evidence). The aggregator reads this summary by default, 
+    so scripts which only need these quantities do not load the full samples (see 
+    `autolens_workspace/aggregator/tools/samples_summary.py`).
+    """
+    samples_summary.output_summary(
+        samples=result.samples,
+        output_path=phase.search.paths.output_path,
+        sigmas=[1.0, 3.0],
+    )
@@ -343,3 +343,86 @@ for samples in agg.values("samples"):
         weights=samples.weights,
         labels=samples.model.parameter_labels,
     )
+
+# %%
+"""
+For population studies of many lenses, it is often easier to have the results of every fit in one table, which can
+then be loaded with tools like `pandas` without ever touching the aggregator`s pickle files again.
+
+The `results_table` module in `autolens_workspace/aggregator/tools` exports the results of an aggregator to a .csv
+table (or a Parquet dataset, if `pyarrow` is installed and the path does not end with `.csv`). Every row contains the
+median PDF and maximum log likelihood values of every parameter, their errors at the input sigma values, the log
+evidence, run time and the info dictionary of the fit.
+
+The export is incremental, if you rerun it only results that are not already in the table are loaded and appended.
+The `processes` input loads the samples of the results in parallel. The call is in an `if __name__ == "__main__":` 
+block, which scripts that start a pool of processes need on macOS and Windows, where every process of the pool imports 
+the script again.
+"""
+
+# %%
+from aggregator.tools import results_table
+
+if __name__ == "__main__":
+
+    results_table.export(
+        aggregator=agg,
+        file_path=path.join("output", "aggregator", "results.csv"),
+        sigmas=[1.0, 3.0],
+        processes=2,
+    )
+
+# %%
+"""
+If a survey is still running, we may want to inspect the results of the phases which have finished and keep the
+results table up to date as more phases finish, without rescanning every result each time.
+
+The `AggregatorWatcher` polls an output directory for phases which have completed (marked by the `.completed` file
+output when a non-linear search finishes) and gives an aggregator of only the new results. Functions subscribed to
+the watcher are called with every new aggregator, below we use this to append new results to the table.
+
+Each call to `update` polls the output directory once. The first call reports every phase which has completed as new,
+including those we exported above, so the subscriber below passes the ids of the results already in the table as
+`exclude_ids` and appends the rows of only the results not in it. Like the export, the watcher is in the 
+`if __name__ == "__main__":` block, so the processes of a pool do not poll the directory or write to the table.
+"""
+
+# %%
+from aggregator.tools import watch
+
+if __name__ == "__main__":
+
+    watcher = watch.AggregatorWatcher(
+        directory=path.join("output", "aggregator", "phase_runner"),
+        state_path=path.join("output", "aggregator", "watch_state.txt"),
+    )
+
+    @watcher.subscribe
+    def append_to_table(agg_new):
+
+        file_path = path.join("output", "aggregator", "results.csv")
+
+        results_table.output_to_csv(
+            rows=results_table.rows_from_aggregator(
+                aggregator=agg_new,
+                exclude_ids=results_table.result_ids_from_csv(file_path=file_path),
+            ),
+            file_path=file_path,
+        )
+
+    for agg_new in watcher.update():
+
+        for samples in agg_new.values("samples"):
+            print(samples.max_log_likelihood_instance)
+
+# %%
+"""
+To keep watching a survey as it runs, use `watch`, which calls `update` every `poll_interval` seconds and yields the
+aggregator of every new completed phase. This blocks until `timeout` seconds have passed (or forever if it is `None`),
+so it is best run in its own script rather than this tutorial:
+
+    for agg_new in watcher.watch(poll_interval=60.0, timeout=3600.0):
+
+        for samples in agg_new.values("samples"):
+            print(samples.max_log_likelihood_instance)
+"""
@@ -252,3 +252,31 @@ true_tracers = [true_tracer for true_tracer in agg_filter.values("true_tracer")]
 
 print("Parameters used to simulate first Aggregator dataset:")
 print(true_tracers[0])
+
+# %%
+"""
+Every list above loads the full samples of every fit, even though we only used the median PDF model and its errors.
+When each phase finished, the phase runner output a compact summary of its samples, containing the median PDF and 
+maximum log likelihood vectors, the errors at 1 and 3 sigma, the parameter names and the log evidence.
+
+The `samples_summary` module reads these summaries, which is orders of magnitude faster than loading the samples. 
+Instances are created from the vectors using the model of each fit, which is also much cheaper to load than the 
+samples. If a fit has no summary (or we pass `use_samples=True`) the full samples are loaded instead.
+"""
+
+# %%
+from aggregator.tools import samples_summary
+
+summary_gen = samples_summary.SamplesSummaries(aggregator=agg_filter, sigmas=[1.0, 3.0])
+
+for summary, model in zip(summary_gen, agg_filter.values("model")):
+
+    print(summary.parameter_names)
+    print(summary.median_pdf_vector)
+    print(summary.error_vector_at_upper_sigma(sigma=3.0))
+    print(summary.error_vector_at_lower_sigma(sigma=3.0))
+    print(summary.log_evidence)
+
+    instance = summary.max_log_likelihood_instance_from(model=model)
+
+    print(instance.galaxies.lens.mass.einstein_radius)
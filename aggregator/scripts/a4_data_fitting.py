@@ -99,6 +99,26 @@ mask_gen = agg_filter.values("mask")
 for dataset, mask in zip(dataset_gen, mask_gen):
     aplt.Imaging.subplot_imaging(imaging=dataset, mask=mask)
 
+# %%
+"""
+Every `agg.values("dataset")` entry unpickles the full `Imaging` object, including the image, noise-map, PSF and any 
+grids it has cached. For thousands of lenses this is slow and the datasets are duplicated in the output of every 
+phase.
+
+The phase runner also passes a small `dataset_reference.pickle`, which points to the .fits files of each dataset. The
+`lazy_dataset` module uses this to give a `LazyImaging` for every lens, which only reads the data (memory-mapped) when 
+it is accessed. Provided each `Imaging` is discarded after each iteration, the memory use does not grow with the 
+number of lenses. Setting `verify=True` checks the .fits files have not changed since the model-fit.
+"""
+
+# %%
+from aggregator.tools import lazy_dataset
+
+for lazy_imaging in lazy_dataset.Imaging(aggregator=agg_filter, verify=True):
+
+    print(lazy_imaging.name)
+    aplt.Imaging.subplot_imaging(imaging=lazy_imaging.imaging)
+
 # %%
 """
 To reperform the fit of each maximum log likelihood lens model we can use the following generator.
@@ -280,3 +300,40 @@ for fit in fit_gen:
     )
 
     aplt.FitImaging.normalized_residual_map(fit=fit, plotter=plotter)
+
+# %%
+"""
+Re-performing every fit each time we run a cell is slow, especially for fits using an `Inversion`, which can take
+seconds to minutes per lens. The `fit_cache` module in `autolens_workspace/aggregator/tools` provides a version of the
+`FitImaging` generator which stores the products of every fit (model image, residuals, chi-squared map, inversion
+reconstruction and log evidence) on the hard-disk.
+
+Each fit is stored using a key made from the phase`s output directory, its maximum log likelihood model and the
+settings used to perform the fit. If you rerun the cell below, the fits are loaded from the cache and are instant. If 
+you change the settings, new fits are performed. The `max_size_mb` input bounds the size of the cache, with the least 
+recently used fits removed once it is exceeded.
+"""
+
+# %%
+from aggregator.tools import fit_cache
+
+cache = fit_cache.FitImagingCache(
+    directory=path.join("output", "aggregator", "fit_cache"), max_size_mb=500.0
+)
+
+fit_products_gen = fit_cache.FitImaging(
+    aggregator=agg_filter,
+    cache=cache,
+    settings_masked_imaging=settings_masked_imaging,
+    settings_pixelization=settings_pixelization,
+)
+
+for fit_products in fit_products_gen:
+
+    print(fit_products.name, fit_products.figure_of_merit)
+
+    residual_map = al.Array.manual_2d(
+        array=fit_products.residual_map, pixel_scales=fit_products.pixel_scales
+    )
+
+    aplt.Array(array=residual_map)
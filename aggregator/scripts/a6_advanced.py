@@ -159,3 +159,27 @@ fit_gen = al.agg.FitImaging(aggregator=agg_dataset_0)
 
 for fit in fit_gen:
     aplt.FitImaging.subplot_fit_imaging(fit=fit)
+
+# %%
+"""
+Plotting every fit in a loop renders the figures one at a time, which for a whole sample can take hours. The
+`plot_batch` module renders the imaging subplot, fit subplot and source reconstruction of every result in an 
+aggregator to .png files, using a pool of processes and a non-interactive Matplotlib backend.
+
+The figures are output to a folder with an `index.html` file, which you can open in a browser to review every fit on
+one page. If you rerun the batch, results whose output files have not changed are skipped.
+
+The call is in an `if __name__ == "__main__":` block, which scripts that start a pool of processes need on macOS and 
+Windows, where every process of the pool imports the script again.
+"""
+
+# %%
+from aggregator.tools import plot_batch
+
+if __name__ == "__main__":
+
+    plot_batch.render(
+        aggregator=agg_power_law,
+        output_path=path.join("output", "aggregator", "figures", "power_law"),
+        processes=4,
+    )
@@ -74,3 +74,35 @@ agg_power_law_hyper_shear = agg_power_law.filter(
 agg_power_law_hyper_shear = agg_power_law_hyper_shear.filter(
     agg_power_law_hyper_shear.directory.contains("with_shear")
 )
+
+# %%
+"""
+For a large sample of lenses, loading the samples of every cell of every grid search is slow. At the end of the
+subhalo `GridPhase` of the SLaM pipelines a compact summary of the grid search is output, containing the cell limits,
+log evidences, maximum log likelihoods and best-fit subhalo masses of every cell.
+
+Detection maps can be built from these summaries alone, without loading any samples. Grid searches performed before
+this summary was output can have it output via `output_summaries_from_aggregator`, which only needs to be run once.
+"""
+
+# %%
+from aggregator.tools import grid_search_summary
+
+agg_grid_search = agg.filter(
+    agg.phase == "phase[1]__subhalo_search__source",
+    agg.pipeline == "pipeline_subhalo__nfw",
+)
+
+grid_search_summary.output_summaries_from_aggregator(aggregator=agg_grid_search)
+
+for summary in grid_search_summary.summaries_from_aggregator(
+    aggregator=agg_grid_search
+):
+
+    detection_map = grid_search_summary.detection_map_from(
+        summary=summary, use_log_evidences=True
+    )
+    subhalo_mass_map = grid_search_summary.subhalo_mass_map_from(summary=summary)
+
+    print(detection_map)
+    print(subhalo_mass_map)
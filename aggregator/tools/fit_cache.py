@@ -0,0 +1,316 @@
+import hashlib
+import os
+import pickle
+from os import path
+
+import numpy as np
+import autolens as al
+
+"""
+An on-disk cache of the products of a `FitImaging` recomputed via the aggregator.
+
+Re-fitting every lens each time a notebook cell is rerun is expensive for fits using an `Inversion`, where recomputing
+the fit can take seconds or minutes per lens. The `FitImagingCache` stores the arrays and figures of merit of each fit
+in a .npz file, keyed by:
+
+ - The result id (the output directory of the phase the `agg_obj` corresponds to).
+ - The instance vector the fit was performed using (by default the maximum log likelihood vector).
+ - A hash of the `SettingsMaskedImaging`, `SettingsPixelization` and `SettingsInversion` used to perform the fit.
+
+The cache is bounded in size, with the least recently used entries removed once `max_size_mb` is exceeded.
+"""
+
+
+def settings_hash_from(*settings):
+    """
+    Returns a hash of the input settings objects, which changes if any setting used to perform the fit is changed.
+
+    Settings objects are pickled where possible, falling back on their string representation otherwise.
+    """
+    sha = hashlib.sha1()
+
+    for setting in settings:
+
+        try:
+            sha.update(pickle.dumps(setting))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            sha.update(repr(setting).encode("utf-8"))
+
+    return sha.hexdigest()
+
+
+class FitImagingProducts:
+    def __init__(
+        self,
+        name,
+        pixel_scales,
+        model_image,
+        residual_map,
+        chi_squared_map,
+        log_likelihood,
+        log_evidence=None,
+        reconstruction=None,
+    ):
+        """
+        The products of a `FitImaging` stored in the cache, as 2D NumPy arrays (which can be plotted or converted to
+        an `Array` via `al.Array.manual_2d`).
+
+        The `reconstruction` and `log_evidence` are only available for fits using an `Inversion`.
+        """
+        self.name = name
+        self.pixel_scales = pixel_scales
+        self.model_image = model_image
+        self.residual_map = residual_map
+        self.chi_squared_map = chi_squared_map
+        self.log_likelihood = log_likelihood
+        self.log_evidence = log_evidence
+        self.reconstruction = reconstruction
+
+    @property
+    def figure_of_merit(self):
+        if self.log_evidence is not None:
+            return self.log_evidence
+        return self.log_likelihood
+
+    @classmethod
+    def from_fit(cls, fit, name=None):
+
+        inversion = getattr(fit, "inversion", None)
+
+        return FitImagingProducts(
+            name=name,
+            pixel_scales=fit.image.pixel_scales,
+            model_image=np.asarray(fit.model_image.in_2d),
+            residual_map=np.asarray(fit.residual_map.in_2d),
+            chi_squared_map=np.asarray(fit.chi_squared_map.in_2d),
+            log_likelihood=float(fit.log_likelihood),
+            log_evidence=float(fit.log_evidence) if inversion is not None else None,
+            reconstruction=np.asarray(inversion.reconstruction)
+            if inversion is not None
+            else None,
+        )
+
+    def output_to_npz(self, file_path):
+
+        arrays = {
+            "pixel_scales": np.asarray(self.pixel_scales),
+            "model_image": self.model_image,
+            "residual_map": self.residual_map,
+            "chi_squared_map": self.chi_squared_map,
+            "log_likelihood": np.asarray(self.log_likelihood),
+        }
+
+        if self.name is not None:
+            arrays["name"] = np.asarray(self.name)
+        if self.log_evidence is not None:
+            arrays["log_evidence"] = np.asarray(self.log_evidence)
+        if self.reconstruction is not None:
+            arrays["reconstruction"] = self.reconstruction
+
+        # Write to a temporary file first, so an interrupted write never leaves a corrupt cache entry.
+        tmp_path = f"{file_path}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def from_npz(cls, file_path):
+
+        with np.load(file_path) as npz:
+
+            return FitImagingProducts(
+                name=str(npz["name"]) if "name" in npz else None,
+                pixel_scales=tuple(npz["pixel_scales"]),
+                model_image=npz["model_image"],
+                residual_map=npz["residual_map"],
+                chi_squared_map=npz["chi_squared_map"],
+                log_likelihood=float(npz["log_likelihood"]),
+                log_evidence=float(npz["log_evidence"])
+                if "log_evidence" in npz
+                else None,
+                reconstruction=npz["reconstruction"]
+                if "reconstruction" in npz
+                else None,
+            )
+
+
+class FitImagingCache:
+    def __init__(self, directory, max_size_mb=1000.0):
+        """
+        A size-bounded, on-disk cache of `FitImagingProducts`.
+
+        Parameters
+        ----------
+        directory : str
+            The directory the .npz files of the cache are written to.
+        max_size_mb : float
+            The maximum size of the cache in megabytes. When an entry is added that takes the cache above this size,
+            the least recently used entries are removed.
+        """
+        self.directory = directory
+        self.max_size_mb = max_size_mb
+
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key_from(result_id, instance_vector, settings_hash):
+
+        sha = hashlib.sha1()
+        sha.update(str(result_id).encode("utf-8"))
+        sha.update(np.asarray(instance_vector, dtype="float64").tobytes())
+        sha.update(settings_hash.encode("utf-8"))
+
+        return sha.hexdigest()
+
+    def file_path_from(self, key):
+        return path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """
+        Returns the cached `FitImagingProducts` of a key, or `None` if the key is not in the cache.
+
+        A hit updates the file's access time, which is used to decide which entries are least recently used.
+        """
+        file_path = self.file_path_from(key=key)
+
+        if not path.exists(file_path):
+            return None
+
+        try:
+            products = FitImagingProducts.from_npz(file_path=file_path)
+        except (OSError, ValueError, KeyError):
+            os.remove(file_path)
+            return None
+
+        os.utime(file_path)
+
+        return products
+
+    def set(self, key, products):
+
+        products.output_to_npz(file_path=self.file_path_from(key=key))
+        self.evict()
+
+    @property
+    def size_mb(self):
+        return sum(path.getsize(file_path) for file_path in self.file_paths) / 1.0e6
+
+    @property
+    def file_paths(self):
+        return [
+            path.join(self.directory, filename)
+            for filename in os.listdir(self.directory)
+            if filename.endswith(".npz")
+        ]
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is below `max_size_mb`."""
+        file_paths = sorted(self.file_paths, key=path.getmtime)
+        sizes = {file_path: path.getsize(file_path) for file_path in file_paths}
+
+        total_size = sum(sizes.values())
+        max_size = self.max_size_mb * 1.0e6
+
+        for file_path in file_paths[:-1]:
+
+            if total_size <= max_size:
+                break
+
+            os.remove(file_path)
+            total_size -= sizes[file_path]
+
+    def clear(self):
+        for file_path in self.file_paths:
+            os.remove(file_path)
+
+
+def fit_imaging_from_agg_obj(
+    agg_obj,
+    instance=None,
+    settings_masked_imaging=None,
+    settings_pixelization=None,
+    settings_inversion=None,
+):
+    """
+    Returns the `FitImaging` of an `agg_obj`, using the settings of the phase unless they are overwritten by the input
+    settings. This mirrors the generator `make_fit_generator` in `aggregator/scripts/a4_data_fitting.py`.
+    """
+    settings = agg_obj.settings
+
+    settings_masked_imaging = settings_masked_imaging or settings.settings_masked_imaging
+    settings_pixelization = settings_pixelization or settings.settings_pixelization
+    settings_inversion = settings_inversion or settings.settings_inversion
+
+    masked_imaging = al.MaskedImaging(
+        imaging=agg_obj.dataset, mask=agg_obj.mask, settings=settings_masked_imaging
+    )
+
+    if instance is None:
+        instance = agg_obj.samples.max_log_likelihood_instance
+
+    tracer = al.Tracer.from_galaxies(galaxies=instance.galaxies)
+
+    return al.FitImaging(
+        masked_imaging=masked_imaging,
+        tracer=tracer,
+        settings_pixelization=settings_pixelization,
+        settings_inversion=settings_inversion,
+    )
+
+
+def FitImaging(
+    aggregator,
+    cache,
+    settings_masked_imaging=None,
+    settings_pixelization=None,
+    settings_inversion=None,
+):
+    """
+    A generator of the `FitImagingProducts` of every result in an aggregator, which behaves like
+    `al.agg.FitImaging` but reads each fit from the cache if it has been performed before with the same maximum log
+    likelihood model and settings.
+
+    Loading the `Samples` to get the instance vector is far cheaper than re-performing the fit, therefore only results
+    which miss the cache pay for the full fit.
+    """
+
+    def func(agg_obj):
+
+        settings = agg_obj.settings
+
+        settings_hash = settings_hash_from(
+            settings_masked_imaging or settings.settings_masked_imaging,
+            settings_pixelization or settings.settings_pixelization,
+            settings_inversion or settings.settings_inversion,
+        )
+
+        samples = agg_obj.samples
+
+        key = cache.key_from(
+            result_id=agg_obj.directory,
+            instance_vector=samples.max_log_likelihood_vector,
+            settings_hash=settings_hash,
+        )
+
+        products = cache.get(key=key)
+
+        if products is not None:
+            return products
+
+        fit = fit_imaging_from_agg_obj(
+            agg_obj=agg_obj,
+            instance=samples.max_log_likelihood_instance,
+            settings_masked_imaging=settings_masked_imaging,
+            settings_pixelization=settings_pixelization,
+            settings_inversion=settings_inversion,
+        )
+
+        products = FitImagingProducts.from_fit(fit=fit, name=fit.masked_imaging.name)
+
+        cache.set(key=key, products=products)
+
+        return products
+
+    return aggregator.map(func=func)
@@ -0,0 +1,118 @@
+import os
+from os import path
+
+import numpy as np
+
+from slam.grid_search_summary import output_summary, summary_filename
+
+"""
+Read the compact summaries of grid searches of non-linear searches (e.g. the subhalo detection `GridPhase` of the
+SLaM subhalo pipelines), which are output as one small .npz file in the output directory of every grid search by
+`slam/grid_search_summary.py`.
+
+Building subhalo detection maps via `al.agg.grid_search_result_as_array` loads the full `Samples` of every cell of
+every grid search, which for a survey of hundreds of lenses is slow. The summary contains only what a detection map
+needs:
+
+ - The lower and upper physical limits of every cell of the grid search.
+ - The log evidence and maximum log likelihood of every cell.
+ - The best-fit subhalo `mass_at_200` of every cell.
+
+Detection maps for a whole sample can then be built from the summaries alone, without unpickling any samples.
+"""
+
+
+def summary_from_file(file_path):
+    with np.load(file_path) as npz:
+        return {key: npz[key] for key in npz.files}
+
+
+def output_summaries_from_aggregator(aggregator, overwrite=False):
+    """
+    Output the summary of every grid search result in an aggregator, for grid searches run before summaries were
+    output at the end of the `GridPhase`. Grid searches which already have a summary are skipped unless `overwrite`
+    is `True`.
+    """
+
+    def func(agg_obj):
+
+        file_path = path.join(agg_obj.directory, summary_filename)
+
+        if path.exists(file_path) and not overwrite:
+            return
+
+        try:
+            grid_search_result = agg_obj.grid_search_result
+        except (AttributeError, FileNotFoundError):
+            return
+
+        if grid_search_result is None:
+            return
+
+        output_summary(
+            grid_search_result=grid_search_result, output_path=agg_obj.directory
+        )
+
+    for _ in aggregator.map(func=func):
+        pass
+
+
+def summaries_from_aggregator(aggregator):
+    """
+    A generator of the summaries of every result in an aggregator which has one. Only the directory of each result is
+    used, so no pickles are loaded.
+    """
+
+    def func(agg_obj):
+
+        file_path = path.join(agg_obj.directory, summary_filename)
+
+        if not path.exists(file_path):
+            return None
+
+        return summary_from_file(file_path=file_path)
+
+    return filter(None, aggregator.map(func=func))
+
+
+def summaries_from_directory(directory):
+    """
+    A generator of (directory, summary) tuples of every summary found in a directory and its sub-directories, for
+    building detection maps of a sample without setting up an aggregator.
+    """
+    for dirpath, _, filenames in os.walk(directory):
+        if summary_filename in filenames:
+            yield dirpath, summary_from_file(
+                file_path=path.join(dirpath, summary_filename)
+            )
+
+
+def detection_map_from(summary, use_log_evidences=True, figure_of_merit_base=None):
+    """
+    Returns the detection map of a grid search summary as a 2D NumPy array of shape `summary["shape"]`, in the same
+    order as the cells of the grid search.
+
+    Parameters
+    ----------
+    summary : dict
+        The summary of the grid search.
+    use_log_evidences : bool
+        If `True` the map is the log evidence of every cell, else it is the maximum log likelihood.
+    figure_of_merit_base : float or None
+        If input, this value (e.g. the log evidence of the model without a subhalo) is subtracted from every cell,
+        such that the map gives the increase in figure of merit due to the subhalo.
+    """
+    if use_log_evidences:
+        values = summary["log_evidences"]
+    else:
+        values = summary["max_log_likelihoods"]
+
+    if figure_of_merit_base is not None:
+        values = values - figure_of_merit_base
+
+    return np.reshape(values, tuple(summary["shape"]))
+
+
+def subhalo_mass_map_from(summary):
+    """Returns the best-fit subhalo `mass_at_200` of every cell as a 2D NumPy array."""
+    return np.reshape(summary["subhalo_masses"], tuple(summary["shape"]))
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle
+from os import path
+
+import numpy as np
+from astropy.io import fits
+import autolens as al
+
+"""
+Memory-bounded loading of the `Imaging` datasets of aggregator results.
+
+The `dataset` of every result is pickled as a full `Imaging` object, so `agg.values("dataset")` unpickles the image,
+noise-map, PSF and every grid the `Imaging` has cached into memory, and every phase stores its own copy of the data.
+
+Instead, a runner can store a small `dataset_reference.pickle` in the dataset folder and pass it to `phase.run()` via
+`pickle_files`. The reference contains the paths of the .fits files (or .npy files) the dataset was loaded from and
+their checksums, and nothing else. The aggregator then gives a `LazyImaging` for every result, which only reads the
+data (memory-mapped) when it is accessed and can be discarded after use, so iterating over thousands of datasets uses
+a flat amount of memory.
+"""
+
+reference_filename = "dataset_reference.pickle"
+
+
+def checksum_from(file_path, chunk_size=2 ** 20):
+    """Returns the sha1 checksum of a file, read in chunks so the file is never fully loaded into memory."""
+    sha = hashlib.sha1()
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+def output_reference(
+    output_path,
+    image_path,
+    noise_map_path,
+    psf_path,
+    pixel_scales,
+    name=None,
+    image_hdu=0,
+    noise_map_hdu=0,
+    psf_hdu=0,
+):
+    """
+    Output a `dataset_reference.pickle` file to `output_path`, which points to the files of an `Imaging` dataset.
+
+    The files can be .fits files (loaded from the input hdus) or .npy files (see `output_imaging_to_npy`). The path
+    of the reference is returned, so it can be passed straight to the `pickle_files` input of `phase.run()`.
+    """
+    reference = {
+        "name": name,
+        "pixel_scales": pixel_scales,
+        "files": {},
+    }
+
+    for key, file_path, hdu in [
+        ("image", image_path, image_hdu),
+        ("noise_map", noise_map_path, noise_map_hdu),
+        ("psf", psf_path, psf_hdu),
+    ]:
+        reference["files"][key] = {
+            "path": path.abspath(file_path),
+            "hdu": hdu,
+            "checksum": checksum_from(file_path=file_path),
+        }
+
+    os.makedirs(output_path, exist_ok=True)
+
+    reference_path = path.join(output_path, reference_filename)
+
+    with open(reference_path, "wb") as f:
+        pickle.dump(reference, f)
+
+    return reference_path
+
+
+def output_imaging_to_npy(imaging, output_path):
+    """
+    Output the image, noise-map and PSF of an `Imaging` dataset as .npy files, which can be memory-mapped when loaded.
+
+    This is useful for datasets which are not loaded from .fits files (e.g. preprocessed or simulated in memory).
+    """
+    os.makedirs(output_path, exist_ok=True)
+
+    file_paths = {}
+
+    for key, array in [
+        ("image", imaging.image.in_2d),
+        ("noise_map", imaging.noise_map.in_2d),
+        ("psf", imaging.psf.in_2d),
+    ]:
+        file_paths[key] = path.join(output_path, f"{key}.npy")
+        np.save(file_paths[key], np.asarray(array))
+
+    return file_paths
+
+
+def memmap_from(file_path, hdu=0):
+    """Returns a read-only, memory-mapped 2D array of a .npy file or an hdu of a .fits file."""
+    if file_path.endswith(".npy"):
+        return np.load(file_path, mmap_mode="r")
+
+    with fits.open(file_path, memmap=True) as hdul:
+        return hdul[hdu].data
+
+
+class LazyImaging:
+    def __init__(self, reference, verify=False):
+        """
+        A view of an `Imaging` dataset whose data is only read from its files when it is accessed.
+
+        Parameters
+        ----------
+        reference : dict
+            The dataset reference output by `output_reference`.
+        verify : bool
+            If `True`, the checksum of every file is checked against the reference when it is first accessed, raising
+            an `IOError` if the file has changed since the model-fit was performed.
+        """
+        self.reference = reference
+        self.verify = verify
+
+        self.verified_paths = set()
+
+    @property
+    def name(self):
+        return self.reference["name"]
+
+    @property
+    def pixel_scales(self):
+        return self.reference["pixel_scales"]
+
+    def array_from(self, key):
+
+        file = self.reference["files"][key]
+
+        if self.verify and file["path"] not in self.verified_paths:
+
+            if checksum_from(file_path=file["path"]) != file["checksum"]:
+                raise IOError(
+                    f"The file {file['path']} has changed since the dataset reference was output."
+                )
+
+            self.verified_paths.add(file["path"])
+
+        return memmap_from(file_path=file["path"], hdu=file["hdu"])
+
+    @property
+    def image(self):
+        return al.Array.manual_2d(
+            array=self.array_from(key="image"), pixel_scales=self.pixel_scales
+        )
+
+    @property
+    def noise_map(self):
+        return al.Array.manual_2d(
+            array=self.array_from(key="noise_map"), pixel_scales=self.pixel_scales
+        )
+
+    @property
+    def psf(self):
+        return al.Kernel.manual_2d(
+            array=self.array_from(key="psf"), pixel_scales=self.pixel_scales
+        )
+
+    @property
+    def imaging(self):
+        """The full `Imaging` dataset, which should be used and discarded within one iteration of a generator."""
+        return al.Imaging(
+            image=self.image, noise_map=self.noise_map, psf=self.psf, name=self.name
+        )
+
+
+def Imaging(aggregator, verify=False):
+    """
+    A generator of a `LazyImaging` of every result in an aggregator, which is a memory-bounded alternative to
+    `agg.values("dataset")` for results whose runner passed a `dataset_reference.pickle` to `phase.run()`.
+    """
+
+    def func(agg_obj):
+        return LazyImaging(reference=agg_obj.dataset_reference, verify=verify)
+
+    return aggregator.map(func=func)
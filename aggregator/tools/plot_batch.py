@@ -0,0 +1,206 @@
+import hashlib
+import html
+import json
+import os
+from multiprocessing import Pool
+from os import path
+
+"""
+Render the subplots of every result of an aggregator to .png files in parallel, with an HTML index for reviewing them.
+
+Plotting every fit in a loop over a generator renders each figure one at a time in the main process. Here every result
+is rendered in a `multiprocessing.Pool` using Matplotlib`s non-interactive `Agg` backend, with the figures of each
+result written to their own folder:
+
+ - `subplot_imaging.png`: the `Imaging` dataset.
+ - `subplot_fit_imaging.png`: the maximum log likelihood `FitImaging`.
+ - `reconstruction.png`: the source reconstruction, for fits using an `Inversion`.
+
+Every result folder contains a `stamp.json` with a stamp of the result`s output files. If the stamp has not changed
+since the figures were last rendered the result is skipped, so rerunning the batch only renders new or updated results.
+"""
+
+stamp_filename = "stamp.json"
+index_filename = "index.html"
+
+
+def result_folder_from(agg_obj):
+    return hashlib.sha1(agg_obj.directory.encode("utf-8")).hexdigest()[:16]
+
+
+def stamp_from(agg_obj):
+    """
+    Returns a stamp of the output files of a result, which changes if any file is added, removed or modified.
+
+    Only the size and modification time of each file are used, so no pickles are loaded.
+    """
+    sha = hashlib.sha1()
+
+    for dirpath, _, filenames in sorted(os.walk(agg_obj.directory)):
+        for filename in sorted(filenames):
+            stat = os.stat(path.join(dirpath, filename))
+            sha.update(f"{filename}{stat.st_size}{stat.st_mtime_ns}".encode("utf-8"))
+
+    return sha.hexdigest()
+
+
+def is_rendered(output_path, stamp):
+
+    stamp_path = path.join(output_path, stamp_filename)
+
+    if not path.exists(stamp_path):
+        return False
+
+    with open(stamp_path) as f:
+        return json.load(f)["stamp"] == stamp
+
+
+def _init_worker():
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def render_agg_obj(agg_obj, output_path):
+    """
+    Render the figures of one result to `output_path` and output its `stamp.json`. This is performed by each
+    process of the pool, so it imports **PyAutoLens** itself.
+    """
+    import matplotlib.pyplot as plt
+    import autolens.plot as aplt
+
+    from aggregator.tools import fit_cache
+
+    stamp = stamp_from(agg_obj=agg_obj)
+
+    if is_rendered(output_path=output_path, stamp=stamp):
+        return
+
+    os.makedirs(output_path, exist_ok=True)
+
+    fit = fit_cache.fit_imaging_from_agg_obj(agg_obj=agg_obj)
+
+    figures = ["subplot_imaging", "subplot_fit_imaging"]
+
+    aplt.Imaging.subplot_imaging(
+        imaging=fit.masked_imaging.imaging,
+        sub_plotter=aplt.SubPlotter(
+            output=aplt.Output(path=output_path, filename=figures[0], format="png")
+        ),
+    )
+
+    aplt.FitImaging.subplot_fit_imaging(
+        fit=fit,
+        sub_plotter=aplt.SubPlotter(
+            output=aplt.Output(path=output_path, filename=figures[1], format="png")
+        ),
+    )
+
+    if fit.inversion is not None:
+
+        figures.append("reconstruction")
+
+        aplt.Inversion.reconstruction(
+            inversion=fit.inversion,
+            plotter=aplt.Plotter(
+                output=aplt.Output(path=output_path, filename=figures[2], format="png")
+            ),
+        )
+
+    plt.close("all")
+
+    with open(path.join(output_path, stamp_filename), "w") as f:
+        json.dump(
+            {
+                "stamp": stamp,
+                "name": fit.masked_imaging.name,
+                "directory": agg_obj.directory,
+                "figures": figures,
+            },
+            f,
+        )
+
+
+def _render_agg_obj(args):
+    agg_obj, output_path = args
+    render_agg_obj(agg_obj=agg_obj, output_path=output_path)
+
+
+def output_index(output_path):
+    """
+    Output an `index.html` to `output_path`, which shows the figures of every rendered result in one page.
+    """
+    entries = []
+
+    for folder in sorted(os.listdir(output_path)):
+
+        stamp_path = path.join(output_path, folder, stamp_filename)
+
+        if not path.exists(stamp_path):
+            continue
+
+        with open(stamp_path) as f:
+            entries.append((folder, json.load(f)))
+
+    entries = sorted(entries, key=lambda entry: str(entry[1]["name"]))
+
+    lines = [
+        "<html>",
+        "<head><title>Aggregator Figures</title></head>",
+        "<body>",
+    ]
+
+    for folder, stamp in entries:
+
+        lines.append(f"<h2>{html.escape(str(stamp['name']))}</h2>")
+        lines.append(f"<p>{html.escape(stamp['directory'])}</p>")
+
+        for figure in stamp["figures"]:
+            lines.append(f'<img src="{folder}/{figure}.png" width="600">')
+
+    lines += ["</body>", "</html>"]
+
+    with open(path.join(output_path, index_filename), "w") as f:
+        f.write("\n".join(lines))
+
+
+def render(aggregator, output_path, processes=1):
+    """
+    Render the figures of every result of an aggregator to `output_path` and output an `index.html` of them.
+
+    Parameters
+    ----------
+    aggregator : af.Aggregator
+        The aggregator (which may be filtered) whose results are rendered.
+    output_path : str
+        The directory the figures and index are output to.
+    processes : int
+        The number of processes the figures are rendered in.
+    """
+    args = [
+        (agg_obj, path.join(output_path, result_folder_from(agg_obj=agg_obj)))
+        for agg_obj in aggregator.map(func=lambda agg_obj: agg_obj)
+    ]
+
+    if processes == 1:
+
+        import matplotlib
+        import matplotlib.pyplot as plt
+
+        backend = matplotlib.get_backend()
+
+        plt.switch_backend("Agg")
+
+        try:
+            for arg in args:
+                _render_agg_obj(arg)
+        finally:
+            plt.switch_backend(backend)
+
+    else:
+
+        with Pool(processes=processes, initializer=_init_worker) as pool:
+            pool.map(_render_agg_obj, args)
+
+    output_index(output_path=output_path)
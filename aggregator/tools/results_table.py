@@ -0,0 +1,277 @@
+import csv
+import os
+from multiprocessing import Pool
+from os import path
+
+from aggregator.tools import samples_summary
+
+"""
+Export the results of an aggregator to a single table, with one row per result (e.g. per lens and phase).
+
+Each row is made from the `SamplesSummary` of the result (see `samples_summary.py`), so the full samples are only
+loaded for results without a summary. Each row contains:
+
+ - The result id (the output directory of the phase), phase name and pipeline name.
+ - The median PDF and maximum log likelihood value of every parameter, labeled using `model.parameter_names`.
+ - The upper and lower errors of every parameter at the input sigma values.
+ - The log evidence and maximum log likelihood.
+ - Every entry of the info dictionary passed to `phase.run()`, prefixed with `info.`.
+ - The run time of the non-linear search, if the `Samples` have one.
+
+The table is written as a .csv file or, if `pyarrow` is installed, a Parquet dataset (a directory of .parquet part
+files). Exports are incremental, so rerunning an export only loads the results that are not already in the table.
+"""
+
+result_id_column = "result_id"
+
+
+def row_from_agg_obj(agg_obj, sigmas=(1.0, 3.0)):
+    """
+    Returns the row of the table of one result of an aggregator, as a dictionary mapping column names to values.
+    """
+    summary = samples_summary.summary_from_agg_obj(agg_obj=agg_obj, sigmas=sigmas)
+
+    row = {
+        result_id_column: agg_obj.directory,
+        "phase": getattr(agg_obj, "phase", None),
+        "pipeline": getattr(agg_obj, "pipeline", None),
+    }
+
+    parameter_names = summary.parameter_names
+
+    median_pdf_vector = summary.median_pdf_vector
+    max_log_likelihood_vector = summary.max_log_likelihood_vector
+
+    for name, median, max_log_likelihood in zip(
+        parameter_names, median_pdf_vector, max_log_likelihood_vector
+    ):
+        row[f"{name}.median_pdf"] = median
+        row[f"{name}.max_log_likelihood"] = max_log_likelihood
+
+    for sigma in sigmas:
+
+        upper_vector = summary.vector_at_upper_sigma(sigma=sigma)
+        lower_vector = summary.vector_at_lower_sigma(sigma=sigma)
+
+        for name, median, upper, lower in zip(
+            parameter_names, median_pdf_vector, upper_vector, lower_vector
+        ):
+            row[f"{name}.upper_error_{sigma}_sigma"] = upper - median
+            row[f"{name}.lower_error_{sigma}_sigma"] = median - lower
+
+    row["log_evidence"] = summary.log_evidence
+    row["max_log_likelihood"] = summary.max_log_likelihood
+    row["time"] = summary.time
+
+    info = agg_obj.info or {}
+
+    for key, value in info.items():
+        row[f"info.{key}"] = value
+
+    return row
+
+
+def _row_from_agg_obj(args):
+    agg_obj, sigmas = args
+    return row_from_agg_obj(agg_obj=agg_obj, sigmas=sigmas)
+
+
+def rows_from_aggregator(aggregator, sigmas=(1.0, 3.0), exclude_ids=(), processes=1):
+    """
+    Returns the rows of every result in an aggregator, skipping results whose id is in `exclude_ids`.
+
+    If `processes` is above 1 the samples of each result are loaded and summarized in a `multiprocessing.Pool`.
+    """
+    exclude_ids = set(exclude_ids)
+
+    agg_objs = [
+        agg_obj
+        for agg_obj in aggregator.map(func=lambda agg_obj: agg_obj)
+        if agg_obj.directory not in exclude_ids
+    ]
+
+    args = [(agg_obj, sigmas) for agg_obj in agg_objs]
+
+    if processes == 1:
+        return list(map(_row_from_agg_obj, args))
+
+    with Pool(processes=processes) as pool:
+        return pool.map(_row_from_agg_obj, args)
+
+
+def result_ids_from_csv(file_path):
+
+    if not path.exists(file_path):
+        return set()
+
+    with open(file_path, newline="") as f:
+        return {row[result_id_column] for row in csv.DictReader(f)}
+
+
+def output_to_csv(rows, file_path):
+    """
+    Append rows to a .csv table. Only the header of the table is read, unless the new rows have columns the table
+    does not, in which case the table is rewritten with the union of both sets of columns.
+    """
+    if len(rows) == 0:
+        return
+
+    fieldnames = []
+
+    if path.exists(file_path):
+        with open(file_path, newline="") as f:
+            fieldnames = next(csv.reader(f), [])
+
+    new_fieldnames = [key for row in rows for key in row if key not in fieldnames]
+    new_fieldnames = list(dict.fromkeys(new_fieldnames))
+
+    if fieldnames and not new_fieldnames:
+
+        with open(file_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writerows(rows)
+
+        return
+
+    old_rows = []
+
+    if fieldnames:
+        with open(file_path, newline="") as f:
+            old_rows = list(csv.DictReader(f))
+
+    os.makedirs(path.dirname(file_path) or ".", exist_ok=True)
+
+    with open(file_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames + new_fieldnames)
+        writer.writeheader()
+        writer.writerows(old_rows + rows)
+
+
+def result_ids_from_parquet(directory):
+
+    if not path.exists(directory):
+        return set()
+
+    import pyarrow.parquet as pq
+
+    result_ids = set()
+
+    for filename in os.listdir(directory):
+        if filename.endswith(".parquet"):
+            table = pq.read_table(
+                path.join(directory, filename), columns=[result_id_column]
+            )
+            result_ids.update(table.column(result_id_column).to_pylist())
+
+    return result_ids
+
+
+def schema_from(rows, schema=None):
+    """
+    Returns the schema of a Parquet table of rows, which has the columns of `schema` (the schema of the existing
+    table) followed by every new column of the rows.
+
+    The type of a new column is inferred from all of its non-null values, and a column whose values are all null (e.g.
+    `log_evidence` for searches without an evidence) is float64.
+    """
+    import pyarrow as pa
+
+    fields = list(schema) if schema is not None else []
+    names = {field.name for field in fields}
+
+    for name in dict.fromkeys(key for row in rows for key in row):
+
+        if name in names:
+            continue
+
+        values = [row[name] for row in rows if row.get(name) is not None]
+
+        data_type = pa.array(values).type if values else pa.float64()
+
+        fields.append(
+            pa.field(name, pa.float64() if pa.types.is_null(data_type) else data_type)
+        )
+
+    return pa.schema(fields)
+
+
+def output_to_parquet(rows, directory):
+    """
+    Write rows as a new part file of a Parquet dataset, which can be read as one table by `pyarrow.dataset`,
+    `pandas.read_parquet` and most analytics tools.
+
+    Every part file has the same schema. If the new rows have columns the dataset does not, the existing part files
+    are rewritten with the union of both sets of columns (as for the .csv table).
+    """
+    if len(rows) == 0:
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+
+    part_paths = sorted(
+        path.join(directory, filename)
+        for filename in os.listdir(directory)
+        if filename.endswith(".parquet")
+    )
+
+    schema = pq.read_schema(part_paths[0]) if part_paths else None
+
+    new_schema = schema_from(rows=rows, schema=schema)
+
+    if schema is not None and not new_schema.equals(schema):
+        for part_path in part_paths:
+            pq.write_table(
+                pa.Table.from_pylist(
+                    pq.read_table(part_path).to_pylist(), schema=new_schema
+                ),
+                part_path,
+            )
+
+    pq.write_table(
+        pa.Table.from_pylist(rows, schema=new_schema),
+        path.join(directory, f"part-{len(part_paths):05d}.parquet"),
+    )
+
+
+def export(aggregator, file_path, sigmas=(1.0, 3.0), processes=1):
+    """
+    Export the results of an aggregator to a table, appending only the results not already in the table.
+
+    Parameters
+    ----------
+    aggregator : af.Aggregator
+        The aggregator (which may be filtered) whose results are exported.
+    file_path : str
+        The path of the table. If it ends with `.csv` a .csv file is written, otherwise it is treated as the directory
+        of a Parquet dataset.
+    sigmas : (float,)
+        The sigma values the upper and lower errors of every parameter are computed at.
+    processes : int
+        The number of processes used to load and summarize the samples of every result.
+
+    Returns
+    -------
+    int
+        The number of rows added to the table.
+    """
+    if file_path.endswith(".csv"):
+        existing_ids = result_ids_from_csv(file_path=file_path)
+    else:
+        existing_ids = result_ids_from_parquet(directory=file_path)
+
+    rows = rows_from_aggregator(
+        aggregator=aggregator,
+        sigmas=sigmas,
+        exclude_ids=existing_ids,
+        processes=processes,
+    )
+
+    if file_path.endswith(".csv"):
+        output_to_csv(rows=rows, file_path=file_path)
+    else:
+        output_to_parquet(rows=rows, directory=file_path)
+
+    return len(rows)
@@ -0,0 +1,240 @@
+import json
+import os
+from os import path
+
+import numpy as np
+
+"""
+A compact summary of the `Samples` of a model-fit, output to the phase`s output directory when the phase finishes.
+
+Many aggregator workflows only need the median PDF model, errors at 1 and 3 sigma, the maximum log likelihood model
+and the log evidence. Computing these from the full samples requires every sample of every fit to be unpickled. The
+summary stores only these quantities (and the parameter names) in a small `samples_summary.json` file, which the
+aggregator reads by default, falling back to the full samples only when asked or when a result has no summary.
+"""
+
+summary_filename = "samples_summary.json"
+
+
+class SamplesSummary:
+    def __init__(
+        self,
+        parameter_names,
+        median_pdf_vector,
+        max_log_likelihood_vector,
+        upper_vectors,
+        lower_vectors,
+        log_evidence,
+        max_log_likelihood,
+        time=None,
+    ):
+        """
+        The summary of a `Samples` object.
+
+        Parameters
+        ----------
+        parameter_names : [str]
+            The names of every parameter of the model, in the same order as the vectors.
+        median_pdf_vector : [float]
+            The median PDF value of every parameter.
+        max_log_likelihood_vector : [float]
+            The maximum log likelihood value of every parameter.
+        upper_vectors : {float: [float]}
+            The value of every parameter at the upper sigma limit, for every sigma the summary was made with.
+        lower_vectors : {float: [float]}
+            The value of every parameter at the lower sigma limit, for every sigma the summary was made with.
+        log_evidence : float or None
+            The log evidence of the model-fit, if the non-linear search estimates it.
+        max_log_likelihood : float
+            The maximum log likelihood of the model-fit.
+        time : float or None
+            The run time of the non-linear search, if the samples have one.
+        """
+        self.parameter_names = parameter_names
+        self.median_pdf_vector = median_pdf_vector
+        self.max_log_likelihood_vector = max_log_likelihood_vector
+        self.upper_vectors = upper_vectors
+        self.lower_vectors = lower_vectors
+        self.log_evidence = log_evidence
+        self.max_log_likelihood = max_log_likelihood
+        self.time = time
+
+    @classmethod
+    def from_samples(cls, samples, sigmas=(1.0, 3.0)):
+
+        log_evidence = getattr(samples, "log_evidence", None)
+
+        return SamplesSummary(
+            parameter_names=list(samples.model.parameter_names),
+            median_pdf_vector=list(map(float, samples.median_pdf_vector)),
+            max_log_likelihood_vector=list(
+                map(float, samples.max_log_likelihood_vector)
+            ),
+            upper_vectors={
+                float(sigma): list(
+                    map(float, samples.vector_at_upper_sigma(sigma=sigma))
+                )
+                for sigma in sigmas
+            },
+            lower_vectors={
+                float(sigma): list(
+                    map(float, samples.vector_at_lower_sigma(sigma=sigma))
+                )
+                for sigma in sigmas
+            },
+            log_evidence=None if log_evidence is None else float(log_evidence),
+            max_log_likelihood=float(np.max(samples.log_likelihoods)),
+            time=getattr(samples, "time", None),
+        )
+
+    @property
+    def sigmas(self):
+        return sorted(self.upper_vectors.keys())
+
+    def vector_at_upper_sigma(self, sigma):
+        return self.upper_vectors[float(sigma)]
+
+    def vector_at_lower_sigma(self, sigma):
+        return self.lower_vectors[float(sigma)]
+
+    def error_vector_at_upper_sigma(self, sigma):
+        return [
+            upper - median
+            for upper, median in zip(
+                self.vector_at_upper_sigma(sigma=sigma), self.median_pdf_vector
+            )
+        ]
+
+    def error_vector_at_lower_sigma(self, sigma):
+        return [
+            median - lower
+            for lower, median in zip(
+                self.vector_at_lower_sigma(sigma=sigma), self.median_pdf_vector
+            )
+        ]
+
+    def median_pdf_instance_from(self, model):
+        """Returns the median PDF instance, using the model of the result (e.g. `agg_obj.model`)."""
+        return model.instance_from_vector(vector=self.median_pdf_vector)
+
+    def max_log_likelihood_instance_from(self, model):
+        """Returns the maximum log likelihood instance, using the model of the result (e.g. `agg_obj.model`)."""
+        return model.instance_from_vector(vector=self.max_log_likelihood_vector)
+
+    @property
+    def dict(self):
+        return {
+            "parameter_names": self.parameter_names,
+            "median_pdf_vector": self.median_pdf_vector,
+            "max_log_likelihood_vector": self.max_log_likelihood_vector,
+            "upper_vectors": {
+                str(key): value for key, value in self.upper_vectors.items()
+            },
+            "lower_vectors": {
+                str(key): value for key, value in self.lower_vectors.items()
+            },
+            "log_evidence": self.log_evidence,
+            "max_log_likelihood": self.max_log_likelihood,
+            "time": self.time,
+        }
+
+    @classmethod
+    def from_dict(cls, summary_dict):
+
+        return SamplesSummary(
+            parameter_names=summary_dict["parameter_names"],
+            median_pdf_vector=summary_dict["median_pdf_vector"],
+            max_log_likelihood_vector=summary_dict["max_log_likelihood_vector"],
+            upper_vectors={
+                float(key): value
+                for key, value in summary_dict["upper_vectors"].items()
+            },
+            lower_vectors={
+                float(key): value
+                for key, value in summary_dict["lower_vectors"].items()
+            },
+            log_evidence=summary_dict["log_evidence"],
+            max_log_likelihood=summary_dict["max_log_likelihood"],
+            time=summary_dict.get("time"),
+        )
+
+    def output_to_json(self, file_path):
+
+        tmp_path = f"{file_path}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump(self.dict, f)
+
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def from_json(cls, file_path):
+
+        with open(file_path) as f:
+            return SamplesSummary.from_dict(summary_dict=json.load(f))
+
+
+def output_summary(samples, output_path, sigmas=(1.0, 3.0)):
+    """
+    Output the summary of a `Samples` object to `output_path`, which is called after `phase.run()` using the
+    phase`s output path, e.g.
+
+        result = phase.run(dataset=imaging, mask=mask)
+
+        samples_summary.output_summary(
+            samples=result.samples, output_path=phase.search.paths.output_path
+        )
+    """
+    os.makedirs(output_path, exist_ok=True)
+
+    SamplesSummary.from_samples(samples=samples, sigmas=sigmas).output_to_json(
+        file_path=path.join(output_path, summary_filename)
+    )
+
+
+def summary_from_agg_obj(agg_obj, sigmas=(1.0, 3.0), use_samples=False):
+    """
+    Returns the `SamplesSummary` of one result of an aggregator.
+
+    The summary is read from the result`s `samples_summary.json` file. The full samples are only loaded if
+    `use_samples` is `True`, the result has no summary or the summary was not made at every input sigma. In the latter
+    two cases the summary is output, keeping the sigmas of any summary already output, so the samples are only loaded
+    once.
+    """
+    file_path = path.join(agg_obj.directory, summary_filename)
+
+    existing = None
+
+    if not use_samples and path.exists(file_path):
+
+        existing = SamplesSummary.from_json(file_path=file_path)
+
+        if all(float(sigma) in existing.upper_vectors for sigma in sigmas):
+            return existing
+
+    summary = SamplesSummary.from_samples(samples=agg_obj.samples, sigmas=sigmas)
+
+    if existing is not None:
+
+        for sigma in existing.sigmas:
+            summary.upper_vectors.setdefault(sigma, existing.upper_vectors[sigma])
+            summary.lower_vectors.setdefault(sigma, existing.lower_vectors[sigma])
+
+    if not use_samples:
+        summary.output_to_json(file_path=file_path)
+
+    return summary
+
+
+def SamplesSummaries(aggregator, sigmas=(1.0, 3.0), use_samples=False):
+    """
+    A generator of the `SamplesSummary` of every result in an aggregator, which can be used in place of
+    `agg.values("samples")` when only the summary quantities are needed.
+    """
+
+    def func(agg_obj):
+        return summary_from_agg_obj(
+            agg_obj=agg_obj, sigmas=sigmas, use_samples=use_samples
+        )
+
+    return aggregator.map(func=func)
@@ -0,0 +1,119 @@
+import os
+import time
+from os import path
+
+import autofit as af
+
+"""
+Watch the output directory of a running survey and load only the results of phases which have completed since the
+last update.
+
+A phase is complete when its output directory contains a completion marker file (by default the `.completed` file
+**PyAutoFit** writes when a non-linear search finishes). The output directory is polled, with the directories of
+completed phases excluded from later polls, so each update only lists the directories of phases still running and
+only loads the results of phases which are new.
+
+Functions subscribed to the `AggregatorWatcher` are called with an aggregator containing only the new results, for
+example to append them to a results table (see `results_table.py`) or to rerun the analysis of the `a1` - `a5`
+scripts on them.
+"""
+
+
+class AggregatorWatcher:
+    def __init__(self, directory, completion_marker=".completed", state_path=None):
+        """
+        Parameters
+        ----------
+        directory : str
+            The output directory of the survey, which is watched for completed phases.
+        completion_marker : str
+            The filename whose presence in a directory marks that the phase output there has completed.
+        state_path : str or None
+            If input, the directories of completed phases already loaded are stored in this file, so that a watcher
+            restarted after being stopped does not reload them.
+        """
+        self.directory = directory
+        self.completion_marker = completion_marker
+        self.state_path = state_path
+
+        self.completed_directories = set()
+        self.subscribers = []
+
+        if state_path is not None and path.exists(state_path):
+            with open(state_path) as f:
+                self.completed_directories = set(f.read().splitlines())
+
+    def subscribe(self, func):
+        """
+        Subscribe a function to the watcher, which is called with an `af.Aggregator` of every new completed phase
+        when it is found.
+        """
+        self.subscribers.append(func)
+        return func
+
+    def new_completed_directories(self):
+        """
+        Returns the directories containing the completion marker which have not been found by a previous update.
+
+        Directories already known to be complete are not descended into, so the cost of each poll depends on the
+        number of phases that are still running rather than the total number of phases.
+        """
+        new_directories = []
+
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+
+            dirnames[:] = [
+                dirname
+                for dirname in dirnames
+                if path.join(dirpath, dirname) not in self.completed_directories
+            ]
+
+            if dirpath in self.completed_directories:
+                continue
+
+            if self.completion_marker in filenames:
+                new_directories.append(dirpath)
+                dirnames[:] = []
+
+        return new_directories
+
+    def update(self):
+        """
+        Perform one poll of the output directory, returning a list of aggregators of every new completed phase and
+        passing each to the subscribed functions.
+        """
+        aggregators = []
+
+        for directory in self.new_completed_directories():
+
+            aggregator = af.Aggregator(directory=directory)
+
+            for func in self.subscribers:
+                func(aggregator)
+
+            aggregators.append(aggregator)
+
+            self.completed_directories.add(directory)
+
+            if self.state_path is not None:
+                with open(self.state_path, "a") as f:
+                    f.write(f"{directory}\n")
+
+        return aggregators
+
+    def watch(self, poll_interval=60.0, timeout=None):
+        """
+        A generator which polls the output directory every `poll_interval` seconds and yields an aggregator of every
+        new completed phase, stopping after `timeout` seconds (or never if `timeout` is `None`).
+        """
+        start = time.time()
+
+        while True:
+
+            for aggregator in self.update():
+                yield aggregator
+
+            if timeout is not None and time.time() - start + poll_interval > timeout:
+                return
+
+            time.sleep(poll_interval)
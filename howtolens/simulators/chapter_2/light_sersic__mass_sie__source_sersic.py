@@ -1,6 +1,8 @@
 from os import path
 import autolens as al
 
+from simulators.tools import simulation_cache
+
 """
 This script simulates `Imaging` of a strong lens where:
 
@@ -99,15 +101,8 @@ tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
 We can now pass this simulator a tracer, which creates the ray-traced image plotted above and simulates it as an
 imaging dataset.
 """
-imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-"""Output our simulated dataset to the dataset path as .fits files"""
-
-imaging.output_to_fits(
-    image_path=path.join(dataset_path, "image.fits"),
-    psf_path=path.join(dataset_path, "psf.fits"),
-    noise_map_path=path.join(dataset_path, "noise_map.fits"),
-    overwrite=True,
+imaging = simulation_cache.imaging_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
 )
 
 """
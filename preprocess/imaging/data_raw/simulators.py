@@ -1,250 +1,168 @@
-import autofit as af
-from astropy.io import fits
-import autolens as al
-import autolens.plot as aplt
-
+import inspect
 import os
+from multiprocessing import Pool
 
+import numpy as np
+from astropy.io import fits
+import autolens as al
 
-def simulate_all_imaging(dataset_path):
-
-    simulate_imaging(dataset_path=dataset_path)
-    simulate_imaging_in_counts(dataset_path=dataset_path)
-    simulate_imaging_in_adus(dataset_path=dataset_path)
-    simulate_imaging_with_large_stamp(dataset_path=dataset_path)
-    simulate_imaging_with_small_stamp(dataset_path=dataset_path)
-    simulate_imaging_noise_map_wht(dataset_path=dataset_path)
-    simulate_imaging_with_offset_centre(dataset_path=dataset_path)
-    simulate_imaging_with_even_psf(dataset_path=dataset_path)
-    simulate_imaging_with_large_psf(dataset_path=dataset_path)
-    simulate_imaging_with_unnormalized_psf(dataset_path=dataset_path)
-    simulate_imaging_with_psf_with_offset_centre(dataset_path=dataset_path)
-
-
-def simulate_imaging(dataset_path):
-
-    imaging_path = f"{dataset_path}/imaging"
-
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
-
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
-
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
-
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
-
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
-
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
-
-    new_hdul = fits.HDUList()
-    new_hdul.append(fits.ImageHDU(imaging.image.in_2d))
-    new_hdul.append(fits.ImageHDU(imaging.noise_map.in_2d))
-    new_hdul.append(fits.ImageHDU(imaging.psf.in_2d))
-
-    if os.path.exists(f"{imaging_path}/multiple_hdus.fits"):
-        os.remove(f"{imaging_path}/multiple_hdus.fits")
-
-    new_hdul.writeto(f"{imaging_path}/multiple_hdus.fits")
-
-
-def simulate_imaging_in_counts(dataset_path):
-
-    imaging_path = f"{dataset_path}/imaging_in_counts"
-
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
-
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
+from simulators.tools import simulation_cache
+
+"""
+Simulate the example `Imaging` datasets of the `data_raw` folder used by the preprocessing tutorials, where every
+dataset is a variant of the same strong lens (e.g. a large stamp, an offset centre, an even PSF, an image in counts).
+
+The variants share their setup, so they are simulated as follows:
+
+ 1) The lens and source galaxies and the variants are defined once (see `tracer_from` and `variants`).
+ 2) The image of the tracer is computed once, on one grid large enough to contain the padded grid of every variant.
+ 3) The padded image of every variant is cut from this base image. A variant whose lens is offset from the centre is
+    cut from an offset region of the base image, which requires the offset to be a whole number of pixels.
+ 4) Every variant convolves its padded image with its own PSF, adds noise and is output, in a pool of processes.
+
+Every variant is output with a `simulation_key.json` (see `simulators/tools/simulation_cache.py`), so importing and
+calling `simulate_all_imaging` again only simulates variants whose inputs changed (including how they are output, see
+`outputs`) or whose files are missing, and the tutorials start straight away once the datasets exist.
+"""
+
+pixel_scales = 0.1
+
+"""The settings of every variant, which are the shape of its grid, the centre of its lens and the setup of its PSF."""
+variants = {
+    "imaging": {},
+    "imaging_in_counts": {},
+    "imaging_in_adus": {},
+    "imaging_with_large_stamp": {"shape_2d": (800, 800)},
+    "imaging_with_small_stamp": {"shape_2d": (50, 50)},
+    "imaging_noise_map_wht": {},
+    "imaging_offset_centre": {"centre": (1.0, 1.0)},
+    "imaging_with_even_psf": {},
+    "imaging_with_large_psf": {"psf_shape_2d": (101, 101)},
+    "imaging_with_unnormalized_psf": {"psf_factor": 10.0},
+    "imaging_with_off_centre_psf": {"psf_centre": (0.1, 0.1)},
+}
+
+
+def settings_from(name):
+    """Returns the settings of a variant, filling in the settings it does not change."""
+    return {
+        "shape_2d": (130, 130),
+        "centre": (0.0, 0.0),
+        "psf_shape_2d": (21, 21),
+        "psf_centre": (0.0, 0.0),
+        "psf_factor": 1.0,
+        **variants[name],
+    }
+
+
+def tracer_from(centre=(0.0, 0.0)):
 
     lens_galaxy = al.Galaxy(
         redshift=0.5,
         bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
+            centre=centre, intensity=0.3, effective_radius=1.0, sersic_index=2.0
         ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
+        mass=al.mp.SphericalIsothermal(centre=centre, einstein_radius=1.2),
     )
 
     source_galaxy = al.Galaxy(
         redshift=1.0,
         bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
+            centre=centre, intensity=0.2, effective_radius=1.0, sersic_index=1.5
         ),
     )
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
-
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-    exposure_time_map = al.Array.full(
-        fill_value=1000.0, shape_2d=grid.shape_2d, pixel_scales=grid.pixel_scales
-    )
-    exposure_time_map.output_to_fits(
-        file_path=f"{imaging_path}/exposure_time_map.fits", overwrite=True
-    )
-
-    imaging.data = al.preprocess.array_eps_to_counts(
-        array_eps=imaging.image, exposure_time_map=exposure_time_map
-    )
-    imaging.noise_map = al.preprocess.array_eps_to_counts(
-        array_eps=imaging.noise_map, exposure_time_map=exposure_time_map
-    )
-
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
-
-
-def simulate_imaging_in_adus(dataset_path):
+    return al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
 
-    imaging_path = f"{dataset_path}/imaging_in_adus"
 
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
-
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
-
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
+def simulator_from(settings):
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
+    psf = al.Kernel.from_gaussian(
+        shape_2d=settings["psf_shape_2d"],
+        sigma=0.05,
+        pixel_scales=pixel_scales,
+        centre=settings["psf_centre"],
     )
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+    if settings["psf_factor"] != 1.0:
+        psf = settings["psf_factor"] * psf
 
-    simulator = al.SimulatorImaging(
+    return al.SimulatorImaging(
         exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
     )
 
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
 
-    exposure_time_map = al.Array.full(
-        fill_value=1000.0, shape_2d=grid.shape_2d, pixel_scales=grid.pixel_scales
-    )
-    exposure_time_map.output_to_fits(
-        file_path=f"{imaging_path}/exposure_time_map.fits", overwrite=True
+def padded_shape_from(settings):
+    """Returns the shape of the padded grid of a variant, which the PSF convolution requires to avoid edge effects."""
+    return (
+        settings["shape_2d"][0] + settings["psf_shape_2d"][0] - 1,
+        settings["shape_2d"][1] + settings["psf_shape_2d"][1] - 1,
     )
 
-    imaging.data = al.preprocess.array_eps_to_adus(
-        array_eps=imaging.image, exposure_time_map=exposure_time_map, gain=4.0
-    )
-    imaging.noise_map = al.preprocess.array_eps_to_adus(
-        array_eps=imaging.noise_map, exposure_time_map=exposure_time_map, gain=4.0
-    )
 
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
+def offset_pixels_from(settings):
+    """Returns the (y,x) offset in pixels of the lens of a variant, which must be a whole number of pixels."""
+    offset = tuple(round(value / pixel_scales) for value in settings["centre"])
 
+    if any(
+        abs(pixels * pixel_scales - value) > 1.0e-8
+        for pixels, value in zip(offset, settings["centre"])
+    ):
+        raise ValueError(
+            f"The centre {settings['centre']} is not a whole number of pixels, so cannot be cut from the base image."
+        )
 
-def simulate_imaging_with_large_stamp(dataset_path):
+    return offset
 
-    imaging_path = f"{dataset_path}/imaging_with_large_stamp"
 
-    grid = al.Grid.uniform(shape_2d=(800, 800), pixel_scales=0.1, sub_size=1)
+def base_shape_from(names):
+    """
+    Returns the shape of the base image, which contains the padded grid of every variant offset by its centre. The
+    base image and every padded grid must have the same parity, so every padded grid is cut from the middle pixels of
+    the base image.
+    """
+    shapes = []
 
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
+    for name in names:
 
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
+        settings = settings_from(name=name)
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
+        padded_shape_2d = padded_shape_from(settings=settings)
+        offset = offset_pixels_from(settings=settings)
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+        shapes.append(
+            (
+                padded_shape_2d[0] + 2 * abs(offset[0]),
+                padded_shape_2d[1] + 2 * abs(offset[1]),
+            )
+        )
 
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
+    parities = {(shape[0] % 2, shape[1] % 2) for shape in shapes}
 
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+    if len(parities) > 1:
+        raise ValueError(
+            "The padded grids of the variants have different parities, so cannot be cut from one base image."
+        )
 
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
+    return max(shape[0] for shape in shapes), max(shape[1] for shape in shapes)
 
 
-def simulate_imaging_with_small_stamp(dataset_path):
+def padded_image_from(base_image_2d, settings):
+    """
+    Returns the padded image of a variant cut from the base image, where the region is offset so the lens is at the
+    centre of the variant. A lens offset by +y (up) is cut from lower rows of the base image and a lens offset by +x
+    (right) from columns to the left.
+    """
+    padded_shape_2d = padded_shape_from(settings=settings)
+    offset = offset_pixels_from(settings=settings)
 
-    imaging_path = f"{dataset_path}/imaging_with_small_stamp"
+    y0 = (base_image_2d.shape[0] - padded_shape_2d[0]) // 2 + offset[0]
+    x0 = (base_image_2d.shape[1] - padded_shape_2d[1]) // 2 - offset[1]
 
-    grid = al.Grid.uniform(shape_2d=(50, 50), pixel_scales=0.1, sub_size=1)
+    return base_image_2d[y0 : y0 + padded_shape_2d[0], x0 : x0 + padded_shape_2d[1]]
 
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
 
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
-
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
-
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
-
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+def output_imaging(imaging, imaging_path):
 
     imaging.output_to_fits(
         image_path=f"{imaging_path}/image.fits",
@@ -254,245 +172,230 @@ def simulate_imaging_with_small_stamp(dataset_path):
     )
 
 
-def simulate_imaging_with_offset_centre(dataset_path):
+def output_imaging_with_multiple_hdus(imaging, imaging_path):
 
-    imaging_path = f"{dataset_path}/imaging_offset_centre"
+    output_imaging(imaging=imaging, imaging_path=imaging_path)
 
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
+    new_hdul = fits.HDUList()
+    new_hdul.append(fits.ImageHDU(imaging.image.in_2d))
+    new_hdul.append(fits.ImageHDU(imaging.noise_map.in_2d))
+    new_hdul.append(fits.ImageHDU(imaging.psf.in_2d))
 
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
+    if os.path.exists(f"{imaging_path}/multiple_hdus.fits"):
+        os.remove(f"{imaging_path}/multiple_hdus.fits")
 
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(1.0, 1.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(1.0, 1.0), einstein_radius=1.2),
-    )
+    new_hdul.writeto(f"{imaging_path}/multiple_hdus.fits")
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(1.0, 1.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+def output_exposure_time_map_from(imaging, imaging_path, exposure_time):
 
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
+    exposure_time_map = al.Array.full(
+        fill_value=exposure_time,
+        shape_2d=imaging.image.shape_2d,
+        pixel_scales=imaging.image.pixel_scales,
     )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
+    exposure_time_map.output_to_fits(
+        file_path=f"{imaging_path}/exposure_time_map.fits", overwrite=True
     )
 
+    return exposure_time_map
 
-def simulate_imaging_noise_map_wht(dataset_path):
-
-    imaging_path = f"{dataset_path}/imaging_noise_map_wht"
 
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
-
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
-
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
+def output_imaging_in_counts(imaging, imaging_path, exposure_time):
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
+    exposure_time_map = output_exposure_time_map_from(
+        imaging=imaging, imaging_path=imaging_path, exposure_time=exposure_time
     )
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
-
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
+    imaging.data = al.preprocess.array_eps_to_counts(
+        array_eps=imaging.image, exposure_time_map=exposure_time_map
     )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-    imaging.noise_map = 1.0 / imaging.noise_map ** 2.0
-
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
+    imaging.noise_map = al.preprocess.array_eps_to_counts(
+        array_eps=imaging.noise_map, exposure_time_map=exposure_time_map
     )
 
+    output_imaging(imaging=imaging, imaging_path=imaging_path)
 
-def simulate_imaging_with_large_psf(dataset_path):
-
-    imaging_path = f"{dataset_path}/imaging_with_large_psf"
 
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
+def output_imaging_in_adus(imaging, imaging_path, exposure_time, gain):
 
-    psf = al.Kernel.from_gaussian(shape_2d=(101, 101), sigma=0.05, pixel_scales=0.1)
-
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
+    exposure_time_map = output_exposure_time_map_from(
+        imaging=imaging, imaging_path=imaging_path, exposure_time=exposure_time
     )
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
-
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
-
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
+    imaging.data = al.preprocess.array_eps_to_adus(
+        array_eps=imaging.image, exposure_time_map=exposure_time_map, gain=gain
     )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
+    imaging.noise_map = al.preprocess.array_eps_to_adus(
+        array_eps=imaging.noise_map, exposure_time_map=exposure_time_map, gain=gain
     )
 
+    output_imaging(imaging=imaging, imaging_path=imaging_path)
 
-def simulate_imaging_with_even_psf(dataset_path):
-
-    imaging_path = f"{dataset_path}/imaging_with_even_psf"
-
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
 
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
-
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
+def output_imaging_noise_map_wht(imaging, imaging_path):
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
+    imaging.noise_map = 1.0 / imaging.noise_map ** 2.0
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+    output_imaging(imaging=imaging, imaging_path=imaging_path)
 
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
 
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+def output_imaging_with_even_psf(imaging, imaging_path, psf_shape_2d, psf_sigma):
 
     imaging.psf = al.Kernel.from_gaussian(
-        shape_2d=(22, 22), sigma=0.05, pixel_scales=0.1
+        shape_2d=psf_shape_2d, sigma=psf_sigma, pixel_scales=pixel_scales
     )
 
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
+    output_imaging(imaging=imaging, imaging_path=imaging_path)
 
 
-def simulate_imaging_with_unnormalized_psf(dataset_path):
+"""
+How every variant is output, which is the function it is output with, the settings passed to this function and the
+files it outputs besides the image, noise-map and PSF. Variants not listed are output as they are simulated.
+"""
+outputs = {
+    "imaging": {
+        "function": output_imaging_with_multiple_hdus,
+        "settings": {},
+        "files": ["multiple_hdus.fits"],
+    },
+    "imaging_in_counts": {
+        "function": output_imaging_in_counts,
+        "settings": {"exposure_time": 1000.0},
+        "files": ["exposure_time_map.fits"],
+    },
+    "imaging_in_adus": {
+        "function": output_imaging_in_adus,
+        "settings": {"exposure_time": 1000.0, "gain": 4.0},
+        "files": ["exposure_time_map.fits"],
+    },
+    "imaging_noise_map_wht": {
+        "function": output_imaging_noise_map_wht,
+        "settings": {},
+        "files": [],
+    },
+    "imaging_with_even_psf": {
+        "function": output_imaging_with_even_psf,
+        "settings": {"psf_shape_2d": (22, 22), "psf_sigma": 0.05},
+        "files": [],
+    },
+}
 
-    imaging_path = f"{dataset_path}/imaging_with_unnormalized_psf"
 
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
+def output_from(name):
+    """Returns how a variant is output, filling in the default output for variants not in `outputs`."""
+    return outputs.get(name, {"function": output_imaging, "settings": {}, "files": []})
 
-    psf = al.Kernel.from_gaussian(shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1)
 
-    psf = 10.0 * psf
+def key_from(name):
+    """
+    Returns the simulation key of a variant, a hash of its name, tracer, simulator, grid shape and output, where the
+    output is the source code of its output function and its settings (so changing e.g. the gain or the weight map
+    conversion simulates the variant again).
+    """
+    settings = settings_from(name=name)
+    output = output_from(name=name)
+
+    return simulation_cache.key_from(
+        name,
+        tracer_from(centre=settings["centre"]),
+        simulator_from(settings=settings),
+        settings["shape_2d"],
+        inspect.getsource(output["function"]),
+        output["settings"],
+    )
+
+
+def is_simulated(dataset_path, name):
+    """
+    Returns `True` if a variant was simulated with its current key and every file it outputs exists, including the
+    files particular to its output (e.g. `multiple_hdus.fits` or `exposure_time_map.fits`).
+    """
+    imaging_path = f"{dataset_path}/{name}"
+
+    file_names = ["image.fits", "noise_map.fits", "psf.fits"]
+    file_names += output_from(name=name)["files"]
+
+    return simulation_cache.is_cached(
+        key=key_from(name=name),
+        dataset_path=imaging_path,
+        file_paths=[f"{imaging_path}/{file_name}" for file_name in file_names],
+    )
+
+
+def _simulate_variant(args):
+    """
+    Convolve the padded image of a variant with its PSF, add noise and output it, which is performed by each process
+    of the pool.
+    """
+    dataset_path, name, padded_image_2d = args
+
+    imaging_path = f"{dataset_path}/{name}"
+
+    simulator = simulator_from(settings=settings_from(name=name))
+
+    padded_image = al.Array.manual_2d(array=padded_image_2d, pixel_scales=pixel_scales)
+
+    imaging = simulator.from_image(image=padded_image.in_1d_binned)
+    imaging = imaging.trimmed_after_convolution_from(
+        kernel_shape=simulator.psf.shape_2d
+    )
+
+    output = output_from(name=name)
+
+    output["function"](imaging=imaging, imaging_path=imaging_path, **output["settings"])
+
+    simulation_cache.output_key(key=key_from(name=name), dataset_path=imaging_path)
+
+
+def simulate_all_imaging(dataset_path, processes=1):
+    """
+    Simulate every variant of `variants` which has not already been simulated with the same inputs and output it to
+    its folder in `dataset_path`.
+
+    Parameters
+    ----------
+    dataset_path : str
+        The folder every variant is output to a sub-folder of (e.g. `dataset_path/imaging_with_large_stamp`).
+    processes : int
+        The number of processes the variants are convolved, noised and output in.
+
+    Returns
+    -------
+    [str]
+        The names of the variants which were simulated.
+    """
+    names = [name for name in variants if not is_simulated(dataset_path, name)]
+
+    if not names:
+        return names
 
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
+    base_shape_2d = base_shape_from(names=names)
 
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
+    base_image = tracer_from().image_from_grid(
+        grid=al.Grid.uniform(
+            shape_2d=base_shape_2d, pixel_scales=pixel_scales, sub_size=1
+        )
     )
 
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+    base_image_2d = np.asarray(base_image.in_2d)
 
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
+    args = [
+        (
+            dataset_path,
+            name,
+            padded_image_from(
+                base_image_2d=base_image_2d, settings=settings_from(name=name)
+            ),
+        )
+        for name in names
+    ]
 
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+    if processes == 1:
+        for arg in args:
+            _simulate_variant(arg)
+    else:
+        with Pool(processes=processes) as pool:
+            pool.map(_simulate_variant, args)
 
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
-
-
-def simulate_imaging_with_psf_with_offset_centre(dataset_path):
-
-    imaging_path = f"{dataset_path}/imaging_with_off_centre_psf"
-
-    grid = al.Grid.uniform(shape_2d=(130, 130), pixel_scales=0.1, sub_size=1)
-
-    psf = al.Kernel.from_gaussian(
-        shape_2d=(21, 21), sigma=0.05, pixel_scales=0.1, centre=(0.1, 0.1)
-    )
-
-    lens_galaxy = al.Galaxy(
-        redshift=0.5,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.3, effective_radius=1.0, sersic_index=2.0
-        ),
-        mass=al.mp.SphericalIsothermal(centre=(0.0, 0.0), einstein_radius=1.2),
-    )
-
-    source_galaxy = al.Galaxy(
-        redshift=1.0,
-        bulge=al.lp.SphericalSersic(
-            centre=(0.0, 0.0), intensity=0.2, effective_radius=1.0, sersic_index=1.5
-        ),
-    )
-
-    tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
-
-    simulator = al.SimulatorImaging(
-        exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
-    )
-
-    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
-
-    imaging.output_to_fits(
-        image_path=f"{imaging_path}/image.fits",
-        noise_map_path=f"{imaging_path}/noise_map.fits",
-        psf_path=f"{imaging_path}/psf.fits",
-        overwrite=True,
-    )
+    return names
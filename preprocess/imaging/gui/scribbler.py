@@ -4,6 +4,7 @@ import matplotlib
 
 matplotlib.use("TkAgg")
 import matplotlib.pyplot as plt
+from matplotlib.transforms import Bbox
 from skimage.transform import rescale
 
 # This Scribbler tool is used for drawing custom masks and noise-maps via a GUI to images, see the other scripts in
@@ -11,6 +12,11 @@ from skimage.transform import rescale
 
 # This script is Adapted from https://gist.github.com/brikeats/4f63f867fd8ea0f196c78e9b835150ab
 
+# The masks of every scribble are maintained incrementally as circles are drawn, with every circle only updating the
+# pixels in its bounding box. Each scribble keeps a count of the circles covering every pixel, so the last circle can
+# be undone without recomputing the mask. The canvas is updated by blitting only the region of the new circle and brush,
+# with a full redraw only needed when a circle is undone or the window is resized.
+
 
 class Scribbler:
     def __init__(self, image, segment_names=None, title="Draw mask", cmap=None):
@@ -39,6 +45,7 @@ class Scribbler:
         self.figure.canvas.mpl_connect("motion_notify_event", self.on_mouse_motion)
         self.figure.canvas.mpl_connect("button_press_event", self.on_mouse_down)
         self.figure.canvas.mpl_connect("button_release_event", self.on_mouse_up)
+        self.figure.canvas.mpl_connect("draw_event", self.on_draw)
 
         # brush
         self.brush_radius = int(image.shape[0] * 0.05)
@@ -47,13 +54,21 @@ class Scribbler:
         self.brush_color = "b"
         self.brush = None
 
+        # the canvas without the brush, which is restored before the brush is drawn at its new position
+        self.background = None
+
         # scribbles
         if not segment_names:
             segment_names = [str(num + 1) for num in range(2)]
         self.scribble_colors = "gr"
         self.scribbles = OrderedDict()
+        self.counts = OrderedDict()
+        self.masks = OrderedDict()
         for name in segment_names:
             self.scribbles[name] = []
+            self.counts[name] = np.zeros(self.im.shape[:2], dtype="int32")
+            self.masks[name] = np.zeros(self.im.shape[:2], dtype=bool)
+        self.active_name = segment_names[0]
         self.active_scribble = self.scribbles[segment_names[0]]
         self.active_scribble_color = self.scribble_colors[0]
         self.mouse_is_down = False
@@ -64,6 +79,12 @@ class Scribbler:
         plt.show()
         self.figure.canvas.start_event_loop(timeout=-1)
 
+    def on_draw(self, event):
+        # after a full redraw, store the canvas (without the animated brush) and draw the brush over it
+        self.background = self.figure.canvas.copy_from_bbox(self.ax.bbox)
+        if self.brush:
+            self.ax.draw_artist(self.brush)
+
     def on_mouse_up(self, event):
         self.mouse_is_down = False
 
@@ -76,24 +97,32 @@ class Scribbler:
         self.add_circle_to_scribble(center)
 
     def on_mouse_motion(self, event):
+        if event.inaxes != self.ax:
+            return
+
         center = (event.xdata, event.ydata)
 
         # draw the bush circle
         if self.brush:
+            old_extent = self.brush.get_window_extent()
             self.brush.center = center
         else:
+            old_extent = None
             self.brush = matplotlib.patches.Circle(
                 center,
                 radius=self.brush_radius,
                 edgecolor=self.brush_color,
                 facecolor="none",
                 zorder=1e6,
+                animated=True,
             )  # always on top
             self.ax.add_patch(self.brush)
 
         # add to the scribble, if mouse is down
         if self.mouse_is_down:
-            self.add_circle_to_scribble(center)
+            self.add_circle_to_scribble(center, old_extent=old_extent)
+        else:
+            self.blit(extents=[old_extent])
 
     def on_keypress(self, event):
         if event.key in ["q", "Q", "escape"]:
@@ -109,10 +138,40 @@ class Scribbler:
         elif event.key in [str(num + 1) for num in range(len(self.scribbles))]:
             num = int(event.key) - 1
             name = list(self.scribbles.keys())[num]
+            self.active_name = name
             self.active_scribble = self.scribbles[name]
             self.active_scribble_color = self.scribble_colors[num]
 
-    def add_circle_to_scribble(self, center):
+    def blit(self, extents, circle=None):
+        """
+        Update only the changed region of the canvas: the background (which includes every scribble circle) is
+        restored, the new circle is drawn into it and stored, the brush is drawn on top and the union of the extents
+        of the circle and the old and new brush is blitted to the screen.
+        """
+        canvas = self.figure.canvas
+
+        if self.background is None:
+            canvas.draw()
+            return
+
+        canvas.restore_region(self.background)
+
+        extents = [extent for extent in extents if extent is not None]
+
+        if circle is not None:
+            self.ax.draw_artist(circle)
+            self.background = canvas.copy_from_bbox(self.ax.bbox)
+            extents.append(circle.get_window_extent())
+
+        if self.brush:
+            self.ax.draw_artist(self.brush)
+            extents.append(self.brush.get_window_extent())
+
+        if extents:
+            bbox = Bbox.union(extents).padded(2)
+            canvas.blit(Bbox.intersection(bbox, self.ax.bbox) or self.ax.bbox)
+
+    def add_circle_to_scribble(self, center, old_extent=None):
         circle = matplotlib.patches.Circle(
             center,
             radius=self.brush_radius,
@@ -122,27 +181,38 @@ class Scribbler:
         self.ax.add_patch(circle)
         self.active_scribble.append(circle)
         self.num_patches += 1
-        self.figure.canvas.draw()
+        self.update_mask(
+            name=self.active_name, center=center, radius=self.brush_radius, value=1
+        )
+        self.blit(extents=[old_extent], circle=circle)
 
     def remove_circle_from_scribble(self):
         if self.active_scribble:
             last_circle = self.active_scribble.pop()
             last_circle.remove()
             self.num_patches -= 1
+            self.update_mask(
+                name=self.active_name,
+                center=last_circle.center,
+                radius=last_circle.radius,
+                value=-1,
+            )
             self.figure.canvas.draw()
 
     def enlarge_brush(self):
         self.brush_radius += self.radius_increment
         if self.brush:
+            old_extent = self.brush.get_window_extent()
             self.brush.radius = self.brush_radius
-            self.figure.canvas.draw()
+            self.blit(extents=[old_extent])
 
     def shrink_brush(self):
         self.brush_radius -= self.radius_increment
         self.brush_radius = max([self.brush_radius, self.min_radius])
         if self.brush:
+            old_extent = self.brush.get_window_extent()
             self.brush.radius = self.brush_radius
-            self.figure.canvas.draw()
+            self.blit(extents=[old_extent])
 
     def quit_(self):
         plt.close()
@@ -163,12 +233,42 @@ class Scribbler:
         plt.show()
         return junk_mask
 
+    def circle_from(self, center, radius):
+        """
+        Returns the slices of the bounding box of a circle in the image and the circle within that box, so a circle
+        only ever touches the pixels of its bounding box.
+        """
+        if center[0] is None or center[1] is None:
+            return None, None
+
+        shape = self.im.shape[:2]
+
+        y0 = max(int(np.floor(center[1] - radius)), 0)
+        y1 = min(int(np.ceil(center[1] + radius)) + 1, shape[0])
+        x0 = max(int(np.floor(center[0] - radius)), 0)
+        x1 = min(int(np.ceil(center[0] + radius)) + 1, shape[1])
+
+        if y0 >= y1 or x0 >= x1:
+            return None, None
+
+        yy, xx = np.ogrid[y0:y1, x0:x1]
+        circle_mask = (yy - center[1]) ** 2 + (xx - center[0]) ** 2 <= radius ** 2
+
+        return (slice(y0, y1), slice(x0, x1)), circle_mask
+
+    def update_mask(self, name, center, radius, value):
+        """Add (value=1) or remove (value=-1) a circle from the count and mask of a scribble."""
+        box, circle_mask = self.circle_from(center=center, radius=radius)
+        if box is None:
+            return
+        self.counts[name][box][circle_mask] += value
+        self.masks[name][box] = self.counts[name][box] > 0
+
     def add_circle_to_mask(self, center, radius, mask):
-        if not center[0] or not center[1]:
+        box, circle_mask = self.circle_from(center=center, radius=radius)
+        if box is None:
             return
-        xx, yy = np.mgrid[: self.im.shape[0], : self.im.shape[1]]
-        circle_mask = (xx - center[1]) ** 2 + (yy - center[0]) ** 2 <= radius ** 2
-        mask[circle_mask] = 1
+        mask[box][circle_mask] = 1
 
     def circles_to_mask(self, centers, radii):
         mask = np.zeros(self.im.shape[:2], dtype=bool)
@@ -177,13 +277,4 @@ class Scribbler:
         return mask
 
     def get_scribble_masks(self):
-        masks = {}
-        for name, scribble in self.scribbles.items():
-            if len(scribble) == 0:
-                masks[name] = np.zeros(self.im.shape, dtype=bool)
-            else:
-                centers = [circle.center for circle in scribble]
-                radii = [circle.radius for circle in scribble]
-                if centers:
-                    masks[name] = self.circles_to_mask(centers, radii)
-        return masks
+        return {name: mask.copy() for name, mask in self.masks.items()}
@@ -94,3 +94,42 @@ file in our pipelines!
 
 # %%
 mask.output_to_fits(file_path=dataset_path + "mask.fits", overwrite=True)
+
+# %%
+"""
+__Masks For Large Samples__
+
+For samples of thousands of lenses, the `MaskBuilder` in `preprocess/imaging/tools/mask_builder.py` makes the masks of
+a batch of images at once, without any interaction. It smooths the images with an FFT, thresholds their S/N as above,
+removes small regions (noise peaks) and regions far from the lens (unrelated objects), and dilates what remains by a
+margin so the faint outskirts of the arcs are fitted.
+
+These masks usually fit far fewer pixels than a circular mask large enough to contain every lens of the sample.
+"""
+
+# %%
+from preprocess.imaging.tools import mask_builder
+
+builder = mask_builder.MaskBuilder(
+    pixel_scales=image.pixel_scales,
+    blurring_gaussian_sigma=blurring_gaussian_sigma,
+    signal_to_noise_threshold=signal_to_noise_threshold,
+    min_region_pixels=10,
+    max_region_radius=3.0,
+    margin=0.2,
+    psf_shape_2d=(21, 21),
+)
+
+images = np.stack([image.in_2d])
+noise_maps = np.stack([noise_map.in_2d])
+
+masks = builder.masks_from(images=images, noise_maps=noise_maps)
+
+aplt.Array(array=image, mask=masks[0])
+
+circular_mask = al.Mask2D.circular(
+    shape_2d=image.shape_2d, pixel_scales=image.pixel_scales, radius=3.0
+)
+
+print(f"Fitted pixels (MaskBuilder) = {masks[0].pixels_in_mask}")
+print(f"Fitted pixels (circular) = {circular_mask.pixels_in_mask}")
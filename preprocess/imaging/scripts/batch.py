@@ -0,0 +1,126 @@
+# %%
+"""
+__Preprocess Batch__
+
+The tutorials `p1_image.py` - `p5_positions.py` preprocess one lens at a time, inspecting every step by eye. Once you
+know how your data needs to be preprocessed, a large sample of lenses can be preprocessed without any interaction
+using the batch preprocessor in `preprocess/imaging/tools/batch.py`.
+
+This tutorial preprocesses every lens in the `data_raw` folder in one call.
+"""
+
+# %%
+from pyprojroot import here
+
+workspace_path = str(here())
+#%cd $workspace_path
+print(f"Working Directory has been set to `{workspace_path}`")
+
+from os import path
+import json
+
+from preprocess.imaging.tools import batch
+
+# %%
+"""
+Every folder of the `data_raw` folder containing an `image.fits` is a lens, which must also contain its
+`noise_map.fits` and `psf.fits`. The preprocessed data of every lens is output to the folder of the same name in
+`output_path`.
+"""
+
+# %%
+raw_path = path.join("preprocess", "imaging", "data_raw")
+output_path = path.join("dataset", "imaging", "preprocessed")
+
+# %%
+"""
+This populates the `data_raw` path with example simulated `Imaging` data-sets.
+"""
+
+# %%
+from preprocess.imaging.data_raw import simulators
+
+simulators.simulate_all_imaging(dataset_path=raw_path)
+
+# %%
+"""
+The config shared by every lens is passed as `defaults`. Here every lens has a pixel scale of 0.1", is trimmed or
+padded to 130 x 130 pixels, has its PSF trimmed to 21 x 21 pixels and is given a circular mask of radius 3.0".
+
+The mask entry is the name of a `Mask2D` constructor and its arguments, so any mask in `p4_mask.py` can be used, e.g.
+`{"type": "circular_annular", "inner_radius": 0.5, "outer_radius": 2.5}`.
+"""
+
+# %%
+defaults = {
+    "pixel_scales": 0.1,
+    "new_shape": (130, 130),
+    "psf_new_shape": (21, 21),
+    "mask": {"type": "circular", "radius": 3.0},
+}
+
+# %%
+"""
+Lenses which differ from the defaults have a `preprocess.json` file in their folder, whose entries override the
+defaults. The lenses `imaging_in_counts` and `imaging_in_adus` must be converted to electrons per second using their
+exposure time maps (and gain), and the noise-map of `imaging_noise_map_wht` is a weight map.
+
+We can also give a lens the positions of its multiple images (see `p5_positions.py`).
+"""
+
+# %%
+lens_configs = {
+    "imaging_in_counts": {
+        "units": "counts",
+        "exposure_time_map": "exposure_time_map.fits",
+    },
+    "imaging_in_adus": {
+        "units": "adus",
+        "exposure_time_map": "exposure_time_map.fits",
+        "gain": 4.0,
+    },
+    "imaging_noise_map_wht": {"noise_map_is_weight_map": True},
+    "imaging": {
+        "positions": [[(0.8, 1.45), (1.78, -0.4), (-0.95, 1.38), (-0.83, -1.04)]]
+    },
+}
+
+for lens_name, lens_config in lens_configs.items():
+    with open(path.join(raw_path, lens_name, batch.config_filename), "w") as f:
+        json.dump(lens_config, f, indent=4)
+
+# %%
+"""
+We now preprocess every lens, across 4 processes. Every lens is output with its `image.fits`, `noise_map.fits`,
+`psf.fits`, `mask.fits` and `positions.dat` (if it has positions) and can be loaded in a runner like any other dataset.
+
+The call is in an `if __name__ == "__main__":` block, which scripts that start a pool of processes need on macOS and 
+Windows, where every process of the pool imports the script again.
+"""
+
+# %%
+if __name__ == "__main__":
+
+    results = batch.preprocess(
+        raw_path=raw_path, output_path=output_path, defaults=defaults, processes=4
+    )
+
+    print(f"Preprocessed: {results['preprocessed']}")
+    print(f"Skipped: {results['skipped']}")
+
+# %%
+"""
+Every lens is output with a `stamp.json` of its config and input files. If we preprocess the sample again, every lens
+is skipped because nothing has changed. Only lenses whose raw data or config changes (or new lenses added to
+`data_raw`) are preprocessed again.
+"""
+
+# %%
+if __name__ == "__main__":
+
+    results = batch.preprocess(
+        raw_path=raw_path, output_path=output_path, defaults=defaults, processes=4
+    )
+
+    print(f"Preprocessed: {results['preprocessed']}")
+    print(f"Skipped: {results['skipped']}")
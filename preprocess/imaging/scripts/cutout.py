@@ -0,0 +1,95 @@
+# %%
+"""
+__Preprocess Cutout__
+
+In `p1_image.py` we trimmed a large postage stamp using `array_with_new_shape`, which first loads the full image into
+memory. If your lenses are in raw survey frames (e.g. 10k x 10k tiles) this requires gigabytes of memory per lens.
+
+This tutorial cuts lens stamps out of a frame using `preprocess/imaging/tools/cutout.py`, which memory-maps the .fits
+file and only reads the rows of each stamp from disk.
+"""
+
+# %%
+from pyprojroot import here
+
+workspace_path = str(here())
+#%cd $workspace_path
+print(f"Working Directory has been set to `{workspace_path}`")
+
+#%matplotlib inline
+from os import path
+import autolens.plot as aplt
+
+from preprocess.imaging.tools import cutout
+
+# %%
+"""
+We'll use the large 800 x 800 postage stamp of the `data_raw` folder as our frame, whose lens is at its centre.
+"""
+
+# %%
+dataset_path = path.join("preprocess", "imaging", "data_raw")
+
+from preprocess.imaging.data_raw import simulators
+
+simulators.simulate_all_imaging(dataset_path=dataset_path)
+
+imaging_path = path.join(dataset_path, "imaging_with_large_stamp")
+
+# %%
+"""
+A stamp is defined by its (y,x) centre in pixels and its shape, and is loaded as an `Array` in place of
+`al.Array.from_fits` followed by `array_with_new_shape`.
+"""
+
+# %%
+image = cutout.array_from_fits(
+    file_path=path.join(imaging_path, "image.fits"),
+    pixel_scales=0.1,
+    centre=(400, 400),
+    shape_2d=(130, 130),
+)
+
+aplt.Array(array=image)
+
+# %%
+"""
+The `Imaging` of a stamp can be loaded in the same way, where the noise-map is cut out of its frame and the PSF is
+loaded in full.
+"""
+
+# %%
+imaging = cutout.imaging_from_fits(
+    image_path=path.join(imaging_path, "image.fits"),
+    noise_map_path=path.join(imaging_path, "noise_map.fits"),
+    psf_path=path.join(imaging_path, "psf.fits"),
+    pixel_scales=0.1,
+    centre=(400, 400),
+    shape_2d=(130, 130),
+)
+
+aplt.Imaging.subplot_imaging(imaging=imaging)
+
+# %%
+"""
+To cut thousands of lenses out of one frame, `output_stamps_from_fits` extracts every stamp in a single pass of the
+file, reading every row of the frame at most once, and outputs every stamp to its own .fits file.
+
+Below, we output the image of every stamp to its own folder, which could then be preprocessed using the batch
+preprocessor in `preprocess/imaging/scripts/batch.py`.
+"""
+
+# %%
+centres = [(200, 200), (200, 600), (400, 400), (600, 200), (600, 600)]
+
+output_path = path.join(dataset_path, "cutouts")
+
+cutout.output_stamps_from_fits(
+    file_path=path.join(imaging_path, "image.fits"),
+    centres=centres,
+    shape_2d=(130, 130),
+    output_paths=[
+        path.join(output_path, f"lens_{index}", "image.fits")
+        for index in range(len(centres))
+    ],
+)
@@ -41,7 +41,7 @@ This populates the `data_raw` path with example simulated `Imaging` data-sets.
 """
 
 # %%
-import simulators
+from preprocess.imaging.data_raw import simulators
 
 simulators.simulate_all_imaging(dataset_path=dataset_path)
 
@@ -36,7 +36,7 @@ dataset_path = path.join("preprocess", "imaging", "data_raw")
 """This populates the `data` path with example simulated `Imaging` data-sets."""
 
 # %%
-import simulators
+from preprocess.imaging.data_raw import simulators
 
 simulators.simulate_all_imaging(dataset_path=dataset_path)
 
@@ -157,3 +157,48 @@ normalized_psf = al.Kernel.from_fits(
 )
 
 aplt.Array(array=normalized_psf)
+
+# %%
+"""
+__Trimming By Encircled Energy__
+
+Above, we trimmed the large PSF to 21 x 21 by eye. The cost of PSF convolution in every likelihood evaluation is
+proportional to the number of pixels in the PSF (and the size of the mask`s blurring region, which grows with the PSF),
+so we want the smallest PSF which still contains almost all of its light.
+
+The module `preprocess/imaging/tools/psf_trim.py` reports the fraction of the PSF`s energy within every odd kernel
+size, the smallest odd shape keeping a chosen fraction of its energy and the predicted speedup of a lens model fit.
+"""
+
+# %%
+from preprocess.imaging.tools import psf_trim
+
+mask = al.Mask2D.circular(shape_2d=(100, 100), pixel_scales=0.1, radius=3.0)
+
+report = psf_trim.report_from(
+    psf_2d=large_psf.in_2d,
+    mask=mask,
+    energy_fraction=0.999,
+    convolution_fraction=0.5,
+)
+
+for size, energy in report["encircled_energies"].items():
+    print(f"{size} x {size}: {energy:.6f}")
+
+print(f"Trimmed shape = {report['trimmed_shape_2d']}")
+print(f"Energy kept = {report['energy_kept']}")
+print(f"Convolution speedup = {report['convolution_speedup']}")
+print(f"Predicted likelihood speedup = {report['likelihood_speedup']}")
+
+# %%
+"""
+The predicted likelihood speedup assumes half of every likelihood evaluation is spent on convolution (the
+`convolution_fraction`), which depends on the model and should be changed to the value measured for your fits.
+
+The PSF is trimmed to this shape and renormalized as follows.
+"""
+
+# %%
+trimmed_psf = psf_trim.trimmed_psf_from(psf=large_psf, energy_fraction=0.999)
+
+aplt.Array(array=trimmed_psf)
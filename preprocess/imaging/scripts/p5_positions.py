@@ -125,3 +125,58 @@ above meaning for this figure the positions do not correspond to the source).
 
 # %%
 aplt.Array(array=image, positions=positions)
+
+# %%
+"""
+__Finding Positions Automatically__
+
+Marking positions by hand (or with the GUI `preprocess/imaging/gui/positions.py`) needs a human for every lens. For
+large samples, the `PositionFinder` in `preprocess/imaging/tools/position_finder.py` finds the positions of the
+multiple images as the peaks of the signal-to-noise map of the arcs, grouping them into sets of multiple images.
+
+If the lens light is bright, the finder should be given the lens light subtracted image.
+"""
+
+# %%
+import numpy as np
+
+from preprocess.imaging.tools import position_finder
+
+noise_map = al.Array.from_fits(
+    file_path=path.join(dataset_path, "noise_map.fits"), pixel_scales=pixel_scales
+)
+
+finder = position_finder.PositionFinder(
+    pixel_scales=pixel_scales,
+    signal_to_noise_threshold=10.0,
+    min_separation=0.3,
+    inner_radius=0.3,
+    outer_radius=3.0,
+)
+
+positions = finder.positions_from(
+    images=np.stack([image.in_2d]), noise_maps=np.stack([noise_map.in_2d])
+)[0]
+
+positions = al.GridIrregularGrouped(grid=positions)
+
+aplt.Array(array=image, positions=positions)
+
+# %%
+"""
+For a whole sample, `output_positions_of_sample` finds the positions of every lens (in batches of images of the same
+shape) and outputs them as `positions.dat` in the dataset folder of each lens, returning the lenses where no positions
+were found so they can be marked by hand.
+
+This dataset already has the `positions.dat` we marked above, so we output the positions found automatically to
+`positions_auto.dat` instead, which we can compare to them.
+"""
+
+# %%
+failed = position_finder.output_positions_of_sample(
+    position_finder=finder,
+    dataset_paths=[dataset_path],
+    positions_file="positions_auto.dat",
+)
+
+print(f"No positions found for: {failed}")
@@ -105,3 +105,54 @@ The workspace also includes a GUI for drawing lens light centres, which can be f
 `autolens_workspace/preprocess/imaging/gui/light_centres.py`. This tools allows you `click` on the image where an 
 image of the lensed source is, and it will use the brightest pixel within a 5x5 box of pixels to select the coordinate.
 """
+
+# %%
+"""
+__Estimating Lens Light Centres Automatically__
+
+For large samples, the `LightCentreEstimator` in `preprocess/imaging/tools/light_centre.py` estimates the centre of
+the lens light of every lens without any interaction. It finds the brightest pixel within a search radius of the
+expected centre and refines it using the flux-weighted centroid of the pixels around it.
+"""
+
+# %%
+import numpy as np
+
+from preprocess.imaging.tools import light_centre
+
+estimator = light_centre.LightCentreEstimator(
+    pixel_scales=pixel_scales,
+    search_radius=0.5,
+    moment_radius=0.3,
+    blurring_gaussian_sigma=0.1,
+)
+
+centre = estimator.centres_from(images=np.stack([image.in_2d]))[0]
+
+light_centre_estimate = al.GridIrregularGrouped([[tuple(centre)]])
+
+aplt.Array(array=image, light_profile_centres=light_centre_estimate)
+
+# %%
+"""
+The light centres of every lens in a folder (e.g. every lens with lens light in the `dataset` folder) are estimated in
+batches of images of the same shape and output as `light_centres.dat` in the dataset folder of each lens.
+
+These lenses already have a `light_centres.dat` (e.g. one marked with the GUI above), so we output the estimated
+centres to `light_centres_auto.dat` instead, which we can compare to them.
+"""
+
+# %%
+from preprocess.imaging.tools import batch
+
+dataset_paths = batch.lens_paths_from(
+    raw_path=path.join("dataset", dataset_type, dataset_label)
+)
+
+light_centres = light_centre.output_light_centres_of_sample(
+    light_centre_estimator=estimator,
+    dataset_paths=dataset_paths,
+    light_centres_file="light_centres_auto.dat",
+)
+
+print(light_centres)
@@ -206,3 +206,81 @@ The workspace also includes a GUI for image and noise-map scaling, which can be
 `autolens_workspace/preprocess/imaging/gui/scaled_dataset.py`. This tools allows you `spray paint` on the image where 
 an you want to scale, allow irregular patterns (i.e. not rectangles) to be scaled.
 """
+
+# %%
+"""
+__Scaling Intervening Objects Automatically__
+
+For large samples, the `InterveningObjectScaler` in `preprocess/imaging/tools/scaled_dataset.py` finds the intervening
+objects of every lens without any interaction. Objects are the regions of the signal-to-noise map above a threshold
+which do not overlap the lens region (the unmasked pixels of the lens mask, or a circle about the lens centre if it has
+no mask), and are scaled as above. The circle must be larger than the Einstein radius of the lens, so that arcs are
+not mistaken for intervening objects.
+"""
+
+# %%
+from preprocess.imaging.tools import scaled_dataset
+
+scaler = scaled_dataset.InterveningObjectScaler(
+    pixel_scales=pixel_scales,
+    signal_to_noise_threshold=5.0,
+    lens_radius=2.5,
+    margin=0.2,
+)
+
+# %%
+"""
+The datasets of every lens are scaled and output as `image_scaled.fits`, `noise_map_scaled.fits` and `mask_scaled.fits`
+to the dataset folder of every lens, with the lenses split over a pool of processes.
+
+This dataset already has the files we scaled by hand above, so we use the `suffix` input to output the automatically
+scaled dataset as `image_scaled_auto.fits`, `noise_map_scaled_auto.fits` and `mask_scaled_auto.fits` instead.
+"""
+
+# %%
+scaled_dataset.output_scaled_datasets(
+    scaler=scaler,
+    dataset_paths=[dataset_path],
+    mask_file="mask.fits",
+    suffix="_scaled_auto",
+    processes=1,
+)
+
+image = al.Array.from_fits(
+    file_path=path.join(dataset_path, "image_scaled_auto.fits"),
+    pixel_scales=pixel_scales,
+)
+
+aplt.Array(array=image)
+
+# %%
+"""
+__Background Estimation For Large Images__
+
+The background level above was estimated with `background_noise_map_from_edges_of_image`, which needs the whole image
+in memory. For large images (e.g. survey tiles), `preprocess/imaging/tools/background.py` streams over the edges of a
+memory-mapped .fits file instead, and sigma clips the estimate so stars or galaxies at the edges do not bias it.
+"""
+
+# %%
+from preprocess.imaging.tools import background
+from preprocess.imaging.tools import cutout
+
+with cutout.Frame(file_path=path.join(dataset_path, "image.fits")) as frame:
+    background_level, background_noise = background.background_from_edges(
+        source=frame, no_edges=2, sigma_clip=3.0
+    )
+
+print(f"Background Level = {background_level}")
+print(f"Background Noise = {background_noise}")
+
+# %%
+"""
+The backgrounds of the images of many lenses are estimated concurrently, with the files streamed over in a pool of
+threads.
+"""
+
+# %%
+backgrounds = background.backgrounds_from_fits(
+    file_paths=[path.join(dataset_path, "image.fits")], no_edges=2, threads=4
+)
@@ -0,0 +1,211 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from preprocess.imaging.tools import cutout
+
+"""
+Estimate the background level and noise of images from the pixels at their edges, streaming over the edges so large
+images (e.g. survey tiles) are never loaded into memory in full.
+
+`al.preprocess.background_noise_map_from_edges_of_image` selects the edges of an image already in memory. Here the
+edges are read in strips (the top and bottom rows, then the left and right columns in blocks of `chunk_rows` rows) from
+any array-like source which can be sliced, for example:
+
+ - A `cutout.Frame`, a memory-mapped .fits file.
+ - A memory-mapped .npy file (`np.load(file_path, mmap_mode="r")`).
+ - An ndarray of a batch of images of shape [total_images, total_y, total_x], whose backgrounds are estimated together
+   with every strip read for all images at once.
+
+The mean and variance of the edges are accumulated strip by strip using Welford`s online algorithm (merging the
+statistics of every strip, as described by Chan et al.), so the memory used is one strip. The estimates are
+sigma-clipped: every further pass over the edges only includes the pixels within `sigma_clip` standard deviations of
+the mean of the previous pass, which removes stars, galaxies and cosmic rays at the edges from the estimate.
+"""
+
+
+class WelfordStatistics:
+    def __init__(self, shape=()):
+        """
+        The running count, mean and sum of squared deviations of the values of one or more (e.g. a batch of) images.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of the statistics, e.g. `(total_images,)` for a batch of images or `()` for one image.
+        """
+        self.count = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def update(self, values, lower=None, upper=None):
+        """
+        Update the statistics with a strip of values, of shape `shape + (total_values,)`. Values outside of `lower` and
+        `upper` (of shape `shape`) are excluded, which is used for sigma clipping.
+        """
+        is_valid = np.isfinite(values)
+
+        if lower is not None:
+            is_valid &= (values >= lower[..., None]) & (values <= upper[..., None])
+
+        count = np.sum(is_valid, axis=-1)
+
+        if not np.any(count):
+            return
+
+        safe_count = np.maximum(count, 1)
+
+        values = np.where(is_valid, values, 0.0)
+
+        mean = np.sum(values, axis=-1) / safe_count
+        m2 = np.sum(np.where(is_valid, (values - mean[..., None]) ** 2, 0.0), axis=-1)
+
+        total_count = self.count + count
+        safe_total_count = np.maximum(total_count, 1)
+
+        delta = mean - self.mean
+
+        self.mean = self.mean + delta * count / safe_total_count
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe_total_count
+        self.count = total_count
+
+    @property
+    def variance(self):
+        return self.m2 / np.maximum(self.count, 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+def edge_strips_from(source, no_edges=2, chunk_rows=1024):
+    """
+    Yield the pixels at the edges of an image (or the last two axes of a batch of images) in strips, each of shape
+    `source.shape[:-2] + (total_values,)`, with every edge pixel in exactly one strip.
+    """
+    total_y, total_x = source.shape[-2:]
+
+    yield source[..., :no_edges, :].reshape(source.shape[:-2] + (-1,))
+    yield source[..., total_y - no_edges :, :].reshape(source.shape[:-2] + (-1,))
+
+    for y0 in range(no_edges, total_y - no_edges, chunk_rows):
+
+        y1 = min(y0 + chunk_rows, total_y - no_edges)
+
+        left = np.asarray(source[..., y0:y1, :no_edges])
+        right = np.asarray(source[..., y0:y1, total_x - no_edges :])
+
+        yield np.concatenate(
+            (
+                left.reshape(source.shape[:-2] + (-1,)),
+                right.reshape(source.shape[:-2] + (-1,)),
+            ),
+            axis=-1,
+        )
+
+
+def background_from_edges(
+    source, no_edges=2, sigma_clip=3.0, iterations=5, chunk_rows=1024
+):
+    """
+    Returns the background level (the mean) and noise (the standard deviation) of the pixels at the edges of an image
+    or batch of images, streaming over the edges.
+
+    Parameters
+    ----------
+    source : array-like
+        The image of shape [total_y, total_x] or batch of images of shape [total_images, total_y, total_x], which can be
+        any object that can be sliced (e.g. a memory-mapped array or `cutout.Frame`).
+    no_edges : int
+        The number of pixels at every edge of the image used to estimate the background.
+    sigma_clip : float or None
+        The number of standard deviations from the mean beyond which pixels are excluded on every pass after the first.
+        If `None`, one pass without clipping is performed, giving the same estimate as
+        `al.preprocess.background_noise_map_from_edges_of_image`.
+    iterations : int
+        The maximum number of sigma clipped passes over the edges, which stop early once no more pixels are clipped.
+    chunk_rows : int
+        The number of rows of the left and right edges read at a time.
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        The background level and noise of every image, which are floats for one image.
+    """
+    statistics = None
+    lower = upper = None
+
+    for _ in range(1 + (iterations if sigma_clip is not None else 0)):
+
+        previous = statistics
+
+        statistics = WelfordStatistics(shape=source.shape[:-2])
+
+        for strip in edge_strips_from(
+            source=source, no_edges=no_edges, chunk_rows=chunk_rows
+        ):
+            statistics.update(
+                values=np.asarray(strip, dtype="float64"), lower=lower, upper=upper
+            )
+
+        if previous is not None and np.array_equal(previous.count, statistics.count):
+            break
+
+        if sigma_clip is not None:
+            lower = statistics.mean - sigma_clip * statistics.std
+            upper = statistics.mean + sigma_clip * statistics.std
+
+    if statistics.mean.ndim == 0:
+        return float(statistics.mean), float(statistics.std)
+
+    return statistics.mean, statistics.std
+
+
+def backgrounds_from_fits(
+    file_paths,
+    hdu=0,
+    no_edges=2,
+    sigma_clip=3.0,
+    iterations=5,
+    chunk_rows=1024,
+    threads=4,
+):
+    """
+    Returns the background level and noise of the images in many .fits files, which are memory-mapped and streamed
+    over concurrently in a pool of threads (reading the edges is I/O bound, so threads run concurrently).
+
+    Returns
+    -------
+    [(float, float)]
+        The background level and noise of every image, in the order of `file_paths`.
+    """
+
+    def background_from_file(file_path):
+        with cutout.Frame(file_path=file_path, hdu=hdu) as frame:
+            return background_from_edges(
+                source=frame,
+                no_edges=no_edges,
+                sigma_clip=sigma_clip,
+                iterations=iterations,
+                chunk_rows=chunk_rows,
+            )
+
+    if threads == 1:
+        return list(map(background_from_file, file_paths))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(background_from_file, file_paths))
+
+
+def background_noise_map_from_edges(source, pixel_scales, no_edges=2, **kwargs):
+    """
+    Returns a noise-map of the background noise of the edges of an image, which is used in place of
+    `al.preprocess.background_noise_map_from_edges_of_image` for images that are memory-mapped.
+    """
+    import autolens as al
+
+    _, noise = background_from_edges(source=source, no_edges=no_edges, **kwargs)
+
+    return al.Array.full(
+        fill_value=noise, shape_2d=source.shape[-2:], pixel_scales=pixel_scales
+    )
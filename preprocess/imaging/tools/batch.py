@@ -0,0 +1,380 @@
+import hashlib
+import json
+import os
+from multiprocessing import Pool
+from os import path
+
+import numpy as np
+
+from preprocess.imaging.tools import mask_builder
+from preprocess.imaging.tools import position_finder
+from preprocess.imaging.tools import psf_trim
+
+"""
+Preprocess a directory of raw strong lens `Imaging` data without any interaction, performing the steps of the
+`preprocess/imaging/scripts` tutorials `p1_image.py` - `p5_positions.py` for every lens in a pool of processes.
+
+Every lens is a folder of the raw data directory containing its `image.fits`, `noise_map.fits` and `psf.fits`. How a
+lens is preprocessed is declared in a config, which is a dictionary with the following entries (see `default_config`):
+
+ - `pixel_scales`: the pixel scale of the data, in arc-seconds.
+ - `units`: the units of the image and noise-map, `eps` (electrons per second), `counts` or `adus`. Data in counts or
+   ADUs is converted to electrons per second using the `exposure_time_map` (a float or the name of a .fits file in the
+   lens folder) and, for ADUs, the `gain`.
+ - `noise_map_is_weight_map`: whether the noise-map is a weight map (e.g. an HST WHT map), which is converted to a
+   noise-map.
+ - `new_shape`: the shape the image and noise-map are trimmed or padded to, or `None` to keep their shape.
+ - `psf_new_shape`: the shape the PSF is trimmed to, which must be odd, or `None`. PSFs with even dimensions are always
+   rescaled to odd dimensions first (so the trimmed PSF stays centred) and every PSF is renormalized.
+ - `psf_energy_fraction`: if not `None`, the PSF is trimmed to the smallest odd shape keeping this fraction of its
+   energy (see `psf_trim.py`).
+ - `mask`: the name of a `Mask2D` constructor and its arguments, e.g. `{"type": "circular", "radius": 3.0}`. The type
+   `auto` makes the mask from the signal-to-noise of the image using the arguments of a `MaskBuilder` (see
+   `mask_builder.py`), e.g. `{"type": "auto", "signal_to_noise_threshold": 5.0, "margin": 0.3}`.
+ - `positions`: the (y,x) positions of the multiple images, grouped as for a `GridIrregularGrouped`, or `None`. The
+   type `auto` finds the positions in the image using the arguments of a `PositionFinder` (see
+   `position_finder.py`), e.g. `{"type": "auto", "inner_radius": 0.5}`.
+
+The config of a lens is the `defaults` input to `preprocess` updated by the `preprocess.json` file in the lens folder
+(if it exists), so most lenses can share one config and only the lenses which differ need their own file.
+
+Every lens is output to its own folder of the output directory as `image.fits`, `noise_map.fits`, `psf.fits`,
+`mask.fits` and (if it has them) `positions.dat`, alongside a `stamp.json` of its config and input files. If the stamp
+has not changed since the lens was last preprocessed the lens is skipped, so rerunning the batch only preprocesses new
+lenses and those whose inputs or config changed.
+"""
+
+config_filename = "preprocess.json"
+stamp_filename = "stamp.json"
+
+default_config = {
+    "pixel_scales": 0.1,
+    "image_file": "image.fits",
+    "noise_map_file": "noise_map.fits",
+    "psf_file": "psf.fits",
+    "hdu": 0,
+    "units": "eps",
+    "exposure_time_map": None,
+    "gain": None,
+    "noise_map_is_weight_map": False,
+    "new_shape": None,
+    "psf_new_shape": None,
+    "psf_energy_fraction": None,
+    "mask": {"type": "circular", "radius": 3.0},
+    "positions": None,
+}
+
+output_files = ["image.fits", "noise_map.fits", "psf.fits", "mask.fits"]
+
+
+def lens_paths_from(raw_path, image_file="image.fits"):
+    """Returns the folder of every lens in the raw data directory, which are the folders containing an image."""
+    return [
+        path.join(raw_path, folder)
+        for folder in sorted(os.listdir(raw_path))
+        if path.isfile(path.join(raw_path, folder, image_file))
+    ]
+
+
+def config_from(lens_path, defaults=None):
+    """
+    Returns the config of a lens, which is the default config updated by `defaults` and then by the lens`s
+    `preprocess.json` file.
+    """
+    config = dict(default_config)
+    config.update(defaults or {})
+
+    config_path = path.join(lens_path, config_filename)
+
+    if path.exists(config_path):
+        with open(config_path) as f:
+            config.update(json.load(f))
+
+    return config
+
+
+def input_files_from(lens_path, config):
+
+    files = [config["image_file"], config["noise_map_file"], config["psf_file"]]
+
+    if isinstance(config["exposure_time_map"], str):
+        files.append(config["exposure_time_map"])
+
+    return [path.join(lens_path, file) for file in files]
+
+
+def stamp_from(lens_path, config):
+    """
+    Returns a stamp of a lens`s config and input files, which changes if the config or any input file changes.
+
+    Only the size and modification time of each file are used, so no data is read.
+    """
+    sha = hashlib.sha1()
+
+    sha.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+
+    for file_path in input_files_from(lens_path=lens_path, config=config):
+        stat = os.stat(file_path)
+        sha.update(f"{file_path}{stat.st_size}{stat.st_mtime_ns}".encode("utf-8"))
+
+    return sha.hexdigest()
+
+
+def is_preprocessed(output_path, stamp, config):
+
+    stamp_path = path.join(output_path, stamp_filename)
+
+    files = list(output_files)
+
+    if isinstance(config["positions"], list):
+        files.append("positions.dat")
+
+    if not path.exists(stamp_path) or not all(
+        path.exists(path.join(output_path, file)) for file in files
+    ):
+        return False
+
+    with open(stamp_path) as f:
+        return json.load(f)["stamp"] == stamp
+
+
+def array_to_eps(array, lens_path, config):
+    """Convert an image or noise-map in counts or ADUs to electrons per second (see `p1_image.py`)."""
+    import autolens as al
+
+    if config["units"] == "eps":
+        return array
+
+    if isinstance(config["exposure_time_map"], str):
+        exposure_time_map = al.Array.from_fits(
+            file_path=path.join(lens_path, config["exposure_time_map"]),
+            pixel_scales=config["pixel_scales"],
+        )
+    else:
+        exposure_time_map = al.Array.full(
+            fill_value=config["exposure_time_map"],
+            shape_2d=array.shape_2d,
+            pixel_scales=array.pixel_scales,
+        )
+
+    if config["units"] == "counts":
+        return al.preprocess.array_counts_to_eps(
+            array_counts=array, exposure_time_map=exposure_time_map
+        )
+
+    if config["units"] == "adus":
+        return al.preprocess.array_adus_to_eps(
+            array_adus=array, exposure_time_map=exposure_time_map, gain=config["gain"]
+        )
+
+    raise ValueError(
+        f"The units {config['units']} of the lens at {lens_path} are not eps, counts or adus."
+    )
+
+
+def preprocess_lens(lens_path, output_path, config):
+    """
+    Preprocess one lens and output its image, noise-map, PSF, mask, positions and stamp to `output_path`. This is
+    performed by each process of the pool, so it imports **PyAutoLens** itself.
+
+    Returns
+    -------
+    bool
+        `True` if the lens was preprocessed, `False` if it was skipped because it is unchanged.
+    """
+    import autolens as al
+
+    stamp = stamp_from(lens_path=lens_path, config=config)
+
+    if is_preprocessed(output_path=output_path, stamp=stamp, config=config):
+        return False
+
+    pixel_scales = config["pixel_scales"]
+
+    # Image (p1)
+
+    image = al.Array.from_fits(
+        file_path=path.join(lens_path, config["image_file"]),
+        hdu=config["hdu"],
+        pixel_scales=pixel_scales,
+    )
+
+    image = array_to_eps(array=image, lens_path=lens_path, config=config)
+
+    # Noise Map (p2)
+
+    noise_map = al.Array.from_fits(
+        file_path=path.join(lens_path, config["noise_map_file"]),
+        hdu=config["hdu"],
+        pixel_scales=pixel_scales,
+    )
+
+    if config["noise_map_is_weight_map"]:
+        noise_map = al.preprocess.noise_map_from_weight_map(weight_map=noise_map)
+    else:
+        noise_map = array_to_eps(array=noise_map, lens_path=lens_path, config=config)
+
+    if config["new_shape"] is not None:
+
+        new_shape = tuple(config["new_shape"])
+
+        image = al.preprocess.array_with_new_shape(array=image, new_shape=new_shape)
+        noise_map = al.preprocess.array_with_new_shape(
+            array=noise_map, new_shape=new_shape
+        )
+
+    # PSF (p3)
+
+    psf = al.Kernel.from_fits(
+        file_path=path.join(lens_path, config["psf_file"]),
+        hdu=config["hdu"],
+        pixel_scales=pixel_scales,
+        renormalize=True,
+    )
+
+    if psf.shape_2d[0] % 2 == 0 or psf.shape_2d[1] % 2 == 0:
+        psf = al.preprocess.psf_with_odd_dimensions_from_psf(psf=psf)
+
+    if config["psf_new_shape"] is not None:
+
+        if config["psf_new_shape"][0] % 2 == 0 or config["psf_new_shape"][1] % 2 == 0:
+            raise ValueError(
+                f"The psf_new_shape {config['psf_new_shape']} of {lens_path} is not odd."
+            )
+
+        psf = al.Kernel.manual_2d(
+            array=al.preprocess.array_with_new_shape(
+                array=psf, new_shape=tuple(config["psf_new_shape"])
+            ).in_2d,
+            pixel_scales=pixel_scales,
+            renormalize=True,
+        )
+
+    if config["psf_energy_fraction"] is not None:
+        psf = psf_trim.trimmed_psf_from(
+            psf=psf, energy_fraction=config["psf_energy_fraction"]
+        )
+
+    # Mask (p4)
+
+    images = np.asarray(image.in_2d)[None]
+    noise_maps = np.asarray(noise_map.in_2d)[None]
+
+    mask_config = dict(config["mask"])
+    mask_type = mask_config.pop("type")
+
+    if mask_type == "auto":
+
+        mask = mask_builder.MaskBuilder(
+            pixel_scales=pixel_scales, psf_shape_2d=psf.shape_2d, **mask_config
+        ).masks_from(images=image.in_2d, noise_maps=noise_map.in_2d)
+
+    else:
+
+        mask = getattr(al.Mask2D, mask_type)(
+            shape_2d=image.shape_2d,
+            pixel_scales=image.pixel_scales,
+            sub_size=1,
+            **mask_config,
+        )
+
+    # Output
+
+    os.makedirs(output_path, exist_ok=True)
+
+    image.output_to_fits(file_path=path.join(output_path, "image.fits"), overwrite=True)
+    noise_map.output_to_fits(
+        file_path=path.join(output_path, "noise_map.fits"), overwrite=True
+    )
+    psf.output_to_fits(file_path=path.join(output_path, "psf.fits"), overwrite=True)
+    mask.output_to_fits(file_path=path.join(output_path, "mask.fits"), overwrite=True)
+
+    # Positions (p5)
+
+    if isinstance(config["positions"], dict):
+
+        positions_config = dict(config["positions"])
+        positions_config.pop("type")
+
+        positions = position_finder.PositionFinder(
+            pixel_scales=pixel_scales, **positions_config
+        ).positions_from(images=images, noise_maps=noise_maps)[0]
+
+    else:
+
+        positions = config["positions"]
+
+    if positions:
+
+        positions = al.GridIrregularGrouped(
+            grid=[[tuple(position) for position in group] for group in positions]
+        )
+
+        positions.output_to_file(
+            file_path=path.join(output_path, "positions.dat"), overwrite=True
+        )
+
+    elif path.exists(path.join(output_path, "positions.dat")):
+
+        os.remove(path.join(output_path, "positions.dat"))
+
+    with open(path.join(output_path, stamp_filename), "w") as f:
+        json.dump({"stamp": stamp, "lens_path": lens_path, "config": config}, f)
+
+    return True
+
+
+def _preprocess_lens(args):
+    lens_path, output_path, config = args
+    return (
+        lens_path,
+        preprocess_lens(lens_path=lens_path, output_path=output_path, config=config),
+    )
+
+
+def preprocess(raw_path, output_path, defaults=None, processes=1):
+    """
+    Preprocess every lens in the raw data directory `raw_path`, outputting each to the folder of the same name in
+    `output_path`.
+
+    Parameters
+    ----------
+    raw_path : str
+        The directory containing a folder of raw data for every lens.
+    output_path : str
+        The directory the preprocessed data of every lens is output to.
+    defaults : dict or None
+        The config entries shared by every lens, which update `default_config`.
+    processes : int
+        The number of processes the lenses are preprocessed in.
+
+    Returns
+    -------
+    dict
+        The names of the lenses which were preprocessed and those which were skipped because they are unchanged.
+    """
+    image_file = (defaults or {}).get("image_file", default_config["image_file"])
+
+    args = [
+        (
+            lens_path,
+            path.join(output_path, path.basename(lens_path)),
+            config_from(lens_path=lens_path, defaults=defaults),
+        )
+        for lens_path in lens_paths_from(raw_path=raw_path, image_file=image_file)
+    ]
+
+    if processes == 1:
+        results = list(map(_preprocess_lens, args))
+    else:
+        with Pool(processes=processes) as pool:
+            results = pool.map(_preprocess_lens, args)
+
+    return {
+        "preprocessed": [
+            path.basename(lens_path) for lens_path, is_run in results if is_run
+        ],
+        "skipped": [
+            path.basename(lens_path) for lens_path, is_run in results if not is_run
+        ],
+    }
@@ -0,0 +1,294 @@
+import os
+from os import path
+
+import numpy as np
+from astropy.io import fits
+
+"""
+Cut lens stamps out of large raw frames (e.g. 10k x 10k survey tiles) without reading the full frame into memory.
+
+`al.Array.from_fits` reads the whole HDU into memory before `array_with_new_shape` trims it to a stamp, so every
+cutout of a survey tile costs the memory of the tile. Here the .fits file is memory-mapped and only the rows of the
+region of interest are read from disk:
+
+ - `array_from_fits` and `imaging_from_fits` load one stamp, given its centre (in pixels) and shape.
+ - `stamps_from_fits` extracts many stamps from one frame in a single pass, sweeping down the frame in blocks of rows
+   so every row is read at most once, however many stamps overlap it.
+
+Regions which extend beyond the edge of the frame are padded with `pad_value`, as `array_with_new_shape` pads an
+image with zeros.
+
+Frames stored as scaled integers (with BSCALE / BZERO header keywords) are read unscaled and each stamp is scaled on
+its own, because astropy scales the full HDU in memory on first access otherwise.
+"""
+
+
+class Frame:
+    def __init__(self, file_path, hdu=0):
+        """
+        A memory-mapped 2D image in a .fits file, from which regions are read without loading the rest of the image.
+
+        Parameters
+        ----------
+        file_path : str
+            The path of the .fits file.
+        hdu : int
+            The HDU of the .fits file containing the image.
+        """
+        self.hdu_list = fits.open(
+            file_path, memmap=True, do_not_scale_image_data=True, lazy_load_hdus=True
+        )
+
+        hdu = self.hdu_list[hdu]
+
+        self.data = hdu.data
+        self.bscale = hdu.header.get("BSCALE", 1.0)
+        self.bzero = hdu.header.get("BZERO", 0.0)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    def __getitem__(self, item):
+        """Read a slice of the frame from disk, scaled to its physical values."""
+        values = np.array(self.data[item], dtype="float64")
+
+        if self.bscale != 1.0 or self.bzero != 0.0:
+            values = values * self.bscale + self.bzero
+
+        return values
+
+    def rows_from(self, y0, y1):
+        """Read the rows `y0` to `y1` of the frame from disk, scaled to their physical values."""
+        return self[y0:y1]
+
+    def close(self):
+        self.hdu_list.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def region_from(centre, shape_2d):
+    """
+    Returns the (y0, y1, x0, x1) pixel bounds of the region of shape `shape_2d` centred on the (y,x) pixel `centre`,
+    which may extend beyond the edges of the frame.
+    """
+    y0 = int(centre[0]) - shape_2d[0] // 2
+    x0 = int(centre[1]) - shape_2d[1] // 2
+
+    return y0, y0 + shape_2d[0], x0, x0 + shape_2d[1]
+
+
+def stamp_from_rows(rows, rows_start, region, frame_shape, pad_value=0.0):
+    """
+    Returns the stamp of a region cut out of a block of rows of the frame (beginning at row `rows_start`), padding the
+    parts of the region beyond the edges of the frame with `pad_value`.
+    """
+    y0, y1, x0, x1 = region
+
+    stamp = np.full((y1 - y0, x1 - x0), pad_value, dtype="float64")
+
+    frame_y0, frame_y1 = max(y0, 0), min(y1, frame_shape[0])
+    frame_x0, frame_x1 = max(x0, 0), min(x1, frame_shape[1])
+
+    if frame_y0 < frame_y1 and frame_x0 < frame_x1:
+        stamp[frame_y0 - y0 : frame_y1 - y0, frame_x0 - x0 : frame_x1 - x0] = rows[
+            frame_y0 - rows_start : frame_y1 - rows_start, frame_x0:frame_x1
+        ]
+
+    return stamp
+
+
+def array_2d_from_fits(file_path, centre, shape_2d, hdu=0, pad_value=0.0):
+    """
+    Returns the stamp of shape `shape_2d` centred on the (y,x) pixel `centre` of the image in a .fits file as an
+    ndarray, reading only the rows of the stamp from disk.
+    """
+    region = region_from(centre=centre, shape_2d=shape_2d)
+
+    with Frame(file_path=file_path, hdu=hdu) as frame:
+
+        rows_start = max(region[0], 0)
+        rows = frame.rows_from(y0=rows_start, y1=max(min(region[1], frame.shape[0]), 0))
+
+        return stamp_from_rows(
+            rows=rows,
+            rows_start=rows_start,
+            region=region,
+            frame_shape=frame.shape,
+            pad_value=pad_value,
+        )
+
+
+def array_from_fits(file_path, pixel_scales, centre, shape_2d, hdu=0, pad_value=0.0):
+    """
+    Returns the stamp of shape `shape_2d` centred on the (y,x) pixel `centre` of the image in a .fits file as an
+    `Array`, which is used instead of `al.Array.from_fits` followed by `array_with_new_shape`.
+    """
+    import autolens as al
+
+    return al.Array.manual_2d(
+        array=array_2d_from_fits(
+            file_path=file_path,
+            centre=centre,
+            shape_2d=shape_2d,
+            hdu=hdu,
+            pad_value=pad_value,
+        ),
+        pixel_scales=pixel_scales,
+    )
+
+
+def imaging_from_fits(
+    image_path,
+    noise_map_path,
+    psf_path,
+    pixel_scales,
+    centre,
+    shape_2d,
+    image_hdu=0,
+    noise_map_hdu=0,
+    psf_hdu=0,
+    noise_map_pad_value=1.0e8,
+):
+    """
+    Returns the `Imaging` of the stamp of shape `shape_2d` centred on the (y,x) pixel `centre` of an image and
+    noise-map, which are usually large frames. The PSF is small, so is loaded in full.
+
+    The parts of the stamp beyond the edges of the frame have an image of zeros and a noise-map of
+    `noise_map_pad_value`, so they are effectively omitted from an analysis.
+    """
+    import autolens as al
+
+    return al.Imaging(
+        image=array_from_fits(
+            file_path=image_path,
+            pixel_scales=pixel_scales,
+            centre=centre,
+            shape_2d=shape_2d,
+            hdu=image_hdu,
+        ),
+        noise_map=array_from_fits(
+            file_path=noise_map_path,
+            pixel_scales=pixel_scales,
+            centre=centre,
+            shape_2d=shape_2d,
+            hdu=noise_map_hdu,
+            pad_value=noise_map_pad_value,
+        ),
+        psf=al.Kernel.from_fits(
+            file_path=psf_path, hdu=psf_hdu, pixel_scales=pixel_scales
+        ),
+    )
+
+
+def stamps_from_fits(
+    file_path, centres, shape_2d, hdu=0, pad_value=0.0, block_rows=1024
+):
+    """
+    Extract the stamps of shape `shape_2d` centred on every (y,x) pixel of `centres` from the image in a .fits file
+    in a single pass of the file.
+
+    The stamps are extracted in order of their first row, with the frame read in blocks of at least `block_rows`
+    rows. Rows shared by stamps are kept from one block to the next, so every row of the frame is read at most once
+    and the memory used is one block of rows rather than the frame.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the .fits file containing the frame.
+    centres : [(int, int)]
+        The (y,x) pixel centre of every stamp.
+    shape_2d : (int, int)
+        The shape of every stamp.
+    hdu : int
+        The HDU of the .fits file containing the frame.
+    pad_value : float
+        The value of the parts of stamps beyond the edges of the frame.
+    block_rows : int
+        The minimum number of rows read from the frame at a time.
+
+    Returns
+    -------
+    generator
+        Tuples of the index of every stamp in `centres` and the stamp as an ndarray, in order of the stamps` first
+        row.
+    """
+    regions = [region_from(centre=centre, shape_2d=shape_2d) for centre in centres]
+
+    with Frame(file_path=file_path, hdu=hdu) as frame:
+
+        total_rows = frame.shape[0]
+
+        rows = frame.rows_from(y0=0, y1=0)
+        rows_start = 0
+
+        for index in np.argsort([region[0] for region in regions], kind="stable"):
+
+            region = regions[index]
+
+            y0 = min(max(region[0], 0), total_rows)
+            y1 = min(max(region[1], 0), total_rows)
+
+            rows_end = rows_start + rows.shape[0]
+
+            if y1 > rows_end:
+
+                read_start = max(rows_end, y0)
+                read_end = min(max(y1, read_start + block_rows), total_rows)
+
+                rows = np.concatenate(
+                    (
+                        rows[min(y0, rows_end) - rows_start :],
+                        frame.rows_from(y0=read_start, y1=read_end),
+                    )
+                )
+                rows_start = y0
+
+            yield index, stamp_from_rows(
+                rows=rows,
+                rows_start=rows_start,
+                region=region,
+                frame_shape=frame.shape,
+                pad_value=pad_value,
+            )
+
+
+def output_stamps_from_fits(
+    file_path,
+    centres,
+    shape_2d,
+    output_paths,
+    hdu=0,
+    pad_value=0.0,
+    block_rows=1024,
+    overwrite=True,
+):
+    """
+    Extract many stamps from the image in a .fits file in a single pass (see `stamps_from_fits`) and output every
+    stamp to its own .fits file, e.g. the `image.fits` of the raw data folder of every lens cut from a survey tile.
+
+    Parameters
+    ----------
+    output_paths : [str]
+        The path of the .fits file every stamp is output to, in the same order as `centres`.
+    """
+    for index, stamp in stamps_from_fits(
+        file_path=file_path,
+        centres=centres,
+        shape_2d=shape_2d,
+        hdu=hdu,
+        pad_value=pad_value,
+        block_rows=block_rows,
+    ):
+
+        output_path = output_paths[index]
+
+        if path.dirname(output_path):
+            os.makedirs(path.dirname(output_path), exist_ok=True)
+
+        fits.PrimaryHDU(data=stamp).writeto(output_path, overwrite=overwrite)
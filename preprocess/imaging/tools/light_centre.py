@@ -0,0 +1,194 @@
+from os import path
+
+import numpy as np
+
+from preprocess.imaging.tools import mask_builder
+
+"""
+Estimate the centres of the lens light of large samples of strong lenses without any interaction, as an automated
+alternative to the GUI `preprocess/imaging/gui/lens_light_centre.py`.
+
+The centres are output as `light_centres.dat` files, which can be loaded as a `GridIrregularGrouped` and used to fix
+the centres of the lens light and mass (e.g. `SetupMassTotal(mass_centre=...)`), which speeds up the early phases of a
+pipeline.
+
+The centre of every lens is estimated in two steps, each performed on the whole batch of images at once:
+
+ 1) The brightest pixel of the (optionally smoothed) image within `search_radius` of the expected centre.
+ 2) The flux-weighted centroid of the image within `moment_radius` of the current centre, which is iterated so the
+    aperture is recentred on the centroid, giving a centre more accurate than one pixel.
+"""
+
+
+class LightCentreEstimator:
+    def __init__(
+        self,
+        pixel_scales,
+        search_radius=0.5,
+        moment_radius=0.3,
+        centre=(0.0, 0.0),
+        blurring_gaussian_sigma=None,
+        iterations=3,
+    ):
+        """
+        Parameters
+        ----------
+        pixel_scales : float
+            The arc-second to pixel conversion factor of the images.
+        search_radius : float
+            The distance from `centre` (in arc-seconds) within which the brightest pixel is searched for.
+        moment_radius : float
+            The radius of the aperture (in arc-seconds) the flux-weighted centroid is computed within.
+        centre : (float, float)
+            The expected (y,x) arc-second centre of the lens light.
+        blurring_gaussian_sigma : float or None
+            The sigma of the Gaussian the images are smoothed with before finding the brightest pixel (in
+            arc-seconds), which stops a noise spike or cosmic ray being the brightest pixel.
+        iterations : int
+            The number of times the centroid is recomputed within an aperture centred on the previous centroid.
+        """
+        self.pixel_scales = pixel_scales
+        self.search_radius = search_radius
+        self.moment_radius = moment_radius
+        self.centre = centre
+        self.blurring_gaussian_sigma = blurring_gaussian_sigma
+        self.iterations = iterations
+
+    def grid_from(self, shape_2d):
+        """Returns the (y,x) arc-second coordinates of the pixel centres of an image, each of `shape_2d`."""
+        y = ((shape_2d[0] - 1) / 2.0 - np.arange(shape_2d[0])) * self.pixel_scales
+        x = (np.arange(shape_2d[1]) - (shape_2d[1] - 1) / 2.0) * self.pixel_scales
+
+        return np.broadcast_to(y[:, None], shape_2d), np.broadcast_to(
+            x[None, :], shape_2d
+        )
+
+    def peak_centres_from(self, images, grid_y, grid_x):
+        """
+        Returns the (y,x) arc-second coordinates of the brightest pixel of every image within `search_radius`, or
+        `centre` if no pixel is within it.
+        """
+        in_search = (grid_y - self.centre[0]) ** 2 + (
+            grid_x - self.centre[1]
+        ) ** 2 <= self.search_radius ** 2
+
+        if not np.any(in_search):
+            return np.tile(
+                np.asarray(self.centre, dtype="float64"), (images.shape[0], 1)
+            )
+
+        if self.blurring_gaussian_sigma is not None:
+            images = mask_builder.blurred_images_from(
+                images=images,
+                sigma_pixels=self.blurring_gaussian_sigma / self.pixel_scales,
+            )
+
+        peaks = np.argmax(
+            np.where(in_search[None], images, -np.inf).reshape(images.shape[0], -1),
+            axis=1,
+        )
+
+        return np.stack((grid_y.ravel()[peaks], grid_x.ravel()[peaks]), axis=1)
+
+    def centres_from(self, images):
+        """
+        Returns the (y,x) arc-second centres of the lens light of a batch of images, as an ndarray of shape
+        [total_images, 2].
+
+        Parameters
+        ----------
+        images : np.ndarray
+            The images of the batch, of shape [total_images, total_y, total_x].
+        """
+        images = np.asarray(images, dtype="float64")
+
+        grid_y, grid_x = self.grid_from(shape_2d=images.shape[1:])
+
+        centres = self.peak_centres_from(images=images, grid_y=grid_y, grid_x=grid_x)
+
+        flux = np.clip(images, 0.0, None)
+
+        for _ in range(self.iterations):
+
+            in_aperture = (grid_y[None] - centres[:, 0, None, None]) ** 2 + (
+                grid_x[None] - centres[:, 1, None, None]
+            ) ** 2 <= self.moment_radius ** 2
+
+            weights = np.where(in_aperture, flux, 0.0)
+            total_weights = np.sum(weights, axis=(1, 2))
+
+            has_flux = total_weights > 0.0
+            total_weights = np.where(has_flux, total_weights, 1.0)
+
+            centroids = np.stack(
+                (
+                    np.einsum("nij,ij->n", weights, grid_y) / total_weights,
+                    np.einsum("nij,ij->n", weights, grid_x) / total_weights,
+                ),
+                axis=1,
+            )
+
+            centres = np.where(has_flux[:, None], centroids, centres)
+
+        return centres
+
+
+def output_light_centres_of_sample(
+    light_centre_estimator,
+    dataset_paths,
+    image_file="image.fits",
+    light_centres_file="light_centres.dat",
+):
+    """
+    Estimate the lens light centre of every lens of a sample and output it as `light_centres_file` in the dataset
+    folder of each lens. Lenses whose images have the same shape are processed as one batch.
+
+    Parameters
+    ----------
+    light_centre_estimator : LightCentreEstimator
+        The estimator used for every lens.
+    dataset_paths : [str]
+        The dataset folder of every lens, containing its image.
+    image_file : str
+        The name of the .fits file of the image.
+    light_centres_file : str
+        The name of the file the light centre is output to, which overwrites any file of that name (e.g. one marked
+        with the GUI).
+
+    Returns
+    -------
+    dict
+        The (y,x) arc-second light centre of every lens, keyed by its dataset path.
+    """
+    import autolens as al
+
+    batches = {}
+
+    for dataset_path in dataset_paths:
+
+        image = al.Array.from_fits(
+            file_path=path.join(dataset_path, image_file),
+            pixel_scales=light_centre_estimator.pixel_scales,
+        ).in_2d
+
+        batches.setdefault(image.shape, []).append((dataset_path, image))
+
+    light_centres = {}
+
+    for batch in batches.values():
+
+        centres = light_centre_estimator.centres_from(
+            images=np.stack([image for _, image in batch])
+        )
+
+        for (dataset_path, _), centre in zip(batch, centres):
+
+            light_centres[dataset_path] = (float(centre[0]), float(centre[1]))
+
+            al.GridIrregularGrouped(
+                grid=[[light_centres[dataset_path]]]
+            ).output_to_file(
+                file_path=path.join(dataset_path, light_centres_file), overwrite=True
+            )
+
+    return light_centres
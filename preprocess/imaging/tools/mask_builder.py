@@ -0,0 +1,253 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import ndimage
+
+"""
+Build the masks of large samples of strong lenses without any interaction, as an automated alternative to the GUI
+`preprocess/imaging/gui/mask.py`.
+
+The mask of every lens is made following `preprocess/imaging/manual/mask_irregular.py`, extended so that it covers the
+lensed source with as few pixels as possible:
+
+ 1) The image is smoothed with a Gaussian, using an FFT of the whole batch of images at once.
+ 2) The signal-to-noise map of the smoothed image is thresholded.
+ 3) Connected regions of pixels above the threshold are kept if they are large enough and near the lens, removing
+    noise peaks and unrelated objects.
+ 4) The regions are dilated by a margin, so the mask includes the faint outskirts of the arcs.
+ 5) Pixels whose PSF blurring region would leave the image are masked.
+
+Every step operates on a batch of images of the same shape (an ndarray of shape [total_images, total_y, total_x]), so
+thousands of masks are made with a few calls to NumPy and SciPy rather than a Python loop over the lenses.
+
+Masks follow the **PyAutoLens** convention, where `True` is masked and `False` is fitted.
+"""
+
+
+@lru_cache()
+def gaussian_fft_from(shape_2d, sigma_pixels):
+    """
+    Returns the real FFT of a normalized Gaussian of `sigma_pixels` centred on the origin of an image of `shape_2d`,
+    which is reused by every batch of the same shape.
+    """
+    y = np.fft.fftfreq(shape_2d[0]) * shape_2d[0]
+    x = np.fft.fftfreq(shape_2d[1]) * shape_2d[1]
+
+    gaussian = np.exp(-0.5 * (y[:, None] ** 2 + x[None, :] ** 2) / sigma_pixels ** 2)
+
+    return np.fft.rfft2(gaussian / np.sum(gaussian))
+
+
+def blurred_images_from(images, sigma_pixels):
+    """
+    Returns a batch of images smoothed by a Gaussian of `sigma_pixels`, where the images are padded with zeros so the
+    smoothing does not wrap around their edges.
+    """
+    pad = int(np.ceil(4.0 * sigma_pixels))
+
+    padded = np.pad(images, ((0, 0), (pad, pad), (pad, pad)))
+
+    blurred = np.fft.irfft2(
+        np.fft.rfft2(padded, axes=(1, 2))
+        * gaussian_fft_from(shape_2d=padded.shape[1:], sigma_pixels=sigma_pixels),
+        s=padded.shape[1:],
+        axes=(1, 2),
+    )
+
+    return blurred[:, pad : pad + images.shape[1], pad : pad + images.shape[2]]
+
+
+def structure_2d_in_3d_from(structure_2d):
+    """
+    Returns a 3D structuring element that applies `structure_2d` to every image of a batch independently, as
+    neighbouring images in the batch are not connected.
+    """
+    structure = np.zeros((3,) + structure_2d.shape, dtype=bool)
+    structure[1] = structure_2d
+    return structure
+
+
+def disk_from(radius_pixels):
+
+    radius = int(np.ceil(radius_pixels))
+
+    y, x = np.ogrid[-radius : radius + 1, -radius : radius + 1]
+
+    return y ** 2 + x ** 2 <= radius_pixels ** 2
+
+
+class MaskBuilder:
+    def __init__(
+        self,
+        pixel_scales,
+        blurring_gaussian_sigma=0.1,
+        signal_to_noise_threshold=10.0,
+        min_region_pixels=10,
+        max_region_radius=None,
+        centre=(0.0, 0.0),
+        margin=0.2,
+        psf_shape_2d=None,
+    ):
+        """
+        Parameters
+        ----------
+        pixel_scales : float or (float, float)
+            The arc-second to pixel conversion factor of the images, where a (y,x) tuple (e.g. the `pixel_scales` of
+            an `Array`) must have square pixels.
+        blurring_gaussian_sigma : float
+            The sigma of the Gaussian the images are smoothed with, in arc-seconds.
+        signal_to_noise_threshold : float
+            The signal-to-noise of the smoothed image above which a pixel is in the mask.
+        min_region_pixels : int
+            The minimum number of pixels of a connected region above the threshold for it to be kept.
+        max_region_radius : float or None
+            Regions whose closest pixel to `centre` is further than this (in arc-seconds) are removed, which removes
+            objects unrelated to the lens. If `None`, regions are kept wherever they are.
+        centre : (float, float)
+            The (y,x) arc-second centre of the lens, for `max_region_radius`.
+        margin : float
+            The distance in arc-seconds the kept regions are dilated by.
+        psf_shape_2d : (int, int) or None
+            The shape of the PSF, where pixels within half of its shape of the edge of the image are masked so the
+            blurring region of the mask is within the image.
+        """
+        if isinstance(pixel_scales, tuple):
+
+            if pixel_scales[0] != pixel_scales[1]:
+                raise ValueError(
+                    f"The pixel scales {pixel_scales} are not square, which the MaskBuilder does not support."
+                )
+
+            pixel_scales = pixel_scales[0]
+
+        self.pixel_scales = float(pixel_scales)
+        self.blurring_gaussian_sigma = blurring_gaussian_sigma
+        self.signal_to_noise_threshold = signal_to_noise_threshold
+        self.min_region_pixels = min_region_pixels
+        self.max_region_radius = max_region_radius
+        self.centre = centre
+        self.margin = margin
+        self.psf_shape_2d = psf_shape_2d
+
+    def signal_to_noise_maps_from(self, images, noise_maps):
+        """Returns the signal-to-noise maps of the smoothed images of a batch."""
+        return (
+            blurred_images_from(
+                images=images,
+                sigma_pixels=self.blurring_gaussian_sigma / self.pixel_scales,
+            )
+            / noise_maps
+        )
+
+    def distance_map_from(self, shape_2d):
+        """Returns the distance of every pixel from `centre` in arc-seconds."""
+        y = (
+            (shape_2d[0] - 1) / 2.0 - np.arange(shape_2d[0])
+        ) * self.pixel_scales - self.centre[0]
+        x = (
+            np.arange(shape_2d[1]) - (shape_2d[1] - 1) / 2.0
+        ) * self.pixel_scales - self.centre[1]
+
+        return np.sqrt(y[:, None] ** 2 + x[None, :] ** 2)
+
+    def regions_from(self, detections):
+        """
+        Returns the pixels of the connected regions of `detections` which are large enough and (if
+        `max_region_radius` is input) close enough to the lens.
+        """
+        labels, total_labels = ndimage.label(
+            detections,
+            structure=structure_2d_in_3d_from(
+                structure_2d=ndimage.generate_binary_structure(2, 1)
+            ),
+        )
+
+        if total_labels == 0:
+            return detections
+
+        is_kept = np.bincount(labels.ravel()) >= self.min_region_pixels
+
+        if self.max_region_radius is not None:
+
+            distances = np.broadcast_to(
+                self.distance_map_from(shape_2d=detections.shape[1:]), detections.shape
+            )
+
+            min_distances = ndimage.minimum(
+                distances, labels=labels, index=np.arange(total_labels + 1)
+            )
+
+            is_kept &= np.asarray(min_distances) <= self.max_region_radius
+
+        is_kept[0] = False
+
+        return is_kept[labels]
+
+    def masks_2d_from(self, images, noise_maps):
+        """
+        Returns the masks of a batch of images and noise-maps, as a boolean ndarray of shape
+        [total_images, total_y, total_x] where `True` is masked.
+
+        Parameters
+        ----------
+        images : np.ndarray
+            The images of the batch, of shape [total_images, total_y, total_x] (or one image of shape
+            [total_y, total_x]).
+        noise_maps : np.ndarray
+            The noise-maps of the batch, of the same shape as the images.
+        """
+        images = np.asarray(images, dtype="float64")
+        noise_maps = np.asarray(noise_maps, dtype="float64")
+
+        if images.ndim == 2:
+            masks = self.masks_2d_from(images=images[None], noise_maps=noise_maps[None])
+            return masks[0]
+
+        detections = (
+            self.signal_to_noise_maps_from(images=images, noise_maps=noise_maps)
+            > self.signal_to_noise_threshold
+        )
+
+        regions = self.regions_from(detections=detections)
+
+        margin_pixels = self.margin / self.pixel_scales
+
+        if margin_pixels > 0.0:
+            regions = ndimage.binary_dilation(
+                regions,
+                structure=structure_2d_in_3d_from(
+                    structure_2d=disk_from(radius_pixels=margin_pixels)
+                ),
+            )
+
+        if self.psf_shape_2d is not None:
+
+            edge_y, edge_x = self.psf_shape_2d[0] // 2, self.psf_shape_2d[1] // 2
+
+            regions[:, :edge_y] = False
+            regions[:, regions.shape[1] - edge_y :] = False
+            regions[:, :, :edge_x] = False
+            regions[:, :, regions.shape[2] - edge_x :] = False
+
+        return ~regions
+
+    def masks_from(self, images, noise_maps, sub_size=1):
+        """
+        Returns the masks of a batch of images and noise-maps as a list of `Mask2D`'s, or the `Mask2D` of one image
+        if the input is one image of shape [total_y, total_x].
+        """
+        import autolens as al
+
+        masks_2d = self.masks_2d_from(images=images, noise_maps=noise_maps)
+
+        if masks_2d.ndim == 2:
+            return al.Mask2D.manual(
+                mask=masks_2d, pixel_scales=self.pixel_scales, sub_size=sub_size
+            )
+
+        return [
+            al.Mask2D.manual(
+                mask=mask, pixel_scales=self.pixel_scales, sub_size=sub_size
+            )
+            for mask in masks_2d
+        ]
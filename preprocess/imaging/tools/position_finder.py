@@ -0,0 +1,253 @@
+from os import path
+
+import numpy as np
+from scipy import ndimage
+
+from preprocess.imaging.tools import mask_builder
+
+"""
+Find the positions of the multiple images of strong lenses without any interaction, as an automated alternative to
+the GUI `preprocess/imaging/gui/positions.py`, so the `positions.dat` files used to resample inaccurate mass models
+(e.g. via `SettingsLens(auto_positions_factor=...)`) can be made for a whole sample.
+
+The positions are found in the signal-to-noise map of the smoothed image, which should have its lens light subtracted
+if the lens light is bright:
+
+ 1) The arcs are the connected regions of pixels above a S/N threshold, as for the `MaskBuilder` (see
+    `mask_builder.py`).
+ 2) The candidate images are the local maxima of the S/N map within the arcs, found with a maximum filter of the
+    whole batch of images at once. Peaks at the centre of the lens, where there is residual lens light and the
+    demagnified central image, are removed.
+ 3) The candidates are grouped into sets of multiple images. If the arcs are separate regions (e.g. a double or quad),
+    the first group is the brightest peak of every arc, the second group the second brightest peak of every arc, and so
+    on. If the source forms one connected ring, the group is the brightest peaks around the ring.
+
+Groups with fewer than two positions cannot constrain the mass model and are discarded.
+"""
+
+
+class PositionFinder:
+    def __init__(
+        self,
+        pixel_scales,
+        blurring_gaussian_sigma=0.1,
+        signal_to_noise_threshold=10.0,
+        min_region_pixels=10,
+        min_separation=0.3,
+        inner_radius=0.3,
+        outer_radius=None,
+        centre=(0.0, 0.0),
+        max_groups=1,
+        max_positions=4,
+    ):
+        """
+        Parameters
+        ----------
+        pixel_scales : float
+            The arc-second to pixel conversion factor of the images.
+        blurring_gaussian_sigma : float
+            The sigma of the Gaussian the images are smoothed with, in arc-seconds.
+        signal_to_noise_threshold : float
+            The signal-to-noise of the smoothed image above which a pixel is part of an arc.
+        min_region_pixels : int
+            The minimum number of pixels of an arc, removing noise peaks.
+        min_separation : float
+            The minimum distance between two positions, in arc-seconds, which is the size of the maximum filter.
+        inner_radius : float
+            Peaks within this distance of `centre` (in arc-seconds) are not positions.
+        outer_radius : float or None
+            Arcs whose closest pixel to `centre` is further than this (in arc-seconds) are removed.
+        centre : (float, float)
+            The (y,x) arc-second centre of the lens.
+        max_groups : int
+            The maximum number of groups of multiple images output for every lens.
+        max_positions : int
+            The maximum number of positions in a group.
+        """
+        self.pixel_scales = pixel_scales
+        self.min_separation = min_separation
+        self.inner_radius = inner_radius
+        self.max_groups = max_groups
+        self.max_positions = max_positions
+
+        self.mask_builder = mask_builder.MaskBuilder(
+            pixel_scales=pixel_scales,
+            blurring_gaussian_sigma=blurring_gaussian_sigma,
+            signal_to_noise_threshold=signal_to_noise_threshold,
+            min_region_pixels=min_region_pixels,
+            max_region_radius=outer_radius,
+            centre=centre,
+            margin=0.0,
+        )
+
+    def peaks_from(self, signal_to_noise_maps, arcs):
+        """
+        Returns the local maxima of a batch of S/N maps within their arcs and outside `inner_radius`, as a boolean
+        ndarray of shape [total_images, total_y, total_x].
+        """
+        size = 2 * int(np.ceil(self.min_separation / self.pixel_scales)) + 1
+
+        maxima = ndimage.maximum_filter(
+            signal_to_noise_maps, size=(1, size, size), mode="constant", cval=-np.inf
+        )
+
+        distances = self.mask_builder.distance_map_from(
+            shape_2d=signal_to_noise_maps.shape[1:]
+        )
+
+        return (
+            (signal_to_noise_maps == maxima)
+            & arcs
+            & (distances > self.inner_radius)[None]
+        )
+
+    def scaled_from(self, pixels, shape_2d):
+        """Returns the (y,x) arc-second coordinates of the centres of (y,x) pixels."""
+        return [
+            (
+                float(((shape_2d[0] - 1) / 2.0 - y) * self.pixel_scales),
+                float((x - (shape_2d[1] - 1) / 2.0) * self.pixel_scales),
+            )
+            for y, x in pixels
+        ]
+
+    def groups_from(self, signal_to_noise_map, arcs, peaks):
+        """
+        Group the peaks of one image into sets of multiple images (see the module docstring), returning the (y,x) pixel
+        coordinates of every group.
+        """
+        labels, _ = ndimage.label(arcs)
+
+        ys, xs = np.nonzero(peaks)
+
+        if ys.size == 0:
+            return []
+
+        order = np.argsort(-signal_to_noise_map[ys, xs])
+        ys, xs = ys[order], xs[order]
+        peak_labels = labels[ys, xs]
+
+        if len(np.unique(peak_labels)) == 1:
+            groups = [list(zip(ys, xs))[: self.max_positions]]
+        else:
+            groups = []
+            for rank in range(self.max_groups):
+                group = []
+                for label in np.unique(peak_labels):
+                    pixels = list(
+                        zip(ys[peak_labels == label], xs[peak_labels == label])
+                    )
+                    if rank < len(pixels):
+                        group.append(pixels[rank])
+                groups.append(group[: self.max_positions])
+
+        return [group for group in groups if len(group) >= 2][: self.max_groups]
+
+    def positions_from(self, images, noise_maps):
+        """
+        Returns the positions of a batch of images and noise-maps, as a list (one entry per image) of lists of groups
+        of (y,x) arc-second coordinates, which can be passed to a `GridIrregularGrouped`.
+
+        Parameters
+        ----------
+        images : np.ndarray
+            The (lens light subtracted) images of the batch, of shape [total_images, total_y, total_x].
+        noise_maps : np.ndarray
+            The noise-maps of the batch, of the same shape as the images.
+        """
+        images = np.asarray(images, dtype="float64")
+        noise_maps = np.asarray(noise_maps, dtype="float64")
+
+        signal_to_noise_maps = self.mask_builder.signal_to_noise_maps_from(
+            images=images, noise_maps=noise_maps
+        )
+
+        arcs = self.mask_builder.regions_from(
+            detections=signal_to_noise_maps
+            > self.mask_builder.signal_to_noise_threshold
+        )
+
+        peaks = self.peaks_from(signal_to_noise_maps=signal_to_noise_maps, arcs=arcs)
+
+        return [
+            [
+                self.scaled_from(pixels=group, shape_2d=images.shape[1:])
+                for group in self.groups_from(
+                    signal_to_noise_map=signal_to_noise_map,
+                    arcs=arcs_2d,
+                    peaks=peaks_2d,
+                )
+            ]
+            for signal_to_noise_map, arcs_2d, peaks_2d in zip(
+                signal_to_noise_maps, arcs, peaks
+            )
+        ]
+
+
+def output_positions_of_sample(
+    position_finder,
+    dataset_paths,
+    image_file="image.fits",
+    noise_map_file="noise_map.fits",
+    positions_file="positions.dat",
+):
+    """
+    Find the positions of every lens of a sample and output them as `positions_file` in the dataset folder of each
+    lens. Lenses whose images have the same shape are processed as one batch.
+
+    Parameters
+    ----------
+    position_finder : PositionFinder
+        The finder used for every lens.
+    dataset_paths : [str]
+        The dataset folder of every lens, containing its image and noise-map.
+    image_file : str
+        The name of the .fits file of the image, which can be a lens light subtracted image.
+    positions_file : str
+        The name of the file the positions are output to, which overwrites any positions file of that name (e.g. one
+        marked by hand).
+
+    Returns
+    -------
+    [str]
+        The dataset paths of the lenses where no group of at least two positions was found, which have no positions
+        file output.
+    """
+    import autolens as al
+
+    batches = {}
+
+    for dataset_path in dataset_paths:
+
+        image = al.Array.from_fits(
+            file_path=path.join(dataset_path, image_file),
+            pixel_scales=position_finder.pixel_scales,
+        ).in_2d
+
+        noise_map = al.Array.from_fits(
+            file_path=path.join(dataset_path, noise_map_file),
+            pixel_scales=position_finder.pixel_scales,
+        ).in_2d
+
+        batches.setdefault(image.shape, []).append((dataset_path, image, noise_map))
+
+    failed = []
+
+    for batch in batches.values():
+
+        positions_of_batch = position_finder.positions_from(
+            images=np.stack([image for _, image, _ in batch]),
+            noise_maps=np.stack([noise_map for _, _, noise_map in batch]),
+        )
+
+        for (dataset_path, _, _), positions in zip(batch, positions_of_batch):
+
+            if not positions:
+                failed.append(dataset_path)
+                continue
+
+            al.GridIrregularGrouped(grid=positions).output_to_file(
+                file_path=path.join(dataset_path, positions_file), overwrite=True
+            )
+
+    return failed
@@ -0,0 +1,169 @@
+import numpy as np
+from scipy import ndimage
+
+"""
+Trim an oversized PSF to the smallest odd shape that keeps a chosen fraction of its energy, reducing the cost of PSF
+convolution in every likelihood evaluation of a lens model fit.
+
+The `Convolver` blurs every image pixel in the mask and its blurring region with every pixel of the PSF, so the cost of
+convolution is proportional to:
+
+    (pixels in mask + pixels in blurring region) x (pixels in PSF)
+
+where the blurring region (the pixels outside the mask whose light is blurred into it) also grows with the PSF. The
+timing model used to predict the speedup of a fit is Amdahl`s law: if a fraction `convolution_fraction` of the time of
+a likelihood evaluation is spent on convolution, the likelihood is sped up by
+
+    1 / ((1 - convolution_fraction) + convolution_fraction x new_cost / old_cost)
+
+The fraction depends on the model (e.g. it is larger for fits with many light profiles or an inversion), so it should
+be measured for your fits where possible.
+"""
+
+
+def radii_from(shape_2d):
+    """
+    Returns the 'radius' of every pixel of a kernel of odd `shape_2d`, which is the half-width of the smallest odd
+    square about the kernel centre containing the pixel.
+    """
+    if shape_2d[0] % 2 == 0 or shape_2d[1] % 2 == 0:
+        raise ValueError(
+            f"The PSF has even dimensions {shape_2d}, use `al.preprocess.psf_with_odd_dimensions_from_psf` first."
+        )
+
+    y = np.abs(np.arange(shape_2d[0]) - shape_2d[0] // 2)
+    x = np.abs(np.arange(shape_2d[1]) - shape_2d[1] // 2)
+
+    return np.maximum(y[:, None], x[None, :])
+
+
+def encircled_energies_from(psf_2d):
+    """
+    Returns the odd kernel sizes 1, 3, 5, ... of a PSF and the fraction of the PSF`s (absolute) energy within the
+    central square of each size.
+    """
+    psf_2d = np.abs(np.asarray(psf_2d, dtype="float64"))
+
+    radii = radii_from(shape_2d=psf_2d.shape)
+
+    energies = np.cumsum(np.bincount(radii.ravel(), weights=psf_2d.ravel()))
+
+    return 2 * np.arange(energies.size) + 1, energies / energies[-1]
+
+
+def energy_within_shape_from(psf_2d, shape_2d):
+    """Returns the fraction of a PSF`s (absolute) energy within its central region of odd `shape_2d`."""
+    psf_2d = np.abs(np.asarray(psf_2d, dtype="float64"))
+
+    y0 = (psf_2d.shape[0] - shape_2d[0]) // 2
+    x0 = (psf_2d.shape[1] - shape_2d[1]) // 2
+
+    return float(
+        np.sum(psf_2d[y0 : y0 + shape_2d[0], x0 : x0 + shape_2d[1]]) / np.sum(psf_2d)
+    )
+
+
+def trimmed_shape_from(psf_2d, energy_fraction=0.99):
+    """
+    Returns the smallest odd shape of a PSF whose central region contains `energy_fraction` of its energy, which does
+    not exceed the PSF`s own shape.
+    """
+    sizes, energies = encircled_energies_from(psf_2d=psf_2d)
+
+    size = sizes[min(np.searchsorted(energies, energy_fraction), sizes.size - 1)]
+
+    shape_2d = np.shape(psf_2d)
+
+    return min(int(size), shape_2d[0]), min(int(size), shape_2d[1])
+
+
+def convolution_cost_from(mask, kernel_shape_2d):
+    """
+    Returns the cost of convolving the image of a mask with a kernel, which is the number of pixels in the mask and
+    its blurring region multiplied by the number of pixels in the kernel.
+
+    Parameters
+    ----------
+    mask : np.ndarray
+        The 2D mask of the fit, where `True` is masked.
+    kernel_shape_2d : (int, int)
+        The shape of the PSF.
+    """
+    unmasked = ~np.asarray(mask, dtype=bool)
+
+    blurred = ndimage.binary_dilation(
+        unmasked, structure=np.ones(kernel_shape_2d, dtype=bool)
+    )
+
+    return int(np.sum(blurred)) * kernel_shape_2d[0] * kernel_shape_2d[1]
+
+
+def speedup_from(mask, shape_2d, new_shape_2d, convolution_fraction=0.5):
+    """
+    Returns the speedup of PSF convolution and the predicted speedup of a likelihood evaluation when the PSF is
+    trimmed from `shape_2d` to `new_shape_2d`, using the timing model described in the module docstring.
+    """
+    cost_ratio = convolution_cost_from(
+        mask=mask, kernel_shape_2d=new_shape_2d
+    ) / convolution_cost_from(mask=mask, kernel_shape_2d=shape_2d)
+
+    return (
+        1.0 / cost_ratio,
+        1.0 / ((1.0 - convolution_fraction) + convolution_fraction * cost_ratio),
+    )
+
+
+def report_from(psf_2d, mask, energy_fraction=0.99, convolution_fraction=0.5):
+    """
+    Returns a report of trimming a PSF by its encircled energy: the encircled energy of every odd kernel size, the
+    trimmed shape, the energy it keeps and the predicted speedups of convolution and of a likelihood evaluation.
+
+    Parameters
+    ----------
+    psf_2d : np.ndarray
+        The 2D PSF, which must have odd dimensions.
+    mask : np.ndarray
+        The 2D mask of the fit, where `True` is masked.
+    energy_fraction : float
+        The fraction of the PSF`s energy the trimmed PSF keeps.
+    convolution_fraction : float
+        The fraction of the time of a likelihood evaluation spent on PSF convolution.
+    """
+    sizes, energies = encircled_energies_from(psf_2d=psf_2d)
+
+    shape_2d = np.shape(psf_2d)
+    new_shape_2d = trimmed_shape_from(psf_2d=psf_2d, energy_fraction=energy_fraction)
+
+    convolution_speedup, likelihood_speedup = speedup_from(
+        mask=mask,
+        shape_2d=shape_2d,
+        new_shape_2d=new_shape_2d,
+        convolution_fraction=convolution_fraction,
+    )
+
+    return {
+        "encircled_energies": dict(zip(sizes.tolist(), energies.tolist())),
+        "shape_2d": shape_2d,
+        "trimmed_shape_2d": new_shape_2d,
+        "energy_kept": energy_within_shape_from(psf_2d=psf_2d, shape_2d=new_shape_2d),
+        "convolution_speedup": convolution_speedup,
+        "likelihood_speedup": likelihood_speedup,
+    }
+
+
+def trimmed_psf_from(psf, energy_fraction=0.99):
+    """
+    Returns a PSF `Kernel` trimmed to the smallest odd shape that keeps `energy_fraction` of its energy and
+    renormalized, so its values sum to one.
+    """
+    import autolens as al
+
+    new_shape_2d = trimmed_shape_from(psf_2d=psf.in_2d, energy_fraction=energy_fraction)
+
+    return al.Kernel.manual_2d(
+        array=al.preprocess.array_with_new_shape(
+            array=psf, new_shape=new_shape_2d
+        ).in_2d,
+        pixel_scales=psf.pixel_scales,
+        renormalize=True,
+    )
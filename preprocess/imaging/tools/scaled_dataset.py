@@ -0,0 +1,317 @@
+from multiprocessing import Pool
+from os import path
+
+import numpy as np
+from scipy import ndimage
+
+from preprocess.imaging.tools import mask_builder
+
+"""
+Remove intervening objects (e.g. line-of-sight galaxies and stars near the lens) from large samples of strong lenses
+without any interaction, as an automated alternative to the GUI `preprocess/imaging/gui/scaled_dataset.py`.
+
+The intervening objects of every lens are found as follows, on a whole batch of images at once:
+
+ 1) The connected regions of the signal-to-noise map of the smoothed image above a threshold are found, as for the
+    `MaskBuilder` (see `mask_builder.py`).
+ 2) Regions which overlap the lens region are the lens and source, and are left unchanged. The lens region is the
+    unmasked pixels of the lens`s mask (e.g. the `mask.fits` made by the `MaskBuilder`, which covers the arcs) or, if
+    the lens has no mask, a circle of `lens_radius` about its centre, which must be larger than the Einstein radius
+    so every arc overlaps it.
+ 3) Every other region is an intervening object, which is dilated by a margin (so its faint outskirts are included)
+    without growing into the lens and source.
+
+As in `preprocess/imaging/scripts/p8_scaled_dataset.py`, the image of the intervening objects is replaced by Gaussian
+noise about the background level, their noise-map is increased to `noise_value` so the analysis omits them, and
+`image_scaled.fits`, `noise_map_scaled.fits` and `mask_scaled.fits` (`True` where the dataset was scaled) are output to
+the dataset folder of every lens.
+
+The background level and noise are estimated from the pixels at the edges of every image, excluding the intervening
+objects.
+"""
+
+
+class InterveningObjectScaler:
+    def __init__(
+        self,
+        pixel_scales,
+        blurring_gaussian_sigma=0.1,
+        signal_to_noise_threshold=5.0,
+        min_region_pixels=5,
+        lens_radius=2.5,
+        centre=(0.0, 0.0),
+        margin=0.2,
+        no_edges=2,
+        noise_value=1.0e8,
+        seed=1,
+    ):
+        """
+        Parameters
+        ----------
+        pixel_scales : float
+            The arc-second to pixel conversion factor of the images.
+        blurring_gaussian_sigma : float
+            The sigma of the Gaussian the images are smoothed with, in arc-seconds.
+        signal_to_noise_threshold : float
+            The signal-to-noise of the smoothed image above which a pixel is part of an object.
+        min_region_pixels : int
+            The minimum number of pixels of an object, removing noise peaks.
+        lens_radius : float
+            The radius of the lens region (in arc-seconds) about `centre`, for lenses without a mask. It must be larger
+            than the Einstein radius of every lens, otherwise arcs which do not reach within it are scaled as
+            intervening objects.
+        centre : (float, float)
+            The (y,x) arc-second centre of the lens.
+        margin : float
+            The distance in arc-seconds every intervening object is dilated by.
+        no_edges : int
+            The number of pixels at the edges of every image used to estimate the background.
+        noise_value : float
+            The value of the noise-map of the intervening objects.
+        seed : int
+            The seed of the noise which replaces the image of the intervening objects, combined with the index of every
+            lens in the sample.
+        """
+        self.pixel_scales = pixel_scales
+        self.lens_radius = lens_radius
+        self.no_edges = no_edges
+        self.noise_value = noise_value
+        self.seed = seed
+
+        self.mask_builder = mask_builder.MaskBuilder(
+            pixel_scales=pixel_scales,
+            blurring_gaussian_sigma=blurring_gaussian_sigma,
+            signal_to_noise_threshold=signal_to_noise_threshold,
+            min_region_pixels=min_region_pixels,
+            centre=centre,
+            margin=margin,
+        )
+
+    def lens_regions_from(self, shape, lens_masks=None):
+        """
+        Returns the lens region of every image, which is the unmasked pixels of its lens mask or a circle of
+        `lens_radius`.
+        """
+        if lens_masks is not None:
+            return ~np.asarray(lens_masks, dtype=bool)
+
+        circle = (
+            self.mask_builder.distance_map_from(shape_2d=shape[1:]) <= self.lens_radius
+        )
+
+        return np.broadcast_to(circle, shape)
+
+    def object_masks_from(self, images, noise_maps, lens_masks=None):
+        """
+        Returns the pixels of the intervening objects of a batch of images, as a boolean ndarray of shape
+        [total_images, total_y, total_x] where `True` is an intervening object. The objects are dilated by the margin
+        of the mask builder, but never into the lens region or the regions connected to the lens.
+
+        Parameters
+        ----------
+        images : np.ndarray
+            The images of the batch, of shape [total_images, total_y, total_x].
+        noise_maps : np.ndarray
+            The noise-maps of the batch, of the same shape as the images.
+        lens_masks : np.ndarray or None
+            The masks of the lenses, where `True` is masked, or `None` to use a circle of `lens_radius`.
+        """
+        detections = (
+            self.mask_builder.signal_to_noise_maps_from(
+                images=images, noise_maps=noise_maps
+            )
+            > self.mask_builder.signal_to_noise_threshold
+        )
+
+        regions = self.mask_builder.regions_from(detections=detections)
+
+        labels, total_labels = ndimage.label(
+            regions,
+            structure=mask_builder.structure_2d_in_3d_from(
+                structure_2d=ndimage.generate_binary_structure(2, 1)
+            ),
+        )
+
+        lens_regions = self.lens_regions_from(shape=images.shape, lens_masks=lens_masks)
+
+        is_lens = np.zeros(total_labels + 1, dtype=bool)
+        is_lens[np.unique(labels[lens_regions])] = True
+        is_lens[0] = True
+
+        objects = ~is_lens[labels]
+
+        margin_pixels = self.mask_builder.margin / self.pixel_scales
+
+        if margin_pixels > 0.0:
+            objects = ndimage.binary_dilation(
+                objects,
+                structure=mask_builder.structure_2d_in_3d_from(
+                    structure_2d=mask_builder.disk_from(radius_pixels=margin_pixels)
+                ),
+            )
+
+        return objects & ~lens_regions & ~(is_lens[labels] & (labels > 0))
+
+    def backgrounds_from(self, images, object_masks):
+        """
+        Returns the background level and noise of every image, estimated as the median and the normalized median
+        absolute deviation of the pixels at its edges which are not intervening objects.
+        """
+        edges = np.zeros(images.shape[1:], dtype=bool)
+        edges[: self.no_edges] = True
+        edges[-self.no_edges :] = True
+        edges[:, : self.no_edges] = True
+        edges[:, -self.no_edges :] = True
+
+        values = np.where(object_masks[:, edges], np.nan, images[:, edges])
+
+        levels = np.nanmedian(values, axis=1)
+        sigmas = 1.4826 * np.nanmedian(np.abs(values - levels[:, None]), axis=1)
+
+        return np.nan_to_num(levels), np.nan_to_num(sigmas)
+
+    def scaled_from(self, images, noise_maps, lens_masks=None, indexes=None):
+        """
+        Returns the scaled images, scaled noise-maps and masks of the scaled pixels of a batch of lenses, where the
+        noise of every lens is seeded by `seed` and its index in the sample (`indexes`, which defaults to its index in
+        the batch).
+        """
+        images = np.asarray(images, dtype="float64")
+        noise_maps = np.asarray(noise_maps, dtype="float64")
+
+        object_masks = self.object_masks_from(
+            images=images, noise_maps=noise_maps, lens_masks=lens_masks
+        )
+
+        levels, sigmas = self.backgrounds_from(images=images, object_masks=object_masks)
+
+        if indexes is None:
+            indexes = range(images.shape[0])
+
+        random_noise = np.stack(
+            [
+                np.random.default_rng([self.seed, index]).normal(
+                    loc=level, scale=sigma, size=images.shape[1:]
+                )
+                for index, level, sigma in zip(indexes, levels, sigmas)
+            ]
+        )
+
+        return (
+            np.where(object_masks, random_noise, images),
+            np.where(object_masks, self.noise_value, noise_maps),
+            object_masks,
+        )
+
+
+def _output_scaled_datasets(args):
+    """
+    Scale the datasets of a chunk of lenses and output them, which is performed by each process of the pool so it
+    imports **PyAutoLens** itself. Lenses of the same shape are scaled as one batch.
+    """
+    import autolens as al
+
+    scaler, dataset_paths, start, mask_file, suffix = args
+
+    batches = {}
+
+    for index, dataset_path in enumerate(dataset_paths, start=start):
+
+        image = al.Array.from_fits(
+            file_path=path.join(dataset_path, "image.fits"),
+            pixel_scales=scaler.pixel_scales,
+        ).in_2d
+
+        noise_map = al.Array.from_fits(
+            file_path=path.join(dataset_path, "noise_map.fits"),
+            pixel_scales=scaler.pixel_scales,
+        ).in_2d
+
+        mask_path = path.join(dataset_path, mask_file) if mask_file else None
+
+        if mask_path is not None and path.exists(mask_path):
+            lens_mask = np.asarray(
+                al.Mask2D.from_fits(
+                    file_path=mask_path, pixel_scales=scaler.pixel_scales
+                )
+            )
+        else:
+            lens_mask = None
+
+        key = (image.shape, lens_mask is None)
+
+        batches.setdefault(key, []).append(
+            (index, dataset_path, image, noise_map, lens_mask)
+        )
+
+    for (_, has_no_mask), batch in batches.items():
+
+        images, noise_maps, masks = scaler.scaled_from(
+            images=np.stack([lens[2] for lens in batch]),
+            noise_maps=np.stack([lens[3] for lens in batch]),
+            lens_masks=None if has_no_mask else np.stack([lens[4] for lens in batch]),
+            indexes=[lens[0] for lens in batch],
+        )
+
+        for (_, dataset_path, _, _, _), image, noise_map, mask in zip(
+            batch, images, noise_maps, masks
+        ):
+
+            al.Array.manual_2d(
+                array=image, pixel_scales=scaler.pixel_scales
+            ).output_to_fits(
+                file_path=path.join(dataset_path, f"image{suffix}.fits"), overwrite=True
+            )
+            al.Array.manual_2d(
+                array=noise_map, pixel_scales=scaler.pixel_scales
+            ).output_to_fits(
+                file_path=path.join(dataset_path, f"noise_map{suffix}.fits"),
+                overwrite=True,
+            )
+            al.Mask2D.manual(
+                mask=mask, pixel_scales=scaler.pixel_scales
+            ).output_to_fits(
+                file_path=path.join(dataset_path, f"mask{suffix}.fits"), overwrite=True
+            )
+
+
+def output_scaled_datasets(
+    scaler,
+    dataset_paths,
+    mask_file="mask.fits",
+    suffix="_scaled",
+    processes=1,
+    chunk_size=100,
+):
+    """
+    Remove the intervening objects of every lens of a sample and output its `image_scaled.fits`,
+    `noise_map_scaled.fits` and `mask_scaled.fits` to its dataset folder (with `_scaled` replaced by `suffix`).
+
+    Parameters
+    ----------
+    scaler : InterveningObjectScaler
+        The scaler used for every lens.
+    dataset_paths : [str]
+        The dataset folder of every lens, containing its `image.fits`, `noise_map.fits` and (optionally) its mask.
+    mask_file : str or None
+        The name of the .fits file of the lens mask in every dataset folder, which defines the lens region. Lenses
+        without this file use a circle of `lens_radius`.
+    suffix : str
+        The suffix of the names of the output .fits files, which overwrite any files of those names (e.g. those
+        scaled with the GUI).
+    processes : int
+        The number of processes the lenses are scaled in.
+    chunk_size : int
+        The number of lenses scaled by each process at a time.
+    """
+    args = [
+        (scaler, dataset_paths[index : index + chunk_size], index, mask_file, suffix)
+        for index in range(0, len(dataset_paths), chunk_size)
+    ]
+
+    if processes == 1:
+        for arg in args:
+            _output_scaled_datasets(arg)
+    else:
+        with Pool(processes=processes) as pool:
+            pool.map(_output_scaled_datasets, args)
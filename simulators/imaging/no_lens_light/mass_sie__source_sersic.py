@@ -2,6 +2,8 @@ from os import path
 import autolens as al
 import autolens.plot as aplt
 
+from simulators.tools import simulation_cache
+
 """
 This script simulates `Interferometer` of a strong lens where:
 
@@ -106,21 +108,14 @@ We can now pass this simulator a tracer, which creates the ray-traced image plot
 imaging dataset.
 """
 
-imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+imaging = simulation_cache.imaging_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
+)
 
 """Lets plot the simulated `Imaging` dataset before we output it to fits."""
 
 aplt.Imaging.subplot_imaging(imaging=imaging)
 
-"""Output our simulated dataset to the dataset path as .fits files"""
-
-imaging.output_to_fits(
-    image_path=path.join(dataset_path, "image.fits"),
-    psf_path=path.join(dataset_path, "psf.fits"),
-    noise_map_path=path.join(dataset_path, "noise_map.fits"),
-    overwrite=True,
-)
-
 """
 Pickle the `Tracer` in the dataset folder, ensuring the true `Tracer` is safely stored and available if we need to 
 check how the dataset was simulated in the future. 
@@ -0,0 +1,129 @@
+from os import path
+import autofit as af
+import autolens as al
+
+from simulators.tools import batch
+from simulators.tools import grid_iterate
+
+"""
+This script simulates a large sample of `Imaging` datasets of strong lenses where:
+
+ - The lens `Galaxy`'s total mass distribution is an `EllipticalIsothermal`.
+ - The source `Galaxy`'s `LightProfile` is an `EllipticalSersic`.
+
+Unlike the other simulator scripts, which simulate one lens with hard-coded parameters, the parameters of every lens
+are drawn from priors (or read from a table) and the lenses are simulated in parallel. This is the approach to use for 
+samples of thousands of lenses or more, for example training sets for machine learning or injection tests.
+"""
+
+"""
+The path where the sample will be output, which in this case is:
+`/autolens_workspace/dataset/imaging/batch/mass_sie__source_sersic`
+"""
+
+dataset_path = path.join("dataset", "imaging", "batch", "mass_sie__source_sersic")
+
+"""The grid and PSF every lens is simulated using, as in the other simulator scripts."""
+
+grid = al.GridIterate.uniform(
+    shape_2d=(100, 100), pixel_scales=0.1, fractional_accuracy=0.9999
+)
+
+"""
+The lenses of a sample are similar, so the same (central) pixels need a high sub-size in every lens. The 
+`GridIterateWarmStart` learns the sub-size every pixel converges at from the lens at the median of the priors and 
+starts every lens from it, checking every pixel still meets the fractional accuracy, which skips most of the low 
+sub-size iterations of a `GridIterate`. The learned sub-sizes are frozen, so every lens starts from the same sub-sizes
+and can be reproduced on its own.
+"""
+
+grid = grid_iterate.GridIterateWarmStart.from_grid(grid=grid)
+
+psf = al.Kernel.from_gaussian(
+    shape_2d=(11, 11), sigma=0.1, pixel_scales=grid.pixel_scales, renormalize=True
+)
+
+"""
+The model of the sample, whose priors the parameters of every lens are drawn from. This uses the same API as the
+models we fit in phases, so any `GalaxyModel` can be simulated in batch.
+"""
+
+lens = al.GalaxyModel(redshift=0.5, mass=al.mp.EllipticalIsothermal)
+lens.mass.centre_0 = af.GaussianPrior(mean=0.0, sigma=0.05)
+lens.mass.centre_1 = af.GaussianPrior(mean=0.0, sigma=0.05)
+lens.mass.elliptical_comps.elliptical_comps_0 = af.UniformPrior(
+    lower_limit=-0.2, upper_limit=0.2
+)
+lens.mass.elliptical_comps.elliptical_comps_1 = af.UniformPrior(
+    lower_limit=-0.2, upper_limit=0.2
+)
+lens.mass.einstein_radius = af.UniformPrior(lower_limit=0.8, upper_limit=1.8)
+
+source = al.GalaxyModel(redshift=1.0, bulge=al.lp.EllipticalSersic)
+source.bulge.centre_0 = af.GaussianPrior(mean=0.0, sigma=0.1)
+source.bulge.centre_1 = af.GaussianPrior(mean=0.0, sigma=0.1)
+source.bulge.elliptical_comps.elliptical_comps_0 = af.UniformPrior(
+    lower_limit=-0.3, upper_limit=0.3
+)
+source.bulge.elliptical_comps.elliptical_comps_1 = af.UniformPrior(
+    lower_limit=-0.3, upper_limit=0.3
+)
+source.bulge.intensity = af.UniformPrior(lower_limit=0.1, upper_limit=0.5)
+source.bulge.effective_radius = af.UniformPrior(lower_limit=0.1, upper_limit=1.0)
+source.bulge.sersic_index = af.UniformPrior(lower_limit=1.0, upper_limit=4.0)
+
+model = af.CollectionPriorModel(
+    galaxies=af.CollectionPriorModel(lens=lens, source=source)
+)
+
+"""
+The batch simulator, which defines the exposure time, background sky and noise of every lens. The `seed` is combined
+with the index of every lens to give each lens its own seed, so any lens in the sample can be reproduced on its own.
+"""
+
+batch_simulator = batch.BatchSimulatorImaging(
+    model=model,
+    grid=grid,
+    psf=psf,
+    exposure_time=300.0,
+    background_sky_level=0.1,
+    add_poisson_noise=True,
+    seed=1,
+)
+
+"""
+Simulate the sample, appending every lens to the HDF5 container `imaging.hdf5` alongside a .csv of the parameters of 
+every lens. To simulate lenses with specific parameters, pass a .csv table with one column per `model.parameter_names` 
+via `table_path` instead of `total_lenses`.
+"""
+
+if __name__ == "__main__":
+
+    timing = batch.simulate_sample(
+        batch_simulator=batch_simulator,
+        output_path=dataset_path,
+        total_lenses=10000,
+        chunk_size=1000,
+        processes=4,
+    )
+
+    print(
+        f"Simulated {timing['total_lenses']} lenses in {timing['total_time']} seconds."
+    )
+    print(f"Throughput: {timing['lenses_per_second']} lenses per second.")
+    print(
+        f"Mean (max) time per lens: {timing['mean_lens_time']} ({timing['max_lens_time']}) seconds."
+    )
+
+    """
+    Every lens is stored in one container file, rather than three .fits files per lens. Any lens can be loaded by name,
+    reading only that lens from the container:
+
+        from simulators.tools import container
+
+        imaging = container.imaging_from_container(
+            file_path=path.join(dataset_path, "imaging.hdf5"), name="lens_0"
+        )
+
+    An `ImagingContainer` opened with `mode="r"` can also be iterated over, giving the `Imaging` of every lens in turn.
+    """
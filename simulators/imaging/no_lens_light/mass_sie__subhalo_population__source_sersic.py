@@ -0,0 +1,158 @@
+from os import path
+import autolens as al
+import autolens.plot as aplt
+
+from simulators.tools import subhalo_population
+from simulators.tools import simulation_cache
+
+"""
+This script simulates `Imaging` of a strong lens where:
+
+ - The lens `Galaxy`'s total mass distribution is an `EllipticalIsothermal`.
+ - The lens has a population of 1000 `SphericalTruncatedNFWMCRLudlow` subhalos, drawn from a power-law mass function.
+ - The source `Galaxy`'s `LightProfile` is an `EllipticalSersic`.
+"""
+
+"""
+The `dataset_type` describes the type of data being simulated (in this case, `Imaging` data) and `dataset_name` 
+gives it a descriptive name. They define the folder the dataset is output to on your hard-disk:
+
+ - The image will be output to `/autolens_workspace/dataset/dataset_type/dataset_name/image.fits`.
+ - The noise-map will be output to `/autolens_workspace/dataset/dataset_type/dataset_name/lens_name/noise_map.fits`.
+ - The psf will be output to `/autolens_workspace/dataset/dataset_type/dataset_name/psf.fits`.
+"""
+
+dataset_type = "imaging"
+dataset_label = "no_lens_light"
+dataset_name = "mass_sie__subhalo_population__source_sersic"
+
+"""
+The path where the dataset will be output, which in this case is:
+`/autolens_workspace/dataset/imaging/no_lens_light/mass_sie__subhalo_population__source_sersic`
+"""
+
+dataset_path = path.join("dataset", dataset_type, dataset_label, dataset_name)
+
+"""
+For simulating an image of a strong lens, we recommend using a GridIterate object. This represents a grid of (y,x) 
+coordinates like an ordinary Grid, but when the light-profile`s image is evaluated below (using the Tracer) the 
+sub-size of the grid is iteratively increased (in steps of 2, 4, 8, 16, 24) until the input fractional accuracy of 
+99.99% is met.
+
+This ensures that the divergent and bright central regions of the source galaxy are fully resolved when determining the
+total flux emitted within a pixel.
+"""
+
+grid = al.GridIterate.uniform(
+    shape_2d=(150, 150), pixel_scales=0.05, fractional_accuracy=0.9999
+)
+
+"""Simulate a simple Gaussian PSF for the image."""
+
+psf = al.Kernel.from_gaussian(
+    shape_2d=(11, 11), sigma=0.1, pixel_scales=grid.pixel_scales
+)
+
+"""
+To simulate the `Imaging` dataset we first create a simulator, which defines the exposure time, background sky,
+noise levels and psf of the dataset that is simulated.
+"""
+
+simulator = al.SimulatorImaging(
+    exposure_time=300.0, psf=psf, background_sky_level=0.1, add_poisson_noise=True
+)
+
+"""
+The subhalo population, whose masses are drawn from a power-law mass function and centres uniformly within 3.0".
+
+Summing the deflection angles of 1000 subhalos over every (sub-)pixel of the grid is slow, so the population is
+included in the lens galaxy as one `SubhaloPopulation`, which computes the deflection angles exactly near every subhalo
+and approximates them as point masses (grouped into cells far away) wherever the approximation is within the input 
+`relative_tolerance` of the deflection angles it replaces.
+
+The deflection angles are computed once on a uniform grid with 4x the resolution of the image and interpolated to
+the grid the image is simulated on. The `deflections_grid_from` function makes this grid a little larger than the image,
+so it covers the padding used for the PSF convolution and the sub-pixels at its very edges, and the interpolation never 
+goes outside it.
+"""
+
+subhalos = subhalo_population.subhalos_from_mass_function(
+    total_subhalos=1000, mass_min=1.0e6, mass_max=1.0e10, radius=3.0, seed=1
+)
+
+population = subhalo_population.SubhaloPopulation(
+    subhalos=subhalos, relative_tolerance=1.0e-2
+)
+
+subhalo_deflections = population.input_deflections_from_grid(
+    grid=subhalo_population.deflections_grid_from(
+        shape_2d=grid.shape_2d,
+        pixel_scales=grid.pixel_scales,
+        psf_shape_2d=psf.shape_2d,
+        upscale=4,
+    )
+)
+
+"""
+Setup the lens `Galaxy`'s mass (SIE+Shear), subhalo population and source galaxy light (elliptical Sersic) for this 
+simulated lens.
+
+For lens modeling, defining ellipticity in terms of the `elliptical_comps` improves the model-fitting procedure.
+
+However, for simulating a strong lens you may find it more intuitive to define the elliptical geometry using the 
+axis-ratio of the profile (axis_ratio = semi-major axis / semi-minor axis = b/a) and position angle phi, where phi is
+in degrees and defined counter clockwise from the positive x-axis.
+
+We can use the **PyAutoLens** `convert` module to determine the elliptical components from the axis-ratio and phi.
+"""
+
+lens_galaxy = al.Galaxy(
+    redshift=0.5,
+    mass=al.mp.EllipticalIsothermal(
+        centre=(0.0, 0.0),
+        einstein_radius=1.6,
+        elliptical_comps=al.convert.elliptical_comps_from(axis_ratio=0.7, phi=95.0),
+    ),
+    subhalos=subhalo_deflections,
+    shear=al.mp.ExternalShear(elliptical_comps=(0.0, 0.05)),
+)
+
+source_galaxy = al.Galaxy(
+    redshift=1.0,
+    bulge=al.lp.EllipticalSersic(
+        centre=(0.01, 0.01),
+        elliptical_comps=al.convert.elliptical_comps_from(axis_ratio=0.8, phi=60.0),
+        intensity=0.3,
+        effective_radius=0.3,
+        sersic_index=2.5,
+    ),
+)
+"""Use these galaxies to setup a tracer, which will generate the image for the simulated `Imaging` dataset."""
+
+tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+
+"""Lets look at the tracer`s image - this is the image we'll be simulating."""
+
+aplt.Tracer.image(tracer=tracer, grid=grid)
+
+"""
+We can now pass this simulator a tracer, which creates the ray-traced image plotted above and simulates it as an
+imaging dataset.
+"""
+
+imaging = simulation_cache.imaging_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
+)
+
+"""Lets plot the simulated `Imaging` dataset before we output it to fits."""
+
+aplt.Imaging.subplot_imaging(imaging=imaging)
+
+"""
+Pickle the `Tracer` in the dataset folder, ensuring the true `Tracer` is safely stored and available if we need to 
+check how the dataset was simulated in the future. 
+
+This will also be accessible via the `Aggregator` if a model-fit is performed using the dataset.
+"""
+
+tracer.save(file_path=dataset_path, filename="true_tracer")
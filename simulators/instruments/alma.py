@@ -2,6 +2,9 @@ from os import path
 import autolens as al
 import autolens.plot as aplt
 
+from simulators.tools import instruments
+from simulators.tools import simulation_cache
+
 """
 This tool allows one to make simulated datasets of strong lenses, which can be used to test example pipelines and
 investigate strong lens modeling on simulated datasets where the `true` answer is known.
@@ -13,9 +16,11 @@ The noise-map will be output as `/autolens_workspace/dataset/dataset_type/datase
 The psf will be output as `/autolens_workspace/dataset/dataset_type/dataset_name/psf.fits`.
 """
 
-"""To perform the Fourier transform we need the wavelengths of the baselines."""
+"""
+To perform the Fourier transform we need the wavelengths of the baselines, which are loaded by the instrument preset
+from the .fits file chosen below.
+"""
 
-uv_wavelengths_path = path.join("simulators", "interferometer", "uv_wavelengths")
 # uv_wavelengths_file = "alma_uv_wavelengths_x10k"
 # uv_wavelengths_file = "alma_uv_wavelengths_x100k"
 uv_wavelengths_file = "alma_uv_wavelengths_x500k"
@@ -23,10 +28,6 @@ uv_wavelengths_file = "alma_uv_wavelengths_x500k"
 # uv_wavelengths_file = "alma_uv_wavelengths_x5m"
 # uv_wavelengths_file = "alma_uv_wavelengths_x10m"
 
-uv_wavelengths = al.util.array.numpy_array_1d_from_fits(
-    file_path=path.join(uv_wavelengths_path, f"{uv_wavelengths_file}.fits"), hdu=0
-)
-
 """
 The `dataset_type` describes the type of data being simulated (in this case, `Imaging` data) and `dataset_name` 
 gives it a descriptive name. They define the folder the dataset is output to on your hard-disk:
@@ -58,22 +59,16 @@ This ensures that the divergent and bright central regions of the source galaxy
 total flux emitted within a pixel.
 """
 
-grid = al.GridIterate.uniform(
-    shape_2d=(256, 256), pixel_scales=0.05, fractional_accuracy=0.9999
-)
+instrument = instruments.instrument_from(name=dataset_instrument)
+
+grid = instrument.grid
 
 """
 To simulate the interferometer dataset we first create a simulator, which defines the shape, resolution and pixel-scale 
 of the visibilities that are simulated, as well as its exposure time, noise levels and uv-wavelengths.
 """
 
-simulator = al.SimulatorInterferometer(
-    uv_wavelengths=uv_wavelengths,
-    exposure_time=100.0,
-    background_sky_level=0.1,
-    noise_sigma=100.0,
-    transformer_class=al.TransformerNUFFT,
-)
+simulator = instrument.simulator(uv_wavelengths_file=uv_wavelengths_file)
 
 """Setup the lens `Galaxy`'s mass (SIE+Shear) and source galaxy light (elliptical Sersic) for this simulated lens."""
 
@@ -111,7 +106,9 @@ We can now pass this simulator a tracer, which creates the ray-traced image plot
 interferometer dataset.
 """
 
-interferometer = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+interferometer = simulation_cache.interferometer_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
+)
 
 """Lets plot the simulated interferometer dataset before we output it to fits."""
 
@@ -128,12 +125,3 @@ import matplotlib.pyplot as plt
 
 plt.imshow(image)
 plt.show()
-
-"""Output our simulated dataset to the dataset path as .fits files"""
-
-interferometer.output_to_fits(
-    visibilities_path=path.join(dataset_path, "visibilities.fits"),
-    noise_map_path=path.join(dataset_path, "noise_map.fits"),
-    uv_wavelengths_path=path.join(dataset_path, "uv_wavelengths.fits"),
-    overwrite=True,
-)
@@ -2,6 +2,9 @@ from os import path
 import autolens as al
 import autolens.plot as aplt
 
+from simulators.tools import instruments
+from simulators.tools import simulation_cache
+
 """
 This script simulates `Imaging` of a strong lens where:
 
@@ -37,27 +40,20 @@ This ensures that the divergent and bright central regions of the source galaxy
 total flux emitted within a pixel.
 """
 
-grid = al.GridIterate.uniform(
-    shape_2d=(800, 800), pixel_scales=0.01, fractional_accuracy=0.9999
-)
+instrument = instruments.instrument_from(name=dataset_instrument)
 
-"""Simulate a simple Gaussian PSF for the image."""
+grid = instrument.grid
 
-psf = al.Kernel.from_gaussian(
-    shape_2d=(31, 31), sigma=0.025, pixel_scales=grid.pixel_scales, renormalize=True
-)
+"""The instrument`s Gaussian PSF, which its preset builds once and reuses for every lens it simulates."""
+
+psf = instrument.psf
 
 """
 To simulate the `Imaging` dataset we first create a simulator, which defines the exposure time, background sky,
 noise levels and psf of the dataset that is simulated.
 """
 
-simulator = al.SimulatorImaging(
-    exposure_time_map=al.Array.full(fill_value=1000.0, shape_2d=grid.shape_2d),
-    psf=psf,
-    background_sky_map=al.Array.full(fill_value=1.0, shape_2d=grid.shape_2d),
-    add_poisson_noise=True,
-)
+simulator = instrument.simulator()
 
 """Setup the lens `Galaxy`'s mass (SIE+Shear) and source galaxy light (elliptical Sersic) for this simulated lens."""
 
@@ -95,23 +91,16 @@ We can now pass this simulator a tracer, which creates the ray-traced image plot
 imaging dataset.
 """
 
-imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+imaging = simulation_cache.imaging_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
+)
 
 """Lets plot the simulated `Imaging` dataset before we output it to fits."""
 
 aplt.Imaging.subplot_imaging(imaging=imaging)
 
-"""Output our simulated dataset to the dataset path as .fits files"""
-
-imaging.output_to_fits(
-    image_path=path.join(dataset_path, "image.fits"),
-    psf_path=path.join(dataset_path, "psf.fits"),
-    noise_map_path=path.join(dataset_path, "noise_map.fits"),
-    overwrite=True,
-)
-
 plotter = aplt.Plotter(
-    labels=aplt.Labels(title="Keck Adaptive Optics Image"),
+    labels=aplt.Labels(title=instrument.title),
     output=aplt.Output(path=dataset_path, filename="image", format="png"),
 )
 
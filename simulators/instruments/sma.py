@@ -2,6 +2,9 @@ from os import path
 import autolens as al
 import autolens.plot as aplt
 
+from simulators.tools import instruments
+from simulators.tools import simulation_cache
+
 """
 This tool allows one to make simulated datasets of strong lenses, which can be used to test example pipelines and
 investigate strong lens modeling on simulated datasets where the `true` answer is known.
@@ -42,29 +45,16 @@ This ensures that the divergent and bright central regions of the source galaxy
 total flux emitted within a pixel.
 """
 
-grid = al.GridIterate.uniform(
-    shape_2d=(251, 251), pixel_scales=0.05, fractional_accuracy=0.9999
-)
-
-"""To perform the Fourier transform we need the wavelengths of the baselines, which we'll load from the fits file below."""
-uv_wavelengths_path = f"simulators/interferometer/uv_wavelengths"
+instrument = instruments.instrument_from(name=dataset_instrument)
 
-uv_wavelengths = al.util.array.numpy_array_1d_from_fits(
-    file_path=path.join(uv_wavelengths_path, "sma_uv_wavelengths.fits"), hdu=0
-)
+grid = instrument.grid
 
 """
 To simulate the interferometer dataset we first create a simulator, which defines the shape, resolution and pixel-scale 
 of the visibilities that are simulated, as well as its exposure time, noise levels and uv-wavelengths.
 """
 
-simulator = al.SimulatorInterferometer(
-    uv_wavelengths=uv_wavelengths,
-    exposure_time=100.0,
-    background_sky_level=0.1,
-    noise_sigma=100.0,
-    transformer_class=al.TransformerDFT,
-)
+simulator = instrument.simulator()
 
 """Setup the lens `Galaxy`'s mass (SIE+Shear) and source galaxy light (elliptical Sersic) for this simulated lens."""
 
@@ -100,20 +90,14 @@ aplt.Tracer.image(tracer=tracer, grid=grid)
 We can now pass this simulator a tracer, which creates the ray-traced image plotted above and simulates it as an
 interferometer dataset.
 """
-interferometer = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+interferometer = simulation_cache.interferometer_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
+)
 
 """Lets plot the simulated interferometer dataset before we output it to fits."""
 
 aplt.Interferometer.subplot_interferometer(interferometer=interferometer)
 
-"""Output our simulated dataset to the dataset path as .fits files"""
-interferometer.output_to_fits(
-    visibilities_path=path.join(dataset_path, "visibilities.fits"),
-    noise_map_path=path.join(dataset_path, "noise_map.fits"),
-    uv_wavelengths_path=path.join(dataset_path, "uv_wavelengths.fits"),
-    overwrite=True,
-)
-
 plotter = aplt.Plotter(
     labels=aplt.Labels(title="Visibilities"),
     output=aplt.Output(path=dataset_path, filename="visibilities", format="png"),
@@ -2,6 +2,8 @@ from os import path
 import autolens as al
 import autolens.plot as aplt
 
+from simulators.tools import simulation_cache
+
 """
 This tool allows one to make simulated datasets of strong lenses, which can be used to test example pipelines and
 investigate strong lens modeling on simulated datasets where the `true` answer is known.
@@ -110,15 +112,9 @@ aplt.Tracer.image(tracer=tracer, grid=grid)
 We can now pass this simulator a tracer, which creates the ray-traced image plotted above and simulates it as an
 interferometer dataset.
 """
-interferometer = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+interferometer = simulation_cache.interferometer_from_tracer_and_grid(
+    simulator=simulator, tracer=tracer, grid=grid, dataset_path=dataset_path
+)
 
 """Lets plot the simulated interferometer dataset before we output it to fits."""
 # aplt.Interferometer.subplot_interferometer(interferometer=interferometer)
-
-"""Output our simulated dataset to the dataset path as .fits files"""
-interferometer.output_to_fits(
-    visibilities_path=path.join(dataset_path, "visibilities.fits"),
-    noise_map_path=path.join(dataset_path, "noise_map.fits"),
-    uv_wavelengths_path=path.join(dataset_path, "uv_wavelengths.fits"),
-    overwrite=True,
-)
@@ -0,0 +1,100 @@
+from os import path
+import autolens as al
+
+from simulators.tools import instruments
+from simulators.tools import interferometer_stream
+
+"""
+This script simulates an `Interferometer` dataset of a strong lens with an ALMA long-baseline uv-coverage of 10^7
+visibilities, where:
+
+ - The lens `Galaxy`'s total mass distribution is an `EllipticalIsothermal`.
+ - The source `Galaxy`'s `LightProfile` is an `EllipticalSersic`.
+
+Simulating every visibility at once (as the other interferometer simulator scripts do) holds the transformer,
+visibilities and noise of the full uv-coverage in memory, which is too much for 10^7+ visibilities. Instead, the 
+uv-wavelengths are memory-mapped and simulated in chunks, with the visibilities and noise-map of every chunk appended to
+.npy files on disk, so the memory used depends on the chunk size and not the number of visibilities.
+"""
+
+"""
+The path where the dataset will be output, which in this case is
+`/autolens_workspace/dataset/interferometer/mass_sie__source_sersic__streaming`
+"""
+
+dataset_path = path.join(
+    "dataset", "interferometer", "mass_sie__source_sersic__streaming"
+)
+
+"""
+The ALMA instrument preset (see `simulators/tools/instruments.py`) defines the grid and noise model of the simulation.
+The uv-wavelengths are memory-mapped from their .fits file, so only one chunk is read from disk at a time.
+"""
+
+instrument = instruments.instrument_from(name="alma")
+
+grid = instrument.grid
+
+uv_wavelengths = interferometer_stream.uv_wavelengths_from_fits(
+    file_path=path.join(
+        instruments.uv_wavelengths_path, "alma_uv_wavelengths_x10m.fits"
+    ),
+    hdu=0,
+)
+
+"""
+The streaming simulator simulates `chunk_size` visibilities at a time. The `noise_seed` plus the index of every chunk
+is used to seed the noise of that chunk, so the dataset can be reproduced.
+"""
+
+simulator = instrument.streaming_simulator(noise_seed=1, chunk_size=1000000)
+
+"""Setup the lens `Galaxy`'s mass (SIE) and source galaxy light (elliptical Sersic) for this simulated lens."""
+
+lens_galaxy = al.Galaxy(
+    redshift=0.5,
+    mass=al.mp.EllipticalIsothermal(
+        centre=(0.0, 0.0),
+        einstein_radius=1.6,
+        elliptical_comps=al.convert.elliptical_comps_from(axis_ratio=0.9, phi=45.0),
+    ),
+)
+
+source_galaxy = al.Galaxy(
+    redshift=1.0,
+    bulge=al.lp.EllipticalSersic(
+        centre=(0.1, 0.1),
+        elliptical_comps=al.convert.elliptical_comps_from(axis_ratio=0.8, phi=60.0),
+        intensity=0.3,
+        effective_radius=1.0,
+        sersic_index=2.5,
+    ),
+)
+
+tracer = al.Tracer.from_galaxies(galaxies=[lens_galaxy, source_galaxy])
+
+"""
+Simulate the dataset, which outputs `visibilities.npy`, `noise_map.npy` and `uv_wavelengths.npy` to the dataset path
+chunk by chunk.
+"""
+
+simulator.output_from_tracer_and_grid(
+    tracer=tracer, grid=grid, uv_wavelengths=uv_wavelengths, output_path=dataset_path
+)
+
+"""
+The dataset is loaded as an `Interferometer`, which can be fitted like any other interferometer dataset. Loading it
+reads the visibilities and noise-map into memory; to read them chunk by chunk instead, use 
+`interferometer_stream.arrays_from_path`, which returns them memory-mapped.
+"""
+
+interferometer = interferometer_stream.interferometer_from_path(
+    dataset_path=dataset_path
+)
+
+"""
+Pickle the `Tracer` in the dataset folder, ensuring the true `Tracer` is safely stored and available if we need to 
+check how the dataset was simulated in the future. 
+"""
+
+tracer.save(file_path=dataset_path, filename="true_tracer")
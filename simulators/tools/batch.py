@@ -0,0 +1,282 @@
+import csv
+import os
+import time
+from multiprocessing import Pool
+from os import path
+
+import numpy as np
+import autolens as al
+
+from simulators.tools import container
+from simulators.tools import grid_iterate
+
+"""
+Simulate large samples of strong lens `Imaging` datasets (e.g. training sets or injection tests of 10^4 - 10^6
+lenses) across a pool of processes.
+
+The lens model of every simulated lens is defined by a **PyAutoFit** model (e.g. a `CollectionPriorModel` of
+`GalaxyModel`'s), whose parameters are either:
+
+ - Read from a parameter table, a .csv file with one column per parameter of the model (named using
+   `model.parameter_names`) and one row per lens.
+ - Drawn from the model`s priors, using a random number generator seeded per lens.
+
+Every lens has its own seed (made from the batch seed and the lens index), which is spawned into independent streams
+that draw its parameters and its noise, so any lens of a sample can be reproduced on its own. Simulated lenses are appended to one HDF5 container
+(see `container.py`) under the names `lens_0`, `lens_1`, etc., so a sample of a million lenses is one file rather than
+a million sets of .fits files.
+"""
+
+
+class BatchSimulatorImaging:
+    def __init__(
+        self,
+        model,
+        grid,
+        psf,
+        exposure_time,
+        background_sky_level,
+        add_poisson_noise=True,
+        seed=1,
+    ):
+        """
+        Parameters
+        ----------
+        model : af.CollectionPriorModel
+            The model whose instances are the galaxies of every simulated lens, with a `galaxies` attribute.
+        grid : al.Grid or al.GridIterate or GridIterateWarmStart
+            The grid every lens is simulated on. A `GridIterateWarmStart` learns its sub-size map from the lens at the
+            median of the model`s priors and is then frozen (see `freeze_grid`), so every lens starts from the same
+            map and can be reproduced on its own, whichever lenses a process simulated before it.
+        psf : al.Kernel
+            The PSF every lens is convolved with.
+        exposure_time : float
+            The exposure time of every simulated lens.
+        background_sky_level : float
+            The background sky level of every simulated lens.
+        add_poisson_noise : bool
+            Whether Poisson noise is added to every simulated lens.
+        seed : int
+            The seed of the batch, which is combined with the index of every lens to give the lens its own seed.
+        """
+        self.model = model
+        self.grid = grid
+        self.psf = psf
+        self.exposure_time = exposure_time
+        self.background_sky_level = background_sky_level
+        self.add_poisson_noise = add_poisson_noise
+        self.seed = seed
+
+    def freeze_grid(self):
+        """
+        Learn the sub-size map of a `GridIterateWarmStart` grid from the lens at the median of the priors of the
+        model, and freeze it so the image of every lens does not depend on the lenses simulated before it.
+        """
+        if not isinstance(self.grid, grid_iterate.GridIterateWarmStart):
+            return
+
+        if self.grid.is_frozen:
+            return
+
+        instance = self.model.instance_from_prior_medians()
+
+        self.grid.freeze_from_tracer(
+            tracer=al.Tracer.from_galaxies(galaxies=instance.galaxies),
+            psf_shape_2d=self.psf.shape_2d,
+        )
+
+    def rng_from(self, index, stream):
+        """
+        Returns the random number generator of the lens at `index` for one of its independent streams, where stream 0
+        draws its parameters and stream 1 its noise seed.
+        """
+        return np.random.default_rng(
+            np.random.SeedSequence([self.seed, index]).spawn(2)[stream]
+        )
+
+    def vector_from_prior(self, index):
+        """Draw the parameters of the lens at `index` from the priors of the model, using the lens`s own seed."""
+        unit_vector = self.rng_from(index=index, stream=0).uniform(
+            size=self.model.prior_count
+        )
+        return self.model.vector_from_unit_vector(unit_vector=unit_vector)
+
+    def simulate(self, index, vector):
+        """
+        Simulate the `Imaging` of the lens at `index` with the parameters `vector`, returning the dataset and the time
+        taken to simulate it.
+        """
+        start = time.perf_counter()
+
+        instance = self.model.instance_from_vector(vector=vector)
+
+        tracer = al.Tracer.from_galaxies(galaxies=instance.galaxies)
+
+        noise_seed = int(self.rng_from(index=index, stream=1).integers(2 ** 31 - 1))
+
+        simulator = al.SimulatorImaging(
+            exposure_time=self.exposure_time,
+            psf=self.psf,
+            background_sky_level=self.background_sky_level,
+            add_poisson_noise=self.add_poisson_noise,
+            noise_seed=noise_seed,
+        )
+
+        if isinstance(self.grid, grid_iterate.GridIterateWarmStart):
+            imaging = self.grid.simulate_imaging_from_tracer(
+                simulator=simulator, tracer=tracer
+            )
+        else:
+            imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=self.grid)
+
+        return imaging, time.perf_counter() - start
+
+
+def vectors_from_table(file_path, parameter_names):
+    """
+    Returns the parameter vector of every row of a .csv parameter table, ordered by the model`s `parameter_names`.
+    """
+    with open(file_path, newline="") as f:
+        return [
+            [float(row[name]) for name in parameter_names] for row in csv.DictReader(f)
+        ]
+
+
+_batch_simulator = None
+
+
+def _init_worker(batch_simulator):
+    global _batch_simulator
+    _batch_simulator = batch_simulator
+
+
+def _simulate(args):
+
+    index, vector = args
+
+    imaging, run_time = _batch_simulator.simulate(index=index, vector=vector)
+
+    return (
+        index,
+        vector,
+        np.asarray(imaging.image.in_2d),
+        np.asarray(imaging.noise_map.in_2d),
+        run_time,
+    )
+
+
+def simulate_sample(
+    batch_simulator,
+    output_path,
+    total_lenses=None,
+    table_path=None,
+    chunk_size=1000,
+    processes=1,
+):
+    """
+    Simulate a sample of lenses and append them to the container `imaging.hdf5` in `output_path`, alongside a .csv of
+    the parameters of every lens.
+
+    Parameters
+    ----------
+    batch_simulator : BatchSimulatorImaging
+        The simulator of every lens.
+    output_path : str
+        The directory the container and parameter table are written to.
+    total_lenses : int or None
+        The number of lenses whose parameters are drawn from the priors of the model. Ignored if `table_path` is
+        input.
+    table_path : str or None
+        The path of a .csv parameter table, with one lens simulated per row.
+    chunk_size : int
+        The number of lenses sent to each process at a time, after which the container is flushed to disk.
+    processes : int
+        The number of processes the lenses are simulated in.
+
+    Returns
+    -------
+    dict
+        The number of lenses simulated, the total (wall-clock) time, the throughput in lenses per second and the
+        mean and maximum time to simulate one lens.
+    """
+    parameter_names = batch_simulator.model.parameter_names
+
+    if table_path is not None:
+        vectors = vectors_from_table(
+            file_path=table_path, parameter_names=parameter_names
+        )
+    else:
+        vectors = [
+            batch_simulator.vector_from_prior(index=index)
+            for index in range(total_lenses)
+        ]
+
+    os.makedirs(output_path, exist_ok=True)
+
+    with open(path.join(output_path, "parameters.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["index"] + list(parameter_names))
+        for index, vector in enumerate(vectors):
+            writer.writerow([index] + list(vector))
+
+    start = time.perf_counter()
+
+    batch_simulator.freeze_grid()
+
+    run_times = []
+    psf = np.asarray(batch_simulator.psf.in_2d)
+
+    def results_from(pool):
+        args = list(enumerate(vectors))
+        if pool is None:
+            return map(_simulate, args)
+        return pool.imap(_simulate, args, chunksize=max(1, chunk_size // processes))
+
+    if processes == 1:
+        _init_worker(batch_simulator=batch_simulator)
+        pool = None
+    else:
+        pool = Pool(
+            processes=processes,
+            initializer=_init_worker,
+            initargs=(batch_simulator,),
+        )
+
+    imaging_container = container.ImagingContainer(
+        file_path=path.join(output_path, "imaging.hdf5"), mode="w"
+    )
+
+    try:
+
+        for index, vector, image, noise_map, run_time in results_from(pool=pool):
+
+            imaging_container.append_arrays(
+                name=f"lens_{index}",
+                pixel_scales=batch_simulator.grid.pixel_scales,
+                image=image,
+                noise_map=noise_map,
+                psf=psf,
+            )
+
+            run_times.append(run_time)
+
+            if len(run_times) % chunk_size == 0:
+                imaging_container.file.flush()
+
+    finally:
+
+        imaging_container.close()
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    total_time = time.perf_counter() - start
+
+    return {
+        "total_lenses": len(run_times),
+        "total_time": total_time,
+        "lenses_per_second": len(run_times) / total_time if total_time > 0 else 0.0,
+        "mean_lens_time": float(np.mean(run_times)) if run_times else 0.0,
+        "max_lens_time": float(np.max(run_times)) if run_times else 0.0,
+    }
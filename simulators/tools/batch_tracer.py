@@ -0,0 +1,430 @@
+import numpy as np
+from scipy import special
+import autolens as al
+
+"""
+Evaluate the deflection angles and images of a batch of hundreds of lens models on the same grid at once.
+
+A `Tracer` evaluates one lens model on one grid, so simulation sweeps and posterior predictive checks loop over a
+`Tracer` per model. The profiles below instead take arrays of parameters with a leading batch axis (one entry per
+model) and evaluate every model of the batch in vectorized numpy kernels. The `BatchTracer` ray-traces the sub-grid of
+a `Grid` (which is computed once and reused for every batch) through the lens galaxy`s mass profiles and returns the
+binned images of every model, shape [total_models, total_pixels].
+
+The profiles follow the conventions of their **PyAutoLens** counterparts (`elliptical_comps`, angles counter-clockwise
+from the positive x-axis, (y,x) coordinates) and are available for:
+
+ - `EllipticalIsothermal` and `EllipticalPowerLaw` mass profiles (the latter via the hypergeometric series of
+   Tessore & Metcalf 2015, with the Einstein radius normalized as for the isothermal profile).
+ - `ExternalShear`.
+ - `EllipticalSersic` light profiles.
+
+For example, the images of every sample of a posterior:
+
+    batch_tracer = batch_tracer.BatchTracer.from_tracers(tracers=tracers)
+
+    images = batch_tracer.images_from_grid(grid=grid)
+"""
+
+
+def axis_ratios_and_phis_from(elliptical_comps):
+    """
+    Returns the axis-ratio and position angle (in radians) of a batch of `elliptical_comps` of shape
+    [total_models, 2], as `al.convert.axis_ratio_and_phi_from` does for one profile.
+    """
+    elliptical_comps = np.asarray(elliptical_comps, dtype="float")
+
+    phis = np.arctan2(elliptical_comps[:, 0], elliptical_comps[:, 1]) / 2.0
+    fac = np.minimum(np.sqrt(np.sum(elliptical_comps ** 2, axis=1)), 0.999)
+
+    return (1.0 - fac) / (1.0 + fac), phis
+
+
+def grids_to_profile_frame(grid, centres, phis):
+    """
+    Shift and rotate a (y,x) grid of shape [total_coordinates, 2] to the reference frame of every profile of a batch,
+    returning the y and x coordinates of shape [total_models, total_coordinates].
+    """
+    y = grid[None, :, 0] - centres[:, 0, None]
+    x = grid[None, :, 1] - centres[:, 1, None]
+
+    cos_phi = np.cos(phis)[:, None]
+    sin_phi = np.sin(phis)[:, None]
+
+    return -x * sin_phi + y * cos_phi, x * cos_phi + y * sin_phi
+
+
+def deflections_from_profile_frame(deflections_y, deflections_x, phis):
+    """Rotate deflection angles computed in the reference frame of every profile back to the grid`s frame."""
+    cos_phi = np.cos(phis)[:, None]
+    sin_phi = np.sin(phis)[:, None]
+
+    return np.stack(
+        (
+            deflections_x * sin_phi + deflections_y * cos_phi,
+            deflections_x * cos_phi - deflections_y * sin_phi,
+        ),
+        axis=-1,
+    )
+
+
+class BatchEllipticalPowerLaw:
+    def __init__(self, centre, elliptical_comps, einstein_radius, slope):
+        """
+        A batch of `EllipticalPowerLaw` mass profiles, where every parameter has a leading batch axis (`centre` and
+        `elliptical_comps` are of shape [total_models, 2], `einstein_radius` and `slope` of shape [total_models]).
+        """
+        self.centre = np.asarray(centre, dtype="float")
+        self.elliptical_comps = np.asarray(elliptical_comps, dtype="float")
+        self.einstein_radius = np.asarray(einstein_radius, dtype="float")
+        self.slope = np.asarray(slope, dtype="float")
+
+        self.axis_ratio, self.phi = axis_ratios_and_phis_from(
+            elliptical_comps=self.elliptical_comps
+        )
+
+    def __len__(self):
+        return self.einstein_radius.shape[0]
+
+    def deflections_from_grid(self, grid):
+        """
+        Returns the deflection angles of every profile of the batch, of shape [total_models, total_coordinates, 2],
+        using the complex hypergeometric solution of Tessore & Metcalf (2015).
+        """
+        y, x = grids_to_profile_frame(grid=grid, centres=self.centre, phis=self.phi)
+
+        q = self.axis_ratio[:, None]
+        t = self.slope[:, None] - 1.0
+
+        b = q * self.einstein_radius[:, None] * (2.0 / (1.0 + q)) ** (1.0 / t)
+
+        radii = np.maximum(np.sqrt((q * x) ** 2 + y ** 2), 1.0e-8)
+        angles = np.arctan2(y, q * x)
+
+        z = np.exp(1j * angles)
+
+        deflections = (
+            2.0
+            * b
+            / (1.0 + q)
+            * (b / radii) ** (t - 1.0)
+            * z
+            * special.hyp2f1(
+                1.0, 0.5 * t, 2.0 - 0.5 * t, -((1.0 - q) / (1.0 + q)) * z ** 2
+            )
+        )
+
+        return deflections_from_profile_frame(
+            deflections_y=deflections.imag,
+            deflections_x=deflections.real,
+            phis=self.phi,
+        )
+
+
+class BatchEllipticalIsothermal(BatchEllipticalPowerLaw):
+    def __init__(self, centre, elliptical_comps, einstein_radius):
+        """A batch of `EllipticalIsothermal` mass profiles, see `BatchEllipticalPowerLaw`."""
+        super().__init__(
+            centre=centre,
+            elliptical_comps=elliptical_comps,
+            einstein_radius=einstein_radius,
+            slope=np.full(np.shape(einstein_radius), 2.0),
+        )
+
+    def deflections_from_grid(self, grid):
+        """
+        Returns the deflection angles of every profile of the batch, using the analytic isothermal solution which
+        avoids evaluating the hypergeometric function.
+        """
+        y, x = grids_to_profile_frame(grid=grid, centres=self.centre, phis=self.phi)
+
+        q = np.minimum(self.axis_ratio[:, None], 0.99999)
+        root = np.sqrt(1.0 - q ** 2)
+
+        factor = 2.0 * self.einstein_radius[:, None] / (1.0 + q) * q / root
+
+        psi = np.maximum(np.sqrt((q * x) ** 2 + y ** 2), 1.0e-8)
+
+        return deflections_from_profile_frame(
+            deflections_y=factor * np.arctanh(root * y / psi),
+            deflections_x=factor * np.arctan(root * x / psi),
+            phis=self.phi,
+        )
+
+
+class BatchExternalShear:
+    def __init__(self, elliptical_comps):
+        """A batch of `ExternalShear`'s, with `elliptical_comps` of shape [total_models, 2]."""
+        self.elliptical_comps = np.asarray(elliptical_comps, dtype="float")
+
+        self.magnitude = np.sqrt(np.sum(self.elliptical_comps ** 2, axis=1))
+        self.phi = (
+            np.arctan2(self.elliptical_comps[:, 0], self.elliptical_comps[:, 1]) / 2.0
+        )
+
+    def __len__(self):
+        return self.magnitude.shape[0]
+
+    def deflections_from_grid(self, grid):
+
+        y, x = grids_to_profile_frame(
+            grid=grid, centres=np.zeros((len(self), 2)), phis=self.phi
+        )
+
+        return deflections_from_profile_frame(
+            deflections_y=-self.magnitude[:, None] * y,
+            deflections_x=self.magnitude[:, None] * x,
+            phis=self.phi,
+        )
+
+
+class BatchEllipticalSersic:
+    def __init__(
+        self, centre, elliptical_comps, intensity, effective_radius, sersic_index
+    ):
+        """A batch of `EllipticalSersic` light profiles, where every parameter has a leading batch axis."""
+        self.centre = np.asarray(centre, dtype="float")
+        self.elliptical_comps = np.asarray(elliptical_comps, dtype="float")
+        self.intensity = np.asarray(intensity, dtype="float")
+        self.effective_radius = np.asarray(effective_radius, dtype="float")
+        self.sersic_index = np.asarray(sersic_index, dtype="float")
+
+        self.axis_ratio, self.phi = axis_ratios_and_phis_from(
+            elliptical_comps=self.elliptical_comps
+        )
+
+    def __len__(self):
+        return self.intensity.shape[0]
+
+    @property
+    def sersic_constant(self):
+        n = self.sersic_index
+        return (
+            (2 * n)
+            - (1.0 / 3.0)
+            + (4.0 / (405.0 * n))
+            + (46.0 / (25515.0 * n ** 2))
+            + (131.0 / (1148175.0 * n ** 3))
+            - (2194697.0 / (30690717750.0 * n ** 4))
+        )
+
+    def image_from_grid(self, grid):
+        """
+        Returns the image of every profile of the batch, of shape [total_models, total_coordinates]. The `grid` is
+        either one grid of shape [total_coordinates, 2] or a grid per model of shape [total_models,
+        total_coordinates, 2] (e.g. a batch of source-plane grids).
+        """
+        if grid.ndim == 2:
+            grid = np.broadcast_to(grid, (len(self),) + grid.shape)
+
+        y = grid[:, :, 0] - self.centre[:, 0, None]
+        x = grid[:, :, 1] - self.centre[:, 1, None]
+
+        cos_phi = np.cos(self.phi)[:, None]
+        sin_phi = np.sin(self.phi)[:, None]
+
+        y, x = -x * sin_phi + y * cos_phi, x * cos_phi + y * sin_phi
+
+        q = self.axis_ratio[:, None]
+
+        radii = np.sqrt(q) * np.sqrt(x ** 2 + (y / q) ** 2)
+
+        return self.intensity[:, None] * np.exp(
+            -self.sersic_constant[:, None]
+            * (
+                (radii / self.effective_radius[:, None])
+                ** (1.0 / self.sersic_index[:, None])
+                - 1.0
+            )
+        )
+
+
+_batch_classes = {
+    al.mp.EllipticalIsothermal: (
+        BatchEllipticalIsothermal,
+        ("centre", "elliptical_comps", "einstein_radius"),
+    ),
+    al.mp.EllipticalPowerLaw: (
+        BatchEllipticalPowerLaw,
+        ("centre", "elliptical_comps", "einstein_radius", "slope"),
+    ),
+    al.mp.ExternalShear: (BatchExternalShear, ("elliptical_comps",)),
+    al.lp.EllipticalSersic: (
+        BatchEllipticalSersic,
+        (
+            "centre",
+            "elliptical_comps",
+            "intensity",
+            "effective_radius",
+            "sersic_index",
+        ),
+    ),
+}
+
+
+def batch_profile_from(profiles):
+    """
+    Returns the batch profile of a list of **PyAutoLens** profiles of the same class (one per model), e.g. the
+    `mass` of the lens galaxy of every sample of a posterior.
+    """
+    cls = type(profiles[0])
+
+    if cls not in _batch_classes or any(
+        type(profile) is not cls for profile in profiles
+    ):
+        raise TypeError(
+            f"A batch can only be made of one profile class of {[c.__name__ for c in _batch_classes]}"
+        )
+
+    batch_cls, names = _batch_classes[cls]
+
+    return batch_cls(
+        **{
+            name: np.array([getattr(profile, name) for profile in profiles])
+            for name in names
+        }
+    )
+
+
+class BatchTracer:
+    def __init__(
+        self,
+        lens_mass_profiles,
+        source_light_profiles,
+        lens_light_profiles=(),
+        batch_size=100,
+    ):
+        """
+        A batch of two-plane lens models, each of a lens galaxy with mass (and optionally light) and a source galaxy.
+
+        Parameters
+        ----------
+        lens_mass_profiles : [BatchEllipticalPowerLaw or BatchExternalShear]
+            The batch mass profiles of the lens galaxy, whose deflection angles are summed.
+        source_light_profiles : [BatchEllipticalSersic]
+            The batch light profiles of the source galaxy.
+        lens_light_profiles : [BatchEllipticalSersic]
+            The batch light profiles of the lens galaxy.
+        batch_size : int
+            The number of models evaluated at a time, which bounds the memory used.
+        """
+        self.lens_mass_profiles = list(lens_mass_profiles)
+        self.source_light_profiles = list(source_light_profiles)
+        self.lens_light_profiles = list(lens_light_profiles)
+        self.batch_size = batch_size
+
+        totals = {
+            len(profile)
+            for profile in self.lens_mass_profiles
+            + self.source_light_profiles
+            + self.lens_light_profiles
+        }
+
+        if len(totals) != 1:
+            raise ValueError("Every batch profile must have the same number of models.")
+
+        self.total_models = totals.pop()
+
+    @classmethod
+    def from_tracers(cls, tracers, batch_size=100):
+        """
+        Returns the `BatchTracer` of a list of two-plane `Tracer`'s with the same profiles (e.g. the tracer of every
+        sample of a posterior), whose galaxies` profiles are batched by their attribute name.
+        """
+
+        def profiles_from(galaxies, profile_type):
+            return {
+                name: [getattr(galaxy, name) for galaxy in galaxies]
+                for name, profile in vars(galaxies[0]).items()
+                if isinstance(profile, profile_type)
+            }
+
+        lens_galaxies = [tracer.planes[0].galaxies[0] for tracer in tracers]
+        source_galaxies = [tracer.planes[-1].galaxies[0] for tracer in tracers]
+
+        return BatchTracer(
+            lens_mass_profiles=[
+                batch_profile_from(profiles=profiles)
+                for profiles in profiles_from(
+                    galaxies=lens_galaxies, profile_type=al.mp.MassProfile
+                ).values()
+            ],
+            lens_light_profiles=[
+                batch_profile_from(profiles=profiles)
+                for profiles in profiles_from(
+                    galaxies=lens_galaxies, profile_type=al.lp.LightProfile
+                ).values()
+            ],
+            source_light_profiles=[
+                batch_profile_from(profiles=profiles)
+                for profiles in profiles_from(
+                    galaxies=source_galaxies, profile_type=al.lp.LightProfile
+                ).values()
+            ],
+            batch_size=batch_size,
+        )
+
+    def _slice(self, profile, start, end):
+        """Returns the models `start` to `end` of a batch profile."""
+        sliced = object.__new__(type(profile))
+        sliced.__dict__ = {
+            name: value[start:end] if isinstance(value, np.ndarray) else value
+            for name, value in profile.__dict__.items()
+        }
+        return sliced
+
+    def deflections_from_sub_grid(self, sub_grid, start, end):
+        return sum(
+            self._slice(profile=profile, start=start, end=end).deflections_from_grid(
+                grid=sub_grid
+            )
+            for profile in self.lens_mass_profiles
+        )
+
+    def images_from_grid(self, grid):
+        """
+        Returns the images of every model of the batch on a `Grid` (binned from its sub-grid), of shape
+        [total_models, total_unmasked_pixels]. The sub-grid coordinates are computed once and reused for every batch.
+        """
+        sub_grid = np.asarray(grid, dtype="float")
+        sub_length = grid.sub_size ** 2
+        total_pixels = sub_grid.shape[0] // sub_length
+
+        images = np.zeros((self.total_models, total_pixels))
+
+        for start in range(0, self.total_models, self.batch_size):
+
+            end = min(start + self.batch_size, self.total_models)
+
+            source_grid = sub_grid[None] - self.deflections_from_sub_grid(
+                sub_grid=sub_grid, start=start, end=end
+            )
+
+            sub_images = sum(
+                self._slice(profile=profile, start=start, end=end).image_from_grid(
+                    grid=source_grid
+                )
+                for profile in self.source_light_profiles
+            )
+
+            for profile in self.lens_light_profiles:
+                sub_images = sub_images + self._slice(
+                    profile=profile, start=start, end=end
+                ).image_from_grid(grid=sub_grid)
+
+            images[start:end] = sub_images.reshape(
+                end - start, total_pixels, sub_length
+            ).mean(axis=2)
+
+        return images
+
+    def images_2d_from_grid(self, grid):
+        """Returns the images of every model of the batch in 2D, of shape [total_models, total_y_pixels, total_x_pixels]."""
+        images = self.images_from_grid(grid=grid)
+
+        mask = np.asarray(grid.mask)
+
+        images_2d = np.zeros((self.total_models,) + mask.shape)
+        images_2d[:, ~mask] = images
+
+        return images_2d
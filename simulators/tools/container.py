@@ -0,0 +1,234 @@
+import numpy as np
+import h5py
+import autolens as al
+
+"""
+Store many `Imaging` or `Interferometer` datasets in one chunked HDF5 container, instead of three (or four) .fits
+files per lens.
+
+At survey scale, outputting every lens via `output_to_fits` creates millions of small files, which are slow to write,
+list and load. A container holds every lens of a sample in resizable datasets with a leading lens axis, chunked so
+that one lens is one chunk, alongside an index of lens names. Lenses are appended as they are simulated or
+preprocessed and any lens can be loaded by name without reading the rest of the container.
+
+For example:
+
+    container.output_imaging_to_container(
+        imaging=imaging, file_path="dataset/sample.hdf5", name="lens_0"
+    )
+
+    imaging = container.imaging_from_container(file_path="dataset/sample.hdf5", name="lens_0")
+
+`ImagingContainer` and `InterferometerContainer` keep the file open, which is faster when appending or loading many
+lenses.
+"""
+
+
+class AbstractContainer:
+
+    keys = ()
+
+    def __init__(self, file_path, mode="a"):
+        """
+        A chunked HDF5 container of datasets, opened with the input `mode` (`r` to read, `a` to read and append).
+        """
+        self.file_path = file_path
+        self.file = h5py.File(file_path, mode)
+
+        if "names" in self.file:
+            self._index = {
+                name: row for row, name in enumerate(self.file["names"].asstr()[:])
+            }
+        else:
+            self._index = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def names(self):
+        return list(self._index.keys())
+
+    def row_from(self, name):
+        try:
+            return self._index[name]
+        except KeyError:
+            raise KeyError(
+                f"The dataset {name} is not in the container {self.file_path}"
+            )
+
+    def _append_arrays(self, name, arrays):
+        """
+        Append the arrays of one dataset to the container, creating each resizable dataset (chunked per lens) when
+        the first dataset is appended.
+        """
+        if name in self._index:
+            raise KeyError(
+                f"The dataset {name} is already in the container {self.file_path}"
+            )
+
+        row = len(self._index)
+
+        if "names" not in self.file:
+            self.file.create_dataset(
+                "names",
+                shape=(0,),
+                maxshape=(None,),
+                dtype=h5py.string_dtype(),
+                chunks=(1024,),
+            )
+
+        for key in self.keys:
+
+            array = np.asarray(arrays[key])
+
+            if key not in self.file:
+                self.file.create_dataset(
+                    key,
+                    shape=(0,) + array.shape,
+                    maxshape=(None,) + array.shape,
+                    dtype=array.dtype,
+                    chunks=(1,) + array.shape,
+                )
+
+            self.file[key].resize(row + 1, axis=0)
+            self.file[key][row] = array
+
+        self.file["names"].resize(row + 1, axis=0)
+        self.file["names"][row] = name
+
+        self._index[name] = row
+
+    def _arrays_from(self, name):
+        row = self.row_from(name=name)
+        return {key: self.file[key][row] for key in self.keys}
+
+
+class ImagingContainer(AbstractContainer):
+
+    keys = ("image", "noise_map", "psf")
+
+    def append(self, imaging, name):
+        """Append an `Imaging` dataset to the container under `name`."""
+        self.append_arrays(
+            name=name,
+            pixel_scales=imaging.pixel_scales,
+            image=imaging.image.in_2d,
+            noise_map=imaging.noise_map.in_2d,
+            psf=imaging.psf.in_2d,
+        )
+
+    def append_arrays(self, name, pixel_scales, image, noise_map, psf):
+        """
+        Append the 2D arrays of an `Imaging` dataset to the container under `name`, which avoids creating the
+        `Imaging` object when the arrays are already available (e.g. returned by a pool of simulation processes).
+
+        The pixel scales are stored once, so every dataset in a container must share the same pixel scales.
+        """
+        if "pixel_scales" not in self.file.attrs:
+            self.file.attrs["pixel_scales"] = pixel_scales
+        elif not np.array_equal(self.file.attrs["pixel_scales"], pixel_scales):
+            raise ValueError(
+                f"The pixel scales of {name} do not match those of the container {self.file_path}"
+            )
+
+        self._append_arrays(
+            name=name, arrays={"image": image, "noise_map": noise_map, "psf": psf}
+        )
+
+    def imaging_from(self, name):
+        """Load the `Imaging` dataset `name`, reading only its chunks of the container."""
+        arrays = self._arrays_from(name=name)
+        pixel_scales = tuple(self.file.attrs["pixel_scales"])
+
+        return al.Imaging(
+            image=al.Array.manual_2d(array=arrays["image"], pixel_scales=pixel_scales),
+            noise_map=al.Array.manual_2d(
+                array=arrays["noise_map"], pixel_scales=pixel_scales
+            ),
+            psf=al.Kernel.manual_2d(array=arrays["psf"], pixel_scales=pixel_scales),
+            name=name,
+        )
+
+    def __iter__(self):
+        for name in self.names:
+            yield self.imaging_from(name=name)
+
+
+class InterferometerContainer(AbstractContainer):
+
+    keys = ("visibilities", "noise_map")
+
+    def append(self, interferometer, name):
+        """
+        Append an `Interferometer` dataset to the container under `name`.
+
+        The uv-wavelengths are stored once, so every dataset in a container must share the same uv-coverage.
+        """
+        uv_wavelengths = np.asarray(interferometer.uv_wavelengths)
+
+        if "uv_wavelengths" not in self.file:
+            self.file.create_dataset("uv_wavelengths", data=uv_wavelengths)
+        elif not np.array_equal(self.file["uv_wavelengths"][:], uv_wavelengths):
+            raise ValueError(
+                f"The uv-wavelengths of {name} do not match those of the container {self.file_path}"
+            )
+
+        self._append_arrays(
+            name=name,
+            arrays={
+                "visibilities": interferometer.visibilities,
+                "noise_map": interferometer.noise_map,
+            },
+        )
+
+    def interferometer_from(self, name):
+        """Load the `Interferometer` dataset `name`, reading only its chunks of the container."""
+        arrays = self._arrays_from(name=name)
+
+        return al.Interferometer(
+            visibilities=al.Visibilities.manual_1d(visibilities=arrays["visibilities"]),
+            noise_map=al.Visibilities.manual_1d(visibilities=arrays["noise_map"]),
+            uv_wavelengths=self.file["uv_wavelengths"][:],
+            name=name,
+        )
+
+    def __iter__(self):
+        for name in self.names:
+            yield self.interferometer_from(name=name)
+
+
+def output_imaging_to_container(imaging, file_path, name):
+    """Append an `Imaging` dataset to the container at `file_path`, creating the container if it does not exist."""
+    with ImagingContainer(file_path=file_path, mode="a") as container:
+        container.append(imaging=imaging, name=name)
+
+
+def imaging_from_container(file_path, name):
+    """Load the `Imaging` dataset `name` from the container at `file_path`."""
+    with ImagingContainer(file_path=file_path, mode="r") as container:
+        return container.imaging_from(name=name)
+
+
+def output_interferometer_to_container(interferometer, file_path, name):
+    """Append an `Interferometer` dataset to the container at `file_path`, creating it if it does not exist."""
+    with InterferometerContainer(file_path=file_path, mode="a") as container:
+        container.append(interferometer=interferometer, name=name)
+
+
+def interferometer_from_container(file_path, name):
+    """Load the `Interferometer` dataset `name` from the container at `file_path`."""
+    with InterferometerContainer(file_path=file_path, mode="r") as container:
+        return container.interferometer_from(name=name)
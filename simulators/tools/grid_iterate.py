@@ -0,0 +1,291 @@
+import numpy as np
+import autolens as al
+
+"""
+A `GridIterate` which remembers the sub-size every pixel converged at and starts the next evaluation from it.
+
+A `GridIterate` evaluates the image of every pixel at increasing sub-sizes (2, 4, 8, 16, 24) until the fractional
+accuracy is met. When simulating thousands of similar lenses (e.g. with `batch.py`), the same central pixels always
+need a high sub-size, so most of the work repeats the low sub-size levels of pixels whose answer is already known.
+
+`GridIterateWarmStart` stores the converged sub-size of every pixel in a sub-size map. On the next evaluation every
+pixel is evaluated straight at its sub-size in the map, alongside a verification pass at the sub-size below it. Pixels
+that pass the fractional accuracy check are done, and those that fail carry on iterating from their sub-size as they
+would in a `GridIterate`, so the image is as accurate as a `GridIterate` image. Pixels that pass are also checked one
+sub-size further down, and step down the map if they converge there, so the map follows the tracer down as well as up.
+
+The image of a tracer depends on the map it starts from, which by default is the map left by the previous evaluation.
+For samples where every lens must be reproducible on its own (e.g. `batch.py`), the map is learned from one fiducial
+tracer and then frozen (see `freeze_from_tracer`), so every evaluation starts from the same map.
+
+All pixels at the same sub-size level are evaluated in one batch, by masking every other pixel and passing the
+masked grid through every light profile of the tracer in a single `image_from_grid` call.
+"""
+
+
+class GridIterateWarmStart:
+    def __init__(
+        self,
+        shape_2d,
+        pixel_scales,
+        fractional_accuracy=0.9999,
+        sub_steps=(2, 4, 8, 16, 24),
+        sub_size_map=None,
+        is_frozen=False,
+    ):
+        """
+        Parameters
+        ----------
+        shape_2d : (int, int)
+            The 2D shape of the grid.
+        pixel_scales : float
+            The arc-second to pixel conversion factor of the grid.
+        fractional_accuracy : float
+            The fractional accuracy every pixel`s image must be evaluated to, as in a `GridIterate`.
+        sub_steps : (int,)
+            The sub-sizes the image of every pixel is iteratively evaluated at.
+        sub_size_map : np.ndarray or None
+            A 2D map of the sub-size every pixel converged at in a previous evaluation, which the first evaluation
+            starts from. If `None`, the first evaluation starts every pixel at the lowest sub-size.
+        is_frozen : bool
+            If `True`, evaluations do not update the sub-size map, so every evaluation starts from the same map and the
+            image of a tracer does not depend on the tracers evaluated before it.
+        """
+        self.shape_2d = shape_2d
+        self.pixel_scales = (
+            pixel_scales
+            if isinstance(pixel_scales, tuple)
+            else (pixel_scales, pixel_scales)
+        )
+        self.fractional_accuracy = fractional_accuracy
+        self.sub_steps = tuple(sub_steps)
+
+        if sub_size_map is None:
+            sub_size_map = np.full(shape_2d, self.sub_steps[0], dtype="int")
+
+        self.sub_size_map = np.asarray(sub_size_map, dtype="int")
+        self.is_frozen = is_frozen
+
+        self._padded_grid = None
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Returns a `GridIterateWarmStart` with the shape, pixel scales and fractional accuracy of a `GridIterate`."""
+        return GridIterateWarmStart(
+            shape_2d=grid.shape_2d,
+            pixel_scales=grid.pixel_scales,
+            fractional_accuracy=grid.fractional_accuracy,
+        )
+
+    @classmethod
+    def from_npy(cls, file_path, pixel_scales, fractional_accuracy=0.9999):
+        """Load a `GridIterateWarmStart` whose sub-size map was output by `output_sub_size_map_to_npy`."""
+        sub_size_map = np.load(file_path)
+
+        return GridIterateWarmStart(
+            shape_2d=sub_size_map.shape,
+            pixel_scales=pixel_scales,
+            fractional_accuracy=fractional_accuracy,
+            sub_size_map=sub_size_map,
+        )
+
+    def output_sub_size_map_to_npy(self, file_path):
+        np.save(file_path, self.sub_size_map)
+
+    def image_at_sub_size_from(self, tracer, pixels, sub_size):
+        """
+        Returns the image of the tracer in every pixel where `pixels` is `True`, evaluated at `sub_size` in one batch
+        and ordered as `np.where(pixels)` (row-major).
+        """
+        if not np.any(pixels):
+            return np.zeros(0)
+
+        mask = al.Mask2D.manual(
+            mask=np.invert(pixels), pixel_scales=self.pixel_scales, sub_size=sub_size
+        )
+
+        grid = al.Grid.from_mask(mask=mask)
+
+        return np.asarray(tracer.image_from_grid(grid=grid).in_1d_binned)
+
+    def is_converged_from(self, image_lower, image_higher):
+        """
+        The fractional accuracy check of a `GridIterate`, which a pixel passes if the ratio of its image evaluated at
+        two consecutive sub-sizes is above the fractional accuracy (or both images are zero).
+        """
+        image_lower = np.abs(image_lower)
+        image_higher = np.abs(image_higher)
+
+        maximum = np.maximum(image_lower, image_higher)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            accuracy = np.where(
+                maximum > 0.0, np.minimum(image_lower, image_higher) / maximum, 1.0
+            )
+
+        return accuracy >= self.fractional_accuracy
+
+    def _lower_sub_size_from(self, sub_size):
+        index = self.sub_steps.index(sub_size)
+        return 1 if index == 0 else self.sub_steps[index - 1]
+
+    def image_2d_from_tracer(self, tracer):
+        """
+        Returns the 2D image of the tracer, starting every pixel from its sub-size in the sub-size map, and updates
+        the map with the sub-size every pixel converged at.
+        """
+        image_2d = np.zeros(self.shape_2d)
+        sub_size_map = np.full(self.shape_2d, self.sub_steps[-1], dtype="int")
+
+        """
+        The verification pass: every pixel is evaluated at its sub-size in the map and the sub-size below it, with
+        every pixel at the same sub-size evaluated in one batch.
+        """
+
+        unconverged = np.zeros(self.shape_2d, dtype="bool")
+        image_previous = np.zeros(self.shape_2d)
+
+        for sub_size in self.sub_steps:
+
+            pixels = self.sub_size_map == sub_size
+
+            if not np.any(pixels):
+                continue
+
+            image_higher = self.image_at_sub_size_from(
+                tracer=tracer, pixels=pixels, sub_size=sub_size
+            )
+            image_lower = self.image_at_sub_size_from(
+                tracer=tracer,
+                pixels=pixels,
+                sub_size=self._lower_sub_size_from(sub_size=sub_size),
+            )
+
+            image_2d[pixels] = image_higher
+            image_previous[pixels] = image_higher
+            sub_size_map[pixels] = sub_size
+
+            is_converged = self.is_converged_from(
+                image_lower=image_lower, image_higher=image_higher
+            )
+
+            y, x = np.where(pixels)
+            unconverged[y[~is_converged], x[~is_converged]] = True
+
+            """
+            Converged pixels step down the map if they also converge at the sub-size below, which is checked against
+            the image one sub-size further down. Their image is the image at the sub-size below, as a `GridIterate`
+            would have stopped there.
+            """
+
+            lower_sub_size = self._lower_sub_size_from(sub_size=sub_size)
+
+            if lower_sub_size not in self.sub_steps or not np.any(is_converged):
+                continue
+
+            converged = np.zeros(self.shape_2d, dtype="bool")
+            converged[y[is_converged], x[is_converged]] = True
+
+            image_lowest = self.image_at_sub_size_from(
+                tracer=tracer,
+                pixels=converged,
+                sub_size=self._lower_sub_size_from(sub_size=lower_sub_size),
+            )
+
+            steps_down = self.is_converged_from(
+                image_lower=image_lowest, image_higher=image_lower[is_converged]
+            )
+
+            y_down = y[is_converged][steps_down]
+            x_down = x[is_converged][steps_down]
+
+            image_2d[y_down, x_down] = image_lower[is_converged][steps_down]
+            sub_size_map[y_down, x_down] = lower_sub_size
+
+        """
+        Pixels which failed the verification pass iterate from their sub-size in the map, one batch per sub-size level,
+        until they converge or reach the highest sub-size.
+        """
+
+        for sub_size in self.sub_steps:
+
+            pixels = unconverged & (self.sub_size_map < sub_size)
+
+            if not np.any(pixels):
+                continue
+
+            image_higher = self.image_at_sub_size_from(
+                tracer=tracer, pixels=pixels, sub_size=sub_size
+            )
+
+            is_converged = self.is_converged_from(
+                image_lower=image_previous[pixels], image_higher=image_higher
+            )
+
+            image_2d[pixels] = image_higher
+            image_previous[pixels] = image_higher
+            sub_size_map[pixels] = sub_size
+
+            y, x = np.where(pixels)
+            unconverged[y[is_converged], x[is_converged]] = False
+
+        if not self.is_frozen:
+            self.sub_size_map = sub_size_map
+
+        return image_2d
+
+    def image_from_tracer(self, tracer):
+        """Returns the image of the tracer as an `Array`, updating the sub-size map (see `image_2d_from_tracer`)."""
+        return al.Array.manual_2d(
+            array=self.image_2d_from_tracer(tracer=tracer),
+            pixel_scales=self.pixel_scales,
+        )
+
+    def padded_grid_from(self, psf_shape_2d):
+        """
+        Returns a `GridIterateWarmStart` padded by the PSF shape, which simulating `Imaging` requires to avoid edge
+        effects in the PSF convolution. The padded grid has its own sub-size map, which is kept between simulations.
+        """
+        padded_shape_2d = (
+            self.shape_2d[0] + psf_shape_2d[0] - 1,
+            self.shape_2d[1] + psf_shape_2d[1] - 1,
+        )
+
+        if self._padded_grid is None or self._padded_grid.shape_2d != padded_shape_2d:
+            self._padded_grid = GridIterateWarmStart(
+                shape_2d=padded_shape_2d,
+                pixel_scales=self.pixel_scales,
+                fractional_accuracy=self.fractional_accuracy,
+                sub_steps=self.sub_steps,
+                is_frozen=self.is_frozen,
+            )
+
+        return self._padded_grid
+
+    def simulate_imaging_from_tracer(self, simulator, tracer, name=None):
+        """
+        Simulate `Imaging` of the tracer with a `SimulatorImaging`, in the same way as
+        `simulator.from_tracer_and_grid` but evaluating the image with the warm-started grid.
+        """
+        psf_shape_2d = simulator.psf.shape_2d
+
+        padded_grid = self.padded_grid_from(psf_shape_2d=psf_shape_2d)
+
+        imaging = simulator.from_image(
+            image=padded_grid.image_from_tracer(tracer=tracer).in_1d_binned, name=name
+        )
+
+        return imaging.trimmed_after_convolution_from(kernel_shape=psf_shape_2d)
+
+    def freeze_from_tracer(self, tracer, psf_shape_2d):
+        """
+        Learn the sub-size maps of the grid and of its grid padded by the PSF shape from the image of a (fiducial)
+        tracer, and freeze both so every later evaluation starts from them.
+        """
+        self.image_2d_from_tracer(tracer=tracer)
+        self.padded_grid_from(psf_shape_2d=psf_shape_2d).image_2d_from_tracer(
+            tracer=tracer
+        )
+
+        self.is_frozen = True
+        self._padded_grid.is_frozen = True
@@ -0,0 +1,341 @@
+from functools import cached_property
+from os import path
+
+import autolens as al
+
+from simulators.tools import interferometer_stream
+
+"""
+A registry of instrument presets, which bundle the grid, PSF, exposure time and sky maps, noise model and a matching
+default model-fit configuration of every instrument in `autolens_workspace/simulators/instruments`.
+
+Every preset builds its `Kernel`, exposure time map, background sky map and uv-wavelengths once and caches them, so
+batch simulation and fitting of many lenses observed with the same instrument pay the setup cost once, for example:
+
+    hst = instruments.instrument_from(name="hst")
+
+    simulator = hst.simulator()
+    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=hst.grid)
+
+    mask = hst.mask()
+    settings = hst.settings()
+"""
+
+uv_wavelengths_path = path.join("simulators", "interferometer", "uv_wavelengths")
+
+
+class InstrumentImaging:
+    def __init__(
+        self,
+        name,
+        title,
+        shape_2d,
+        pixel_scales,
+        psf_sigma,
+        exposure_time,
+        background_sky_level,
+        psf_shape_2d=(31, 31),
+        add_poisson_noise=True,
+        mask_radius=3.0,
+        sub_size=2,
+    ):
+        """
+        The preset of an instrument which observes `Imaging` data.
+
+        Parameters
+        ----------
+        name : str
+            The name of the instrument in the registry, which is also the folder its dataset is output to.
+        title : str
+            The title used when plotting the instrument`s data.
+        shape_2d : (int, int)
+            The 2D shape of the image of a simulated lens.
+        pixel_scales : float
+            The arc-second to pixel conversion factor of the instrument.
+        psf_sigma : float
+            The sigma of the instrument`s Gaussian PSF, in arc-seconds.
+        exposure_time : float
+            The exposure time of every pixel.
+        background_sky_level : float
+            The background sky level of every pixel.
+        psf_shape_2d : (int, int)
+            The 2D shape of the PSF kernel.
+        add_poisson_noise : bool
+            Whether Poisson noise is added to simulated data.
+        mask_radius : float
+            The radius of the circular mask of the default model-fit configuration, in arc-seconds.
+        sub_size : int
+            The sub-grid size of the default model-fit configuration.
+        """
+        self.name = name
+        self.title = title
+        self.shape_2d = shape_2d
+        self.pixel_scales = pixel_scales
+        self.psf_sigma = psf_sigma
+        self.psf_shape_2d = psf_shape_2d
+        self.exposure_time = exposure_time
+        self.background_sky_level = background_sky_level
+        self.add_poisson_noise = add_poisson_noise
+        self.mask_radius = mask_radius
+        self.sub_size = sub_size
+
+    @cached_property
+    def grid(self):
+        """The grid used to simulate the instrument`s data, see the simulator scripts for a description of `GridIterate`."""
+        return al.GridIterate.uniform(
+            shape_2d=self.shape_2d,
+            pixel_scales=self.pixel_scales,
+            fractional_accuracy=0.9999,
+        )
+
+    @cached_property
+    def psf(self):
+        return al.Kernel.from_gaussian(
+            shape_2d=self.psf_shape_2d,
+            sigma=self.psf_sigma,
+            pixel_scales=self.pixel_scales,
+            renormalize=True,
+        )
+
+    @cached_property
+    def exposure_time_map(self):
+        return al.Array.full(
+            fill_value=self.exposure_time,
+            shape_2d=self.shape_2d,
+            pixel_scales=self.pixel_scales,
+        )
+
+    @cached_property
+    def background_sky_map(self):
+        return al.Array.full(
+            fill_value=self.background_sky_level,
+            shape_2d=self.shape_2d,
+            pixel_scales=self.pixel_scales,
+        )
+
+    def simulator(self, noise_seed=-1):
+        """
+        Returns the `SimulatorImaging` of the instrument, which reuses the instrument`s cached PSF and exposure time and
+        sky maps.
+        """
+        return al.SimulatorImaging(
+            exposure_time_map=self.exposure_time_map,
+            psf=self.psf,
+            background_sky_map=self.background_sky_map,
+            add_poisson_noise=self.add_poisson_noise,
+            noise_seed=noise_seed,
+        )
+
+    def mask(self):
+        """The circular mask of the instrument`s default model-fit configuration."""
+        return al.Mask2D.circular(
+            shape_2d=self.shape_2d,
+            pixel_scales=self.pixel_scales,
+            sub_size=self.sub_size,
+            radius=self.mask_radius,
+        )
+
+    def settings(self):
+        """The `SettingsPhaseImaging` of the instrument`s default model-fit configuration."""
+        return al.SettingsPhaseImaging(
+            settings_masked_imaging=al.SettingsMaskedImaging(
+                grid_class=al.Grid, sub_size=self.sub_size
+            )
+        )
+
+
+class InstrumentInterferometer:
+    def __init__(
+        self,
+        name,
+        title,
+        shape_2d,
+        pixel_scales,
+        uv_wavelengths_file,
+        exposure_time,
+        background_sky_level,
+        noise_sigma,
+        transformer_class,
+        mask_radius=3.0,
+        sub_size=1,
+    ):
+        """
+        The preset of an interferometer, whose uv-wavelengths are loaded from the .fits file `uv_wavelengths_file` in
+        `autolens_workspace/simulators/interferometer/uv_wavelengths`.
+        """
+        self.name = name
+        self.title = title
+        self.shape_2d = shape_2d
+        self.pixel_scales = pixel_scales
+        self.uv_wavelengths_file = uv_wavelengths_file
+        self.exposure_time = exposure_time
+        self.background_sky_level = background_sky_level
+        self.noise_sigma = noise_sigma
+        self.transformer_class = transformer_class
+        self.mask_radius = mask_radius
+        self.sub_size = sub_size
+
+        self._uv_wavelengths = {}
+
+    @cached_property
+    def grid(self):
+        return al.GridIterate.uniform(
+            shape_2d=self.shape_2d,
+            pixel_scales=self.pixel_scales,
+            fractional_accuracy=0.9999,
+        )
+
+    @property
+    def uv_wavelengths(self):
+        return self.uv_wavelengths_from(uv_wavelengths_file=self.uv_wavelengths_file)
+
+    def uv_wavelengths_from(self, uv_wavelengths_file):
+        """
+        Load the uv-wavelengths in the .fits file `uv_wavelengths_file`, which is only read from disk the first time
+        it is used.
+        """
+        if uv_wavelengths_file not in self._uv_wavelengths:
+
+            file_path = path.join(uv_wavelengths_path, f"{uv_wavelengths_file}.fits")
+
+            uv_wavelengths = al.util.array.numpy_array_1d_from_fits(
+                file_path=file_path, hdu=0
+            )
+
+            self._uv_wavelengths[uv_wavelengths_file] = uv_wavelengths
+
+        return self._uv_wavelengths[uv_wavelengths_file]
+
+    def simulator(self, noise_seed=-1, uv_wavelengths_file=None):
+        """
+        Returns the `SimulatorInterferometer` of the instrument, which reuses its cached uv-wavelengths. A different
+        uv-coverage of the instrument (e.g. ALMA with more or fewer visibilities) is used by inputting its
+        `uv_wavelengths_file`.
+        """
+        if uv_wavelengths_file is None:
+            uv_wavelengths_file = self.uv_wavelengths_file
+
+        return al.SimulatorInterferometer(
+            uv_wavelengths=self.uv_wavelengths_from(
+                uv_wavelengths_file=uv_wavelengths_file
+            ),
+            exposure_time=self.exposure_time,
+            background_sky_level=self.background_sky_level,
+            noise_sigma=self.noise_sigma,
+            noise_seed=noise_seed,
+            transformer_class=self.transformer_class,
+        )
+
+    def streaming_simulator(self, noise_seed=-1, chunk_size=1000000):
+        """
+        Returns a `StreamingSimulatorInterferometer` with the instrument`s noise model, which simulates large
+        uv-coverages in chunks of `chunk_size` visibilities (see `interferometer_stream.py`).
+        """
+        return interferometer_stream.StreamingSimulatorInterferometer(
+            exposure_time=self.exposure_time,
+            background_sky_level=self.background_sky_level,
+            noise_sigma=self.noise_sigma,
+            noise_seed=noise_seed,
+            transformer_class=self.transformer_class,
+            chunk_size=chunk_size,
+        )
+
+    def real_space_mask(self):
+        """The real-space mask of the instrument`s default model-fit configuration."""
+        return al.Mask2D.circular(
+            shape_2d=self.shape_2d,
+            pixel_scales=self.pixel_scales,
+            sub_size=self.sub_size,
+            radius=self.mask_radius,
+        )
+
+    def settings(self):
+        """The `SettingsPhaseInterferometer` of the instrument`s default model-fit configuration."""
+        return al.SettingsPhaseInterferometer(
+            settings_masked_interferometer=al.SettingsMaskedInterferometer(
+                grid_class=al.Grid,
+                sub_size=self.sub_size,
+                transformer_class=self.transformer_class,
+            )
+        )
+
+
+instruments = {
+    "vro": InstrumentImaging(
+        name="vro",
+        title="Vera Rubin Observatory Image",
+        shape_2d=(40, 40),
+        pixel_scales=0.2,
+        psf_sigma=0.5,
+        exposure_time=100.0,
+        background_sky_level=1.0,
+    ),
+    "euclid": InstrumentImaging(
+        name="euclid",
+        title="Euclid Image",
+        shape_2d=(80, 80),
+        pixel_scales=0.1,
+        psf_sigma=0.1,
+        exposure_time=2260.0,
+        background_sky_level=1.0,
+    ),
+    "hst": InstrumentImaging(
+        name="hst",
+        title="Hubble Space Telescope Image",
+        shape_2d=(160, 160),
+        pixel_scales=0.05,
+        psf_sigma=0.05,
+        exposure_time=2000.0,
+        background_sky_level=1.0,
+    ),
+    "hst_up": InstrumentImaging(
+        name="hst_up",
+        title="Image",
+        shape_2d=(100, 100),
+        pixel_scales=0.03,
+        psf_sigma=0.05,
+        exposure_time=2000.0,
+        background_sky_level=1.0,
+    ),
+    "ao": InstrumentImaging(
+        name="ao",
+        title="Keck Adaptive Optics Image",
+        shape_2d=(800, 800),
+        pixel_scales=0.01,
+        psf_sigma=0.025,
+        exposure_time=1000.0,
+        background_sky_level=1.0,
+    ),
+    "sma": InstrumentInterferometer(
+        name="sma",
+        title="Visibilities",
+        shape_2d=(251, 251),
+        pixel_scales=0.05,
+        uv_wavelengths_file="sma_uv_wavelengths",
+        exposure_time=100.0,
+        background_sky_level=0.1,
+        noise_sigma=100.0,
+        transformer_class=al.TransformerDFT,
+    ),
+    "alma": InstrumentInterferometer(
+        name="alma",
+        title="Visibilities",
+        shape_2d=(256, 256),
+        pixel_scales=0.05,
+        uv_wavelengths_file="alma_uv_wavelengths_x500k",
+        exposure_time=100.0,
+        background_sky_level=0.1,
+        noise_sigma=100.0,
+        transformer_class=al.TransformerNUFFT,
+    ),
+}
+
+
+def instrument_from(name):
+    """Returns the preset of the instrument `name` from the registry."""
+    try:
+        return instruments[name]
+    except KeyError:
+        raise KeyError(
+            f"The instrument {name} is not in the registry, which contains {list(instruments.keys())}"
+        )
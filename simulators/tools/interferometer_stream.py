@@ -0,0 +1,186 @@
+import os
+from os import path
+
+import numpy as np
+from astropy.io import fits
+import autolens as al
+
+"""
+Simulate `Interferometer` datasets with millions of visibilities (e.g. ALMA long-baseline observations of 10^7+
+visibilities) using a bounded amount of memory.
+
+A `SimulatorInterferometer` transforms the image to every visibility at once, so the transformer, visibilities and
+noise of the full uv-coverage are held in memory together. `StreamingSimulatorInterferometer` instead reads the
+uv-wavelengths in chunks (memory-mapped from their .fits file), simulates the visibilities and noise of each chunk with
+a `SimulatorInterferometer` and appends them to .npy files on disk. Peak memory depends on `chunk_size`, not on the
+number of visibilities.
+
+The image of the tracer is only evaluated once and reused by every chunk. If a `noise_seed` is input, every chunk uses
+the seed plus its chunk index, so the simulation is reproducible for a given `chunk_size`.
+"""
+
+visibilities_filename = "visibilities.npy"
+noise_map_filename = "noise_map.npy"
+uv_wavelengths_filename = "uv_wavelengths.npy"
+
+
+def uv_wavelengths_from_fits(file_path, hdu=0):
+    """
+    Returns the uv-wavelengths in a .fits file memory-mapped, so slicing a chunk only reads that chunk from disk. The
+    memory map stays open after the file is closed, for as long as the array is used.
+    """
+    with fits.open(file_path, memmap=True) as hdul:
+        return hdul[hdu].data
+
+
+class StreamingSimulatorInterferometer:
+    def __init__(
+        self,
+        exposure_time,
+        background_sky_level,
+        noise_sigma=0.1,
+        noise_seed=-1,
+        transformer_class=al.TransformerNUFFT,
+        chunk_size=1000000,
+    ):
+        """
+        Parameters
+        ----------
+        exposure_time : float
+            The exposure time of the observation, as for a `SimulatorInterferometer`.
+        background_sky_level : float
+            The background sky level of the observation, as for a `SimulatorInterferometer`.
+        noise_sigma : float or None
+            The sigma of the Gaussian noise added to every visibility.
+        noise_seed : int
+            The seed of the noise, where -1 uses a random seed.
+        transformer_class : al.TransformerNUFFT or al.TransformerDFT
+            The class used to Fourier transform the image to the visibilities of each chunk.
+        chunk_size : int
+            The number of visibilities simulated at a time.
+        """
+        self.exposure_time = exposure_time
+        self.background_sky_level = background_sky_level
+        self.noise_sigma = noise_sigma
+        self.noise_seed = noise_seed
+        self.transformer_class = transformer_class
+        self.chunk_size = chunk_size
+
+    def simulator_from(self, uv_wavelengths, chunk_index):
+
+        noise_seed = (
+            self.noise_seed if self.noise_seed == -1 else self.noise_seed + chunk_index
+        )
+
+        return al.SimulatorInterferometer(
+            uv_wavelengths=uv_wavelengths,
+            exposure_time=self.exposure_time,
+            background_sky_level=self.background_sky_level,
+            noise_sigma=self.noise_sigma,
+            noise_seed=noise_seed,
+            transformer_class=self.transformer_class,
+        )
+
+    def output_from_tracer_and_grid(self, tracer, grid, uv_wavelengths, output_path):
+        """
+        Simulate the visibilities of the tracer at every uv-wavelength, chunk by chunk, and output them, their
+        noise-map and the uv-wavelengths as `visibilities.npy`, `noise_map.npy` and `uv_wavelengths.npy` in
+        `output_path`.
+
+        Parameters
+        ----------
+        tracer : al.Tracer
+            The tracer whose image is simulated.
+        grid : al.Grid or al.GridIterate
+            The real-space grid the image is evaluated on.
+        uv_wavelengths : np.ndarray
+            The uv-wavelengths of shape [total_visibilities, 2], which is best memory-mapped (see
+            `uv_wavelengths_from_fits`) so only one chunk is read at a time.
+        output_path : str
+            The directory the .npy files are output to.
+        """
+        image = tracer.image_from_grid(grid=grid).in_1d_binned
+
+        total_visibilities = uv_wavelengths.shape[0]
+
+        os.makedirs(output_path, exist_ok=True)
+
+        arrays = {
+            filename: np.lib.format.open_memmap(
+                path.join(output_path, filename),
+                mode="w+",
+                dtype="float64",
+                shape=(total_visibilities, 2),
+            )
+            for filename in [
+                visibilities_filename,
+                noise_map_filename,
+                uv_wavelengths_filename,
+            ]
+        }
+
+        for chunk_index, start in enumerate(
+            range(0, total_visibilities, self.chunk_size)
+        ):
+
+            end = min(start + self.chunk_size, total_visibilities)
+
+            uv_wavelengths_chunk = np.asarray(
+                uv_wavelengths[start:end], dtype="float64"
+            )
+
+            simulator = self.simulator_from(
+                uv_wavelengths=uv_wavelengths_chunk, chunk_index=chunk_index
+            )
+
+            interferometer = simulator.from_image(image=image)
+
+            arrays[visibilities_filename][start:end] = np.asarray(
+                interferometer.visibilities
+            )
+            arrays[noise_map_filename][start:end] = np.asarray(interferometer.noise_map)
+            arrays[uv_wavelengths_filename][start:end] = uv_wavelengths_chunk
+
+            for array in arrays.values():
+                array.flush()
+
+
+def arrays_from_path(dataset_path):
+    """
+    Returns the visibilities, noise-map and uv-wavelengths output by a `StreamingSimulatorInterferometer` as
+    memory-mapped arrays of shape [total_visibilities, 2], so they can be read chunk by chunk without loading them
+    into memory.
+    """
+    return tuple(
+        np.load(path.join(dataset_path, filename), mmap_mode="r")
+        for filename in [
+            visibilities_filename,
+            noise_map_filename,
+            uv_wavelengths_filename,
+        ]
+    )
+
+
+def interferometer_from_path(dataset_path):
+    """
+    Load an `Interferometer` dataset output by a `StreamingSimulatorInterferometer`.
+
+    The .npy files are memory-mapped, but `Visibilities` copies the visibilities and noise-map into memory, so the
+    loaded dataset is not streamed (only the uv-wavelengths stay memory-mapped). Use `arrays_from_path` to read the
+    visibilities chunk by chunk.
+    """
+    return al.Interferometer(
+        visibilities=al.Visibilities.manual_1d(
+            visibilities=np.load(
+                path.join(dataset_path, visibilities_filename), mmap_mode="r"
+            )
+        ),
+        noise_map=al.Visibilities.manual_1d(
+            visibilities=np.load(
+                path.join(dataset_path, noise_map_filename), mmap_mode="r"
+            )
+        ),
+        uv_wavelengths=np.load(
+            path.join(dataset_path, uv_wavelengths_filename), mmap_mode="r"
+        ),
+    )
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+from os import path
+
+import numpy as np
+import autolens as al
+
+"""
+A content-addressed cache of simulated datasets, so rerunning the simulator scripts (e.g. via `howtolens/generate`)
+only re-simulates datasets whose inputs changed.
+
+Every dataset is simulated with a key, which is a hash of the tracer`s galaxies and profiles, the grid, the simulator
+(its PSF, exposure time, background sky, noise settings and seed) and the **PyAutoLens** version. The key is output
+with the dataset as `simulation_key.json`. When a simulator script is rerun and the key of its inputs matches the key
+of the dataset already in the dataset folder, the dataset is loaded from its .fits files rather than simulated.
+
+If the simulator`s `noise_seed` is -1 (a random seed), the dataset loaded from the cache is the noise realization that
+was simulated when the key was output.
+"""
+
+key_filename = "simulation_key.json"
+
+
+def _update(sha, obj, seen):
+    """
+    Update a hash with the content of an object, recursing through the public attributes of objects (e.g. the
+    galaxies and profiles of a tracer) and the data of arrays.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        sha.update(repr((type(obj).__name__, obj)).encode("utf-8"))
+
+    elif isinstance(obj, np.generic):
+        _update(sha=sha, obj=obj.item(), seen=seen)
+
+    elif isinstance(obj, np.ndarray):
+
+        sha.update(f"{type(obj).__name__}{obj.shape}{obj.dtype}".encode("utf-8"))
+        sha.update(np.ascontiguousarray(obj).tobytes())
+
+        if hasattr(obj, "__dict__"):
+            _update(sha=sha, obj=vars(obj), seen=seen)
+
+    elif isinstance(obj, dict):
+
+        for key in sorted(obj.keys(), key=str):
+            if isinstance(key, str) and key.startswith("_"):
+                continue
+            sha.update(str(key).encode("utf-8"))
+            _update(sha=sha, obj=obj[key], seen=seen)
+
+    elif isinstance(obj, (list, tuple)):
+
+        sha.update(f"{type(obj).__name__}{len(obj)}".encode("utf-8"))
+
+        for value in obj:
+            _update(sha=sha, obj=value, seen=seen)
+
+    elif isinstance(obj, type):
+        sha.update(f"{obj.__module__}.{obj.__qualname__}".encode("utf-8"))
+
+    else:
+
+        if id(obj) in seen:
+            return
+
+        seen.add(id(obj))
+
+        sha.update(f"{type(obj).__module__}.{type(obj).__qualname__}".encode("utf-8"))
+
+        attributes = {
+            key: value
+            for key, value in getattr(obj, "__dict__", {}).items()
+            if not key.startswith("_")
+        }
+
+        if attributes:
+            _update(sha=sha, obj=attributes, seen=seen)
+        elif " at 0x" not in repr(obj):
+            sha.update(repr(obj).encode("utf-8"))
+
+
+def key_from(*objects):
+    """Returns the key of the input objects (e.g. the simulator, tracer and grid of a simulation)."""
+    sha = hashlib.sha256()
+
+    _update(sha=sha, obj=al.__version__, seen=set())
+
+    for obj in objects:
+        _update(sha=sha, obj=obj, seen=set())
+
+    return sha.hexdigest()
+
+
+def is_cached(key, dataset_path, file_paths):
+    """
+    Returns `True` if the dataset in `dataset_path` was simulated with `key` and all its files exist.
+    """
+    key_path = path.join(dataset_path, key_filename)
+
+    if not path.exists(key_path) or not all(
+        path.exists(file_path) for file_path in file_paths
+    ):
+        return False
+
+    with open(key_path) as f:
+        return json.load(f)["key"] == key
+
+
+def output_key(key, dataset_path):
+    """Output the key of a dataset, which must be called after the files of the dataset are output."""
+    os.makedirs(dataset_path, exist_ok=True)
+
+    with open(path.join(dataset_path, key_filename), "w") as f:
+        json.dump({"key": key}, f)
+
+
+def imaging_from_tracer_and_grid(simulator, tracer, grid, dataset_path):
+    """
+    Returns the `Imaging` simulated by a `SimulatorImaging` from a tracer and grid, which is loaded from the .fits
+    files in `dataset_path` if they were simulated with the same inputs, or simulated and output to them otherwise.
+    """
+    image_path = path.join(dataset_path, "image.fits")
+    psf_path = path.join(dataset_path, "psf.fits")
+    noise_map_path = path.join(dataset_path, "noise_map.fits")
+
+    key = key_from(simulator, tracer, grid)
+
+    if is_cached(
+        key=key,
+        dataset_path=dataset_path,
+        file_paths=[image_path, psf_path, noise_map_path],
+    ):
+        return al.Imaging.from_fits(
+            image_path=image_path,
+            psf_path=psf_path,
+            noise_map_path=noise_map_path,
+            pixel_scales=grid.pixel_scales,
+        )
+
+    imaging = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+
+    imaging.output_to_fits(
+        image_path=image_path,
+        psf_path=psf_path,
+        noise_map_path=noise_map_path,
+        overwrite=True,
+    )
+
+    output_key(key=key, dataset_path=dataset_path)
+
+    return imaging
+
+
+def interferometer_from_tracer_and_grid(simulator, tracer, grid, dataset_path):
+    """
+    Returns the `Interferometer` simulated by a `SimulatorInterferometer` from a tracer and grid, which is loaded from
+    the .fits files in `dataset_path` if they were simulated with the same inputs, or simulated and output to them
+    otherwise.
+    """
+    visibilities_path = path.join(dataset_path, "visibilities.fits")
+    noise_map_path = path.join(dataset_path, "noise_map.fits")
+    uv_wavelengths_path = path.join(dataset_path, "uv_wavelengths.fits")
+
+    key = key_from(simulator, tracer, grid)
+
+    if is_cached(
+        key=key,
+        dataset_path=dataset_path,
+        file_paths=[visibilities_path, noise_map_path, uv_wavelengths_path],
+    ):
+        return al.Interferometer.from_fits(
+            visibilities_path=visibilities_path,
+            noise_map_path=noise_map_path,
+            uv_wavelengths_path=uv_wavelengths_path,
+        )
+
+    interferometer = simulator.from_tracer_and_grid(tracer=tracer, grid=grid)
+
+    interferometer.output_to_fits(
+        visibilities_path=visibilities_path,
+        noise_map_path=noise_map_path,
+        uv_wavelengths_path=uv_wavelengths_path,
+        overwrite=True,
+    )
+
+    output_key(key=key, dataset_path=dataset_path)
+
+    return interferometer
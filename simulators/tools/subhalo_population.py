@@ -0,0 +1,347 @@
+import numpy as np
+import autolens as al
+
+"""
+A population of thousands of subhalos as one mass component, whose deflection angles are computed exactly near every
+subhalo and approximated far away, within a controllable relative error.
+
+Summing the deflection angles of every subhalo`s mass profile over the full grid costs O(N_sub x N_pix) profile
+evaluations, which makes populations of 10^3 - 10^4 subhalos impractical to simulate. `SubhaloPopulation` instead uses
+that the subhalos are spherical, so beyond the radius containing (almost) all of a subhalo`s mass its deflection angles
+are those of a point mass:
+
+ - Near field: every subhalo`s deflection angles are computed exactly within its near radius, outside of which its
+   point mass deflection angles are within `relative_tolerance` of its exact deflection angles.
+
+ - Far field: the subhalos are grouped into square cells. Pixels far enough from a cell use the monopole of the cell
+   (one point mass at the cell`s centre of mass), the rest use the point masses of the cell`s subhalos. A cell is
+   opened when the bound on the error of its monopole exceeds `relative_tolerance` of the monopole`s deflection angle.
+
+Both criteria are relative to the deflection angles of each subhalo or cell, so the error of every pixel is at most
+about `relative_tolerance` times the sum of the magnitudes of the subhalos` deflection angles there, whatever the
+number of subhalos, and most pixels use the (cheap) point mass or monopole deflection angles.
+
+The deflection angles are computed once on a uniform grid (see `deflections_grid_from`) and used in a `Tracer` via an
+`InputDeflections` mass profile, for example:
+
+    population = subhalo_population.SubhaloPopulation(
+        subhalos=subhalo_population.subhalos_from_mass_function(total_subhalos=1000)
+    )
+
+    lens_galaxy = al.Galaxy(
+        redshift=0.5,
+        mass=al.mp.EllipticalIsothermal(...),
+        subhalos=population.input_deflections_from_grid(
+            grid=subhalo_population.deflections_grid_from(
+                shape_2d=(150, 150), pixel_scales=0.05, psf_shape_2d=(11, 11)
+            )
+        ),
+    )
+"""
+
+
+def subhalos_from_mass_function(
+    total_subhalos,
+    mass_min=1.0e6,
+    mass_max=1.0e10,
+    slope=-1.9,
+    radius=3.0,
+    redshift_object=0.5,
+    redshift_source=1.0,
+    seed=1,
+):
+    """
+    Returns a population of `SphericalTruncatedNFWMCRLudlow` subhalos whose masses are drawn from the power-law mass
+    function dN/dM ~ M^slope between `mass_min` and `mass_max` and whose centres are drawn uniformly within a circle of
+    `radius` arc-seconds.
+    """
+    rng = np.random.default_rng(seed)
+
+    exponent = slope + 1.0
+    unit = rng.uniform(size=total_subhalos)
+
+    masses = (
+        mass_min ** exponent + unit * (mass_max ** exponent - mass_min ** exponent)
+    ) ** (1.0 / exponent)
+
+    radii = radius * np.sqrt(rng.uniform(size=total_subhalos))
+    angles = rng.uniform(0.0, 2.0 * np.pi, size=total_subhalos)
+
+    return [
+        al.mp.SphericalTruncatedNFWMCRLudlow(
+            centre=(float(r * np.sin(angle)), float(r * np.cos(angle))),
+            mass_at_200=float(mass),
+            redshift_object=redshift_object,
+            redshift_source=redshift_source,
+        )
+        for r, angle, mass in zip(radii, angles, masses)
+    ]
+
+
+def deflections_grid_from(shape_2d, pixel_scales, psf_shape_2d, upscale=4):
+    """
+    Returns the uniform grid the deflection angles of a population are computed on, for simulating an image of
+    `shape_2d` and `pixel_scales` (a float or a (y,x) tuple, e.g. the `pixel_scales` of the image`s grid) convolved
+    with a PSF of `psf_shape_2d`.
+
+    The grid has `upscale` times the resolution of the image and covers the image`s grid padded by the PSF shape, plus
+    one pixel at every edge. Its pixel centres therefore extend beyond the sub-pixels at the very edges of the padded
+    grid (used by a `GridIterate` at its highest sub-size), so the deflection angles are never extrapolated.
+    """
+    if not isinstance(pixel_scales, tuple):
+        pixel_scales = (pixel_scales, pixel_scales)
+
+    padded_shape_2d = (
+        shape_2d[0] + psf_shape_2d[0] - 1,
+        shape_2d[1] + psf_shape_2d[1] - 1,
+    )
+
+    return al.Grid.uniform(
+        shape_2d=(
+            padded_shape_2d[0] * upscale + 2,
+            padded_shape_2d[1] * upscale + 2,
+        ),
+        pixel_scales=(pixel_scales[0] / upscale, pixel_scales[1] / upscale),
+    )
+
+
+def deflections_from_coordinates(mass_profile, coordinates):
+    """
+    Returns the exact (y,x) deflection angles of a mass profile at an array of (y,x) coordinates of shape [total, 2].
+    """
+    if coordinates.shape[0] == 0:
+        return np.zeros((0, 2))
+
+    grid = al.Grid.manual_1d(
+        grid=coordinates, shape_2d=(1, coordinates.shape[0]), pixel_scales=1.0
+    )
+
+    return np.asarray(mass_profile.deflections_from_grid(grid=grid))
+
+
+def point_mass_deflections_from(coordinates, centres, einstein_masses):
+    """
+    Returns the summed (y,x) deflection angles of point masses at every coordinate, where the deflection angle of a
+    point mass with `einstein_mass` b (its Einstein radius squared) at a distance r is b / r.
+    """
+    deflections = np.zeros(coordinates.shape)
+
+    for centre, einstein_mass in zip(centres, einstein_masses):
+
+        offsets = coordinates - centre
+        radii_squared = np.maximum(np.sum(offsets ** 2, axis=1), 1.0e-12)
+
+        deflections += einstein_mass * offsets / radii_squared[:, None]
+
+    return deflections
+
+
+class SubhaloPopulation:
+    def __init__(
+        self, subhalos, relative_tolerance=1.0e-2, cell_size=0.5, total_radii=200
+    ):
+        """
+        Parameters
+        ----------
+        subhalos : [al.mp.MassProfile]
+            The spherical mass profiles of every subhalo.
+        relative_tolerance : float
+            The maximum error of the point mass deflection angles of a subhalo, and of the monopole deflection angles
+            of a cell, relative to the deflection angles they approximate.
+        cell_size : float
+            The size of the square cells the subhalos are grouped into for the far field, in arc-seconds.
+        total_radii : int
+            The number of radii each subhalo`s exact deflection angles are evaluated at to choose its near radius.
+        """
+        self.subhalos = subhalos
+        self.relative_tolerance = relative_tolerance
+        self.cell_size = cell_size
+        self.total_radii = total_radii
+
+        self.centres = np.array([subhalo.centre for subhalo in subhalos], dtype="float")
+
+    def near_radii_and_einstein_masses_from(self, r_max):
+        """
+        Returns the near radius and point mass (Einstein radius squared) of every subhalo.
+
+        The exact deflection angles of every subhalo are evaluated along a line of radii out to `r_max` (the largest
+        distance from the subhalo to the grid). The point mass is the mass enclosed within `r_max` and the near radius
+        is the smallest radius beyond which the point mass deflection angles are within `relative_tolerance` of the
+        exact deflection angles, which for a spherical profile only differ by the mass between the two radii.
+        """
+        near_radii = np.zeros(len(self.subhalos))
+        einstein_masses = np.zeros(len(self.subhalos))
+
+        for index, subhalo in enumerate(self.subhalos):
+
+            radii = np.geomspace(1.0e-3, r_max[index], self.total_radii)
+
+            coordinates = np.stack(
+                (np.full(radii.shape, subhalo.centre[0]), subhalo.centre[1] + radii),
+                axis=1,
+            )
+
+            deflections = np.abs(
+                deflections_from_coordinates(
+                    mass_profile=subhalo, coordinates=coordinates
+                )[:, 1]
+            )
+
+            einstein_masses[index] = radii[-1] * deflections[-1]
+
+            errors = np.abs(deflections - einstein_masses[index] / radii)
+
+            exceeds = np.where(errors > self.relative_tolerance * deflections)[0]
+
+            near_radii[index] = (
+                0.0
+                if exceeds.size == 0
+                else radii[min(exceeds[-1] + 1, radii.size - 1)]
+            )
+
+        return near_radii, einstein_masses
+
+    def cells_from(self, einstein_masses):
+        """
+        Group the subhalos into square cells of `cell_size`, returning the indexes of the subhalos of every cell and the
+        total point mass, centre of mass and size (largest distance of a subhalo from the centre of mass) of the cell.
+        """
+        cell_indexes = np.floor(self.centres / self.cell_size).astype("int")
+
+        cells = {}
+
+        for index, cell_index in enumerate(map(tuple, cell_indexes)):
+            cells.setdefault(cell_index, []).append(index)
+
+        cell_list = []
+
+        for indexes in cells.values():
+
+            indexes = np.array(indexes)
+
+            mass = np.sum(einstein_masses[indexes])
+
+            if mass > 0.0:
+                centre = (
+                    np.sum(
+                        self.centres[indexes] * einstein_masses[indexes, None], axis=0
+                    )
+                    / mass
+                )
+            else:
+                centre = np.mean(self.centres[indexes], axis=0)
+
+            size = np.max(
+                np.sqrt(np.sum((self.centres[indexes] - centre) ** 2, axis=1))
+            )
+
+            cell_list.append((indexes, mass, centre, size))
+
+        return cell_list
+
+    def deflections_2d_from_grid(self, grid):
+        """
+        Returns the (y,x) deflection angles of the population on a uniform grid, as an ndarray of shape
+        [total_y_pixels, total_x_pixels, 2].
+        """
+        grid_2d = np.asarray(grid.in_2d)
+        coordinates = grid_2d.reshape(-1, 2)
+
+        deflections = np.zeros(coordinates.shape)
+
+        if len(self.subhalos) == 0:
+            return deflections.reshape(grid_2d.shape)
+
+        corners = np.array(
+            [
+                [coordinates[:, 0].min(), coordinates[:, 1].min()],
+                [coordinates[:, 0].min(), coordinates[:, 1].max()],
+                [coordinates[:, 0].max(), coordinates[:, 1].min()],
+                [coordinates[:, 0].max(), coordinates[:, 1].max()],
+            ]
+        )
+
+        r_max = np.max(
+            np.sqrt(np.sum((self.centres[:, None, :] - corners[None]) ** 2, axis=2)),
+            axis=1,
+        )
+
+        near_radii, einstein_masses = self.near_radii_and_einstein_masses_from(
+            r_max=r_max
+        )
+
+        """
+        The far field, where pixels far enough from a cell use its monopole. The error of the monopole of a cell of
+        point mass B and size s at a distance d is at most B s^2 / (d - s)^3, which relative to the monopole`s
+        deflection angle B / d is s^2 d / (d - s)^3.
+        """
+
+        cells = self.cells_from(einstein_masses=einstein_masses)
+
+        for indexes, mass, centre, size in cells:
+
+            distances = np.sqrt(np.sum((coordinates - centre) ** 2, axis=1))
+
+            with np.errstate(divide="ignore"):
+                relative_error = np.where(
+                    distances > size,
+                    size ** 2 * distances / np.maximum(distances - size, 1.0e-12) ** 3,
+                    np.inf,
+                )
+
+            is_monopole = relative_error <= self.relative_tolerance
+
+            deflections[is_monopole] += point_mass_deflections_from(
+                coordinates=coordinates[is_monopole],
+                centres=[centre],
+                einstein_masses=[mass],
+            )
+
+            deflections[~is_monopole] += point_mass_deflections_from(
+                coordinates=coordinates[~is_monopole],
+                centres=self.centres[indexes],
+                einstein_masses=einstein_masses[indexes],
+            )
+
+        """
+        The near field, where the point mass of every subhalo is replaced by its exact deflection angles.
+        """
+
+        for subhalo, centre, near_radius, einstein_mass in zip(
+            self.subhalos, self.centres, near_radii, einstein_masses
+        ):
+
+            if near_radius <= 0.0:
+                continue
+
+            is_near = np.sum((coordinates - centre) ** 2, axis=1) < near_radius ** 2
+
+            deflections[is_near] += deflections_from_coordinates(
+                mass_profile=subhalo, coordinates=coordinates[is_near]
+            ) - point_mass_deflections_from(
+                coordinates=coordinates[is_near],
+                centres=[centre],
+                einstein_masses=[einstein_mass],
+            )
+
+        return deflections.reshape(grid_2d.shape)
+
+    def input_deflections_from_grid(self, grid):
+        """
+        Returns an `InputDeflections` mass profile of the population, which can be used in a `Galaxy` like any other
+        mass profile and interpolates the deflection angles computed on the uniform `grid` (which should match or
+        exceed the resolution of the grid the lens is simulated on).
+        """
+        grid = al.Grid.uniform(shape_2d=grid.shape_2d, pixel_scales=grid.pixel_scales)
+
+        deflections = self.deflections_2d_from_grid(grid=grid)
+
+        return al.mp.InputDeflections(
+            deflections_y=al.Array.manual_2d(
+                array=deflections[:, :, 0], pixel_scales=grid.pixel_scales
+            ),
+            deflections_x=al.Array.manual_2d(
+                array=deflections[:, :, 1], pixel_scales=grid.pixel_scales
+            ),
+            image_plane_grid=grid,
+        )
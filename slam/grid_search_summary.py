@@ -0,0 +1,69 @@
+import os
+from os import path
+
+import numpy as np
+
+"""
+Output a compact summary of a grid search of non-linear searches (e.g. the subhalo detection `GridPhase` of the SLaM
+subhalo pipelines), written as one small .npz file in the output directory of the grid search.
+
+The summary contains what a subhalo detection map needs: the lower and upper physical limits, log evidence, maximum
+log likelihood and best-fit subhalo `mass_at_200` of every cell. It is read by
+`aggregator/tools/grid_search_summary.py`, which builds detection maps of a whole sample without unpickling any samples.
+"""
+
+summary_filename = "grid_search_summary.npz"
+
+
+def summary_from_grid_search_result(grid_search_result):
+    """
+    Returns the summary of a `GridSearchResult` as a dictionary of NumPy arrays.
+
+    The subhalo mass is only available for grid searches whose model contains a `subhalo` galaxy with a `mass_at_200`,
+    and is NaN otherwise.
+    """
+    log_evidences = []
+    max_log_likelihoods = []
+    subhalo_masses = []
+
+    for result in grid_search_result.results:
+
+        samples = result.samples
+
+        log_evidence = getattr(samples, "log_evidence", None)
+
+        log_evidences.append(np.nan if log_evidence is None else log_evidence)
+        max_log_likelihoods.append(np.max(samples.log_likelihoods))
+
+        try:
+            subhalo_masses.append(
+                samples.max_log_likelihood_instance.galaxies.subhalo.mass.mass_at_200
+            )
+        except AttributeError:
+            subhalo_masses.append(np.nan)
+
+    return {
+        "shape": np.asarray(grid_search_result.shape),
+        "lower_limits": np.asarray(grid_search_result.physical_lower_limits_lists),
+        "upper_limits": np.asarray(grid_search_result.physical_upper_limits_lists),
+        "log_evidences": np.asarray(log_evidences, dtype="float64"),
+        "max_log_likelihoods": np.asarray(max_log_likelihoods, dtype="float64"),
+        "subhalo_masses": np.asarray(subhalo_masses, dtype="float64"),
+    }
+
+
+def output_summary(grid_search_result, output_path):
+    """
+    Output the summary of a `GridSearchResult` to the .npz file `grid_search_summary.npz` in `output_path`.
+    """
+    os.makedirs(output_path, exist_ok=True)
+
+    summary = summary_from_grid_search_result(grid_search_result=grid_search_result)
+
+    file_path = path.join(output_path, summary_filename)
+    tmp_path = f"{file_path}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **summary)
+
+    os.replace(tmp_path, file_path)
@@ -2,6 +2,8 @@ from os import path
 import autofit as af
 import autolens as al
 
+from slam import grid_search_summary
+
 """
 This pipeline performs a subhalo analysis which determines the attempts to detect subhalos by putting
 subhalos at fixed intevals on a 2D (y,x) grid.
@@ -135,6 +137,20 @@ def make_pipeline(slam, settings, real_space_mask, mass_results):
                 self.model.galaxies.subhalo.mass.centre_1,
             ]
 
+        def run(self, *args, **kwargs):
+
+            result = super().run(*args, **kwargs)
+
+            """
+            Output a compact summary of the grid search, which the aggregator uses to build subhalo detection maps
+            without loading the samples of every cell (see `slam/grid_search_summary.py`).
+            """
+            grid_search_summary.output_summary(
+                grid_search_result=result, output_path=self.search.paths.output_path
+            )
+
+            return result
+
     """
     Phase Lens Plane: attempt to detect subhalos, by performing a NxN grid search of non-linear searches, where:
 